@@ -5,19 +5,42 @@
 用于记录、查询、删除等个人日常任务的基础管理工具
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "Daily Task Tracker Team"
 __description__ = "一个简单易用的日常任务追踪工具"
 
-# 导入主要模块
-from .task_manage import Task, TaskManager
-from .config import Config
+# 主要类 -> 所在的模块；导入包时不加载存储代码，第一次访问时才导入
+_EXPORTS = {
+    "Task": "task_manage",
+    "TaskManager": "task_manage",
+    "Config": "config",
+    "TaskManagerPool": "pool",
+    "TaskStreamWriter": "output",
+}
+
+__all__ = list(_EXPORTS) + ["create_manager", "get_config"]
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
 # 定义包级别的便捷函数
 def create_manager():
     """创建一个TaskManager实例"""
-    return TaskManager()
+    return __getattr__("TaskManager")()
 
 def get_config():
     """获取配置实例"""
-    return Config()
+    return __getattr__("Config")()
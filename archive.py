@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器归档层
+daily_task_tracker - archive.py
+功能：把已完成的任务移出主数据文件，保存为gzip压缩、只追加的冷分段，并支持按ID取回
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+try:
+    from .utils.io_utils import ensure_directory, read_json_file, write_json_file
+    from .utils.metrics import record_storage_io
+except ImportError:
+    from utils.io_utils import ensure_directory, read_json_file, write_json_file
+    from utils.metrics import record_storage_io
+
+
+ARCHIVE_VERSION = 2
+
+
+class ArchiveStore:
+    """
+    只追加的归档分段
+
+    每次归档写出一个新的分段 segment-NNNNNN.jsonl.gz（每行一个任务），写入后不再修改。
+    清单 manifest.json 记录分段列表和每个归档任务所在的分段 (ids)：只有 ids 指向的分段中的记录有效，
+    取回时从 ids 中删除该ID，任务之后再次归档时 ids 指向更新的分段。判断ID是否在归档中只查清单，
+    按ID查找只解压它所在的一个分段。
+
+    取回只在内存中记录，调用 save() 时才写入清单，以便调用方先保存活跃存储再提交取回；
+    两步之间中断时任务会同时出现在两处，以活跃存储中的为准。
+    """
+
+    def __init__(self, directory: str):
+        """
+        初始化归档层
+
+        Args:
+            directory: 归档目录
+        """
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, "manifest.json")
+        self.manifest: Dict[str, Any] = {}
+        self._restored: Set[str] = set()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """重新读取清单（丢弃尚未保存的取回）"""
+        data = read_json_file(self.manifest_file)
+        self._restored = set()
+        if isinstance(data, dict) and data.get("version") == 1:
+            data = self._upgrade(data)
+        elif not isinstance(data, dict) or data.get("version") != ARCHIVE_VERSION:
+            data = {"version": ARCHIVE_VERSION, "segments": [], "ids": {}}
+        self.manifest = data
+
+    def _upgrade(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """把第1版清单（只记录已取回的ID）转换为记录每个归档ID所在分段的清单，只在第一次打开时读取全部分段"""
+        restored = data.get("restored", {})
+        ids: Dict[str, int] = {}
+        for number, segment in enumerate(data["segments"], 1):
+            for record in self._read_segment(segment["file"]):
+                if restored.get(record["id"], 0) < number:
+                    ids[record["id"]] = number
+        upgraded = {"version": ARCHIVE_VERSION, "segments": data["segments"], "ids": ids}
+        write_json_file(self.manifest_file, upgraded)
+        return upgraded
+
+    @property
+    def count(self) -> int:
+        """归档中的任务数（不含已取回的）"""
+        return len(self.manifest["ids"]) - len(self._restored)
+
+    @property
+    def dirty(self) -> bool:
+        """是否有尚未写入清单的取回"""
+        return bool(self._restored)
+
+    def __contains__(self, task_id: str) -> bool:
+        """任务是否在归档中（只查清单，不读取分段）"""
+        return task_id in self.manifest["ids"] and task_id not in self._restored
+
+    def append(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        把任务记录写成一个新的分段
+
+        Args:
+            records: 任务记录
+
+        Returns:
+            如果写入成功返回True，否则返回False
+        """
+        if not records:
+            return True
+        number = len(self.manifest["segments"]) + 1
+        name = f"segment-{number:06d}.jsonl.gz"
+        path = os.path.join(self.directory, name)
+        payload = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                          for record in records).encode("utf-8")
+        try:
+            ensure_directory(self.directory)
+            with gzip.open(path, "wb") as f:
+                f.write(payload)
+        except OSError as e:
+            print(f"写入归档分段失败 {path}: {e}")
+            return False
+        record_storage_io("write", os.path.getsize(path))
+
+        self.manifest["segments"].append({"file": name, "count": len(records)})
+        for record in records:
+            self.manifest["ids"][record["id"]] = number
+            self._restored.discard(record["id"])
+        return write_json_file(self.manifest_file, self.manifest)
+
+    def save(self) -> bool:
+        """
+        把尚未保存的取回写入清单
+
+        Returns:
+            如果写入成功（或没有需要写入的取回）返回True，否则返回False
+        """
+        if not self._restored:
+            return True
+        manifest = dict(self.manifest, ids={task_id: number for task_id, number in self.manifest["ids"].items()
+                                            if task_id not in self._restored})
+        if not write_json_file(self.manifest_file, manifest):
+            return False
+        self.manifest = manifest
+        self._restored = set()
+        return True
+
+    def _read_segment(self, name: str) -> Iterator[Dict[str, Any]]:
+        """读取一个分段中的全部记录"""
+        path = os.path.join(self.directory, name)
+        try:
+            with gzip.open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"读取归档分段失败 {path}: {e}")
+            return
+        record_storage_io("read", os.path.getsize(path))
+        for line in data.splitlines():
+            if line.strip():
+                yield json.loads(line)
+
+    def _iter_segment(self, number: int, name: str) -> Iterator[Dict[str, Any]]:
+        """读取一个分段中仍然有效的记录"""
+        ids = self.manifest["ids"]
+        for record in self._read_segment(name):
+            if ids.get(record["id"]) == number and record["id"] not in self._restored:
+                yield record
+
+    def read(self) -> List[Dict[str, Any]]:
+        """按归档顺序读取全部有效记录"""
+        records = []
+        for number, segment in enumerate(self.manifest["segments"], 1):
+            records.extend(self._iter_segment(number, segment["file"]))
+        return records
+
+    def find(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        查找归档中的任务（不在清单中的ID不读取任何分段）
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            任务记录，如果不在归档中则返回None
+        """
+        if task_id not in self:
+            return None
+        number = self.manifest["ids"][task_id]
+        for record in self._iter_segment(number, self.manifest["segments"][number - 1]["file"]):
+            if record["id"] == task_id:
+                return record
+        return None
+
+    def mark_restored(self, task_id: str) -> bool:
+        """
+        把任务标记为已取回（分段不修改；只在内存中记录，save() 时写入清单）
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            如果任务在归档中返回True，否则返回False
+        """
+        if task_id not in self:
+            return False
+        self._restored.add(task_id)
+        return True
+
+    def restore(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        从归档中取回任务（只在内存中记录，save() 时写入清单）
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            任务记录，如果不在归档中则返回None
+        """
+        record = self.find(task_id)
+        if record is not None:
+            self.mark_restored(task_id)
+        return record
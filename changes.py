@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器变更日志
+daily_task_tracker - changes.py
+功能：以追加写的JSON Lines文件记录每次变更及其单调递增的序号，支持按序号增量读取和轮询跟踪
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .utils.metrics import record_storage_io
+except ImportError:
+    from utils.metrics import record_storage_io
+
+
+# 二分查找缩小到这个字节范围后改为顺序扫描
+_SEARCH_BLOCK = 4096
+# 读取最后一条记录时从文件末尾回看的字节数（不够时加倍）
+_TAIL_CHUNK = 4096
+
+
+def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+    """解析一行变更记录，空行或损坏的行返回None"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and isinstance(record.get("seq"), int) else None
+
+
+class ChangeFeed:
+    """
+    追加写的变更日志
+
+    每行一条记录：{"seq": 序号, "op": "add"|"update"|"delete", "id": 任务ID, "at": 时间, "task": 任务快照}。
+    序号严格递增，记录时间随序号不减，因此可以在文件上按序号或时间二分定位，增量读取的开销与新增变更的数量成正比。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        初始化变更日志
+
+        Args:
+            file_path: 日志文件路径
+        """
+        self.file_path = file_path
+
+    def _size(self) -> int:
+        try:
+            return os.path.getsize(self.file_path)
+        except OSError:
+            return 0
+
+    def last_seq(self) -> int:
+        """读取最后一条记录的序号（只读取文件末尾），日志为空时返回0"""
+        size = self._size()
+        if size == 0:
+            return 0
+        chunk = _TAIL_CHUNK
+        with open(self.file_path, "rb") as f:
+            while True:
+                start = max(0, size - chunk)
+                f.seek(start)
+                data = f.read(size - start)
+                lines = data.splitlines()
+                # 第一行可能是被截断的半行，除非已经读到文件开头
+                candidates = lines if start == 0 else lines[1:]
+                for line in reversed(candidates):
+                    record = _parse_line(line)
+                    if record is not None:
+                        record_storage_io("read", len(data))
+                        return record["seq"]
+                if start == 0:
+                    record_storage_io("read", len(data))
+                    return 0
+                chunk *= 2
+
+    def first_record(self) -> Optional[Dict[str, Any]]:
+        """读取第一条记录，日志为空时返回None"""
+        if self._size() == 0:
+            return None
+        with open(self.file_path, "rb") as f:
+            for line in f:
+                record = _parse_line(line)
+                if record is not None:
+                    return record
+        return None
+
+    def first_seq(self) -> int:
+        """读取第一条记录的序号，日志为空时返回0"""
+        record = self.first_record()
+        return record["seq"] if record else 0
+
+    def append(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        追加变更记录
+
+        Args:
+            records: 变更记录列表，序号必须大于已有记录
+
+        Returns:
+            如果写入成功返回True，否则返回False
+        """
+        if not records:
+            return True
+        payload = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                          for record in records).encode("utf-8")
+        try:
+            directory = os.path.dirname(self.file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.file_path, "ab") as f:
+                f.write(payload)
+        except OSError as e:
+            print(f"写入变更日志失败 {self.file_path}: {e}")
+            return False
+        record_storage_io("write", len(payload))
+        return True
+
+    def _offset_after(self, f, size: int, seq: Any, field: str = "seq") -> int:
+        """二分定位：返回一个行首偏移量，它之前的所有记录的 field（默认为序号）都不大于 seq"""
+        lo, hi = 0, size
+        while hi - lo > _SEARCH_BLOCK:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            f.readline()
+            position = f.tell()
+            line = f.readline()
+            record = _parse_line(line)
+            if not line or position >= hi or record is None:
+                hi = mid
+            elif record.get(field, "") <= seq:
+                lo = position + len(line)
+            else:
+                hi = mid
+        return lo
+
+    def read_since(self, seq: int, offset: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        读取序号大于 seq 的全部记录
+
+        Args:
+            seq: 起始序号（不包含）
+            offset: 已知的行首字节偏移量（上次读取返回的值），给出时跳过二分定位
+
+        Returns:
+            (记录列表, 读取结束处的字节偏移量)
+        """
+        size = self._size()
+        if size == 0:
+            return [], 0
+        records = []
+        with open(self.file_path, "rb") as f:
+            if offset is None or offset > size:
+                offset = self._offset_after(f, size, seq)
+            f.seek(offset)
+            data = f.read(size - offset)
+        record_storage_io("read", len(data))
+
+        # 只消费完整的行，写到一半的最后一行留给下一次读取
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            record = _parse_line(line)
+            if record is not None and record["seq"] > seq:
+                records.append(record)
+        return records, offset + end
+
+    def read_after(self, at: str) -> List[Dict[str, Any]]:
+        """
+        读取记录时间晚于 at 的全部记录（按时间二分定位，只读取定位之后的部分）
+
+        Args:
+            at: 时间 (ISO格式，或只给日期)
+
+        Returns:
+            记录列表
+        """
+        size = self._size()
+        if size == 0:
+            return []
+        with open(self.file_path, "rb") as f:
+            offset = self._offset_after(f, size, at, field="at")
+        return [record for record in self.read_since(0, offset)[0] if record.get("at", "") > at]
+
+    def follow(self, seq: int = 0, interval: float = 1.0,
+               sleep=time.sleep) -> Iterator[Dict[str, Any]]:
+        """
+        持续跟踪新的变更（生成器）
+
+        只在文件大小变化时读取新增的字节，空闲时每次轮询只需一次 stat。
+
+        Args:
+            seq: 起始序号（不包含）
+            interval: 轮询间隔秒数
+            sleep: 等待函数（便于测试注入）
+        """
+        records, offset = self.read_since(seq)
+        while True:
+            for record in records:
+                seq = record["seq"]
+                yield record
+            if not records:
+                sleep(interval)
+            size = self._size()
+            if size == offset:
+                records = []
+            elif size < offset:
+                # 日志被截断或替换，重新定位
+                records, offset = self.read_since(seq)
+            else:
+                records, offset = self.read_since(seq, offset)
@@ -6,84 +6,255 @@ daily_task_tracker - cli.py
 功能：提供命令行交互界面，方便用户操作任务
 """
 
+from __future__ import annotations
+
 import argparse
+import os
 import sys
 import datetime
-from task_manage import TaskManager, Task
+import json
+import shlex
+import time
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from output import FORMAT_TABLE, OUTPUT_FORMATS
+
+# 存储、提醒、同步等模块在子命令执行时才导入，task-cli --help 和解析参数不加载它们
+if TYPE_CHECKING:
+    from task_manage import TaskManager, Task
+    from utils.memory import MemoryProfiler
+
+
+# 状态显示文本，模块级常量避免逐行重建
+STATUS_LABELS = {
+    "pending": "⏳ 待办",
+    "in_progress": "🔄 进行中",
+    "completed": "✅ 已完成"
+}
+TABLE_SEPARATOR = "-" * 80
+# 列表输出每累计多少行写一次标准输出
+WRITE_BATCH_ROWS = 512
+
+
+def format_timestamp(value: str, with_seconds: bool = False) -> str:
+    """
+    把ISO格式的时间格式化为 YYYY-MM-DD HH:MM[:SS]
+    
+    标准ISO时间直接切片，只有非标准格式才回退到 datetime 解析。
+    """
+    width = 19 if with_seconds else 16
+    if len(value) >= width and value[10:11] == "T":
+        return value[:10] + " " + value[11:width]
+    fmt = "%Y-%m-%d %H:%M:%S" if with_seconds else "%Y-%m-%d %H:%M"
+    return datetime.datetime.fromisoformat(value).strftime(fmt)
 
 
 def print_task(task: Task) -> None:
-    """打印单个任务的详细信息"""
-    print(f"\n任务ID: {task.id}")
-    print(f"标题: {task.title}")
-    print(f"描述: {task.description}")
-    print(f"状态: {task.status}")
-    print(f"截止日期: {task.due_date if task.due_date else '无'}")
-    print(f"创建时间: {datetime.datetime.fromisoformat(task.created_at).strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"更新时间: {datetime.datetime.fromisoformat(task.updated_at).strftime('%Y-%m-%d %H:%M:%S')}")
-    print("-" * 50)
+    """打印单个任务的详细信息（拼接后一次写入标准输出）"""
+    lines = [f"\n任务ID: {task.id}", f"标题: {task.title}", f"描述: {task.description}", f"状态: {task.status}"]
+    if task.priority:
+        lines.append(f"优先级: {task.priority}")
+    lines.append(f"截止日期: {task.due_date if task.due_date else '无'}")
+    if task.recurrence:
+        lines.append(f"重复: {task.recurrence}")
+    if task.series_id:
+        lines.append(f"所属重复任务: {task.series_id}")
+    if task.depends_on:
+        lines.append(f"依赖: {', '.join(task.depends_on)}")
+    lines.append(f"创建时间: {format_timestamp(task.created_at, with_seconds=True)}")
+    lines.append(f"更新时间: {format_timestamp(task.updated_at, with_seconds=True)}")
+    lines.append("-" * 50)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def print_tasks(tasks: list[Task]) -> None:
-    """打印任务列表"""
+def print_tasks(tasks: list[Task], next_cursor: Optional[str] = None) -> None:
+    """
+    打印任务列表
+    
+    行按批拼接后一次性写入标准输出，避免逐行 print 的开销。
+    
+    Args:
+        tasks: 要打印的任务
+        next_cursor: 下一页游标，存在时在表格后提示
+    """
     if not tasks:
         print("没有找到任务")
         return
     
-    print(f"\n找到 {len(tasks)} 个任务:")
-    print("-" * 80)
-    print(f"{'ID':<5} {'状态':<12} {'标题':<30} {'截止日期':<15} {'创建时间':<20}")
-    print("-" * 80)
+    write = sys.stdout.write
+    write(f"\n找到 {len(tasks)} 个任务:\n{TABLE_SEPARATOR}\n"
+          f"{'ID':<5} {'状态':<12} {'标题':<30} {'截止日期':<15} {'创建时间':<20}\n{TABLE_SEPARATOR}\n")
     
+    buffer = []
     for task in tasks:
-        status_emoji = {
-            "pending": "⏳ 待办",
-            "in_progress": "🔄 进行中",
-            "completed": "✅ 已完成"
-        }
-        due_date = task.due_date if task.due_date else "无"
-        created_at = datetime.datetime.fromisoformat(task.created_at).strftime("%Y-%m-%d %H:%M")
-        
-        print(f"{task.id:<5} {status_emoji.get(task.status, task.status):<12} {task.title:<30.30} {due_date:<15} {created_at:<20}")
+        status = STATUS_LABELS.get(task.status, task.status)
+        due_date = task.due_date or ("重复" if task.recurrence else "无")
+        created_at = format_timestamp(task.created_at)
+        buffer.append(f"{task.id:<5} {status:<12} {task.title:<30.30} {due_date:<15} {created_at:<20}\n")
+        if len(buffer) >= WRITE_BATCH_ROWS:
+            write("".join(buffer))
+            buffer.clear()
+    buffer.append(TABLE_SEPARATOR + "\n")
+    if next_cursor:
+        buffer.append(f"还有更多任务，使用 --cursor {next_cursor} 查看下一页\n")
+    write("".join(buffer))
+
+
+def stream_from_store(args: argparse.Namespace) -> bool:
+    """
+    是否边扫描存储边输出：机器可读格式且不分页时，任务由 TaskManager.iter_tasks 惰性生成，
+    下游提前关闭管道时不再过滤和编码剩余的任务；表格需要先知道任务数，分页需要给出游标，仍然先取出整页
+    """
+    return args.format != FORMAT_TABLE and args.limit is None
+
+
+def emit_tasks(args: argparse.Namespace, tasks: Iterable[Task], next_cursor: Optional[str] = None,
+               single: bool = False) -> None:
+    """
+    按 --format 输出任务：table 打印表格（single 时打印详情，tasks 须为列表），其他格式交给 TaskStreamWriter 流式写出
     
-    print("-" * 80)
+    机器可读格式的标准输出只包含数据，下一页游标提示写到标准错误。
+    """
+    if args.format == FORMAT_TABLE:
+        if single:
+            print_task(tasks[0])
+        else:
+            print_tasks(tasks, next_cursor)
+        return
+    from output import TaskStreamWriter
+    sys.stdout.flush()
+    TaskStreamWriter(args.format).write(tasks, single=single)
+    if next_cursor:
+        print(f"还有更多任务，使用 --cursor {next_cursor} 查看下一页", file=sys.stderr)
 
 
-def add_task_command(args: argparse.Namespace) -> None:
+def add_format_argument(parser: argparse.ArgumentParser) -> None:
+    """为读取类命令添加输出格式参数"""
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=FORMAT_TABLE,
+                        help="输出格式：table 为表格（默认），json/ndjson/csv/tsv 供脚本读取")
+
+
+# list 命令支持的范围查询参数，对应 Query 的同名参数
+QUERY_RANGE_ARGUMENTS = ("due_after", "due_before", "created_after", "created_before",
+                         "updated_after", "updated_before")
+
+
+def add_pagination_arguments(parser: argparse.ArgumentParser) -> None:
+    """为列表类命令添加分页和查询范围参数"""
+    parser.add_argument("-n", "--limit", type=int, help="最多显示的任务数")
+    parser.add_argument("--offset", type=int, default=0, help="跳过的任务数")
+    parser.add_argument("--cursor", help="从上一页输出的游标处继续")
+    parser.add_argument("--include-archived", action="store_true", help="同时查找已归档的任务")
+
+
+def open_manager(args: argparse.Namespace) -> TaskManager:
+    """获取命令使用的任务管理器：batch 模式下共享同一个实例，否则新建（记在 args 上，供 --memprofile 统计）"""
+    manager = getattr(args, "manager", None)
+    if manager is None:
+        from task_manage import TaskManager
+        manager = args.manager = TaskManager()
+    return manager
+
+
+def print_memory_profile(profiler: MemoryProfiler, manager: Optional[TaskManager]) -> None:
+    """把内存分析报告打印到标准错误（不影响命令本身的输出）"""
+    from utils.memory import format_bytes
+    lines = ["", "🧠 内存分析", profiler.format()]
+    if manager is not None:
+        report = manager.memory_report()
+        sizes, per_task = report["bytes"], report["per_task"]
+        lines.append(f"已加载 {report['tasks']} 个任务，常驻 {format_bytes(report['total'])}"
+                     + (f"，每个任务 {format_bytes(per_task['total'])}" if report["tasks"] else ""))
+        rows = [("Task对象", sizes["task_objects"]), ("字符串", sizes["strings"])]
+        rows += [(f"索引 {name}", size) for name, size in sizes["indexes"].items() if size]
+        if report["decoded_json"] is not None:
+            rows.append(("解码的JSON (加载时临时占用)", report["decoded_json"]))
+        for label, size in rows:
+            share = f"{format_bytes(size / report['tasks']):>10}/任务" if report["tasks"] else ""
+            lines.append(f"  {label:<28}{format_bytes(size):>10}  {share}")
+    print("\n".join(lines), file=sys.stderr)
+
+
+def parse_id_list(value: str) -> list[str]:
+    """解析逗号分隔的任务ID列表，空字符串表示空列表"""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# 子命令的处理函数成功时返回True；失败时打印 ❌ 错误并返回False，batch 据此统计失败的行，task-cli 以退出码1结束
+
+
+def add_task_command(args: argparse.Namespace) -> bool:
     """处理添加任务命令"""
-    manager = TaskManager()
-    task = manager.add_task(args.title, args.description, args.due_date)
+    manager = open_manager(args)
+    try:
+        task = manager.add_task(args.title, args.description, args.due_date, recurrence=args.repeat,
+                                depends_on=args.depends_on, priority=args.priority)
+    except ValueError as e:
+        print(f"❌ 添加任务失败: {e}")
+        return False
     print(f"✅ 成功添加任务: {task.title} (ID: {task.id})")
+    return True
 
 
-def list_tasks_command(args: argparse.Namespace) -> None:
+def list_tasks_command(args: argparse.Namespace) -> bool:
     """处理列出任务命令"""
-    manager = TaskManager()
+    manager = open_manager(args)
+    range_criteria = {name: getattr(args, name) for name in QUERY_RANGE_ARGUMENTS if getattr(args, name)}
     
-    if args.status:
-        tasks = manager.get_tasks_by_status(args.status)
-    elif args.search:
-        tasks = manager.search_tasks(args.search)
-    else:
-        tasks = manager.get_all_tasks()
+    # 排序、范围条件或 --explain 交给查询引擎；否则按存储顺序分页，支持游标
+    if args.sort or range_criteria or args.explain:
+        if args.cursor:
+            print("❌ --cursor 不能与 --sort、范围条件或 --explain 同时使用，请改用 --offset")
+            return False
+        try:
+            tasks, plan = manager.query(explain=True, include_archived=args.include_archived,
+                                        status=args.status, keyword=args.search,
+                                        sort=args.sort, limit=args.limit, offset=args.offset,
+                                        **range_criteria)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        if args.explain:
+            # 机器可读格式时写到标准错误，不混入数据
+            out = sys.stdout if args.format == FORMAT_TABLE else sys.stderr
+            print("查询计划:", file=out)
+            for line in plan.describe():
+                print(f"  {line}", file=out)
+        emit_tasks(args, tasks)
+        return True
     
-    print_tasks(tasks)
+    try:
+        if stream_from_store(args):
+            tasks, next_cursor = manager.iter_tasks(offset=args.offset, cursor=args.cursor, status=args.status,
+                                                    keyword=args.search, include_archived=args.include_archived), None
+        else:
+            page = manager.get_tasks_page(limit=args.limit, offset=args.offset, cursor=args.cursor,
+                                          status=args.status, keyword=args.search,
+                                          include_archived=args.include_archived)
+            tasks, next_cursor = page.tasks, page.next_cursor
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    
+    emit_tasks(args, tasks, next_cursor)
+    return True
 
 
-def show_task_command(args: argparse.Namespace) -> None:
+def show_task_command(args: argparse.Namespace) -> bool:
     """处理查看任务详情命令"""
-    manager = TaskManager()
-    task = manager.get_task(args.id)
+    manager = open_manager(args)
+    task = manager.get_task(args.id, include_archived=True)
     
     if task:
-        print_task(task)
-    else:
-        print(f"❌ 找不到ID为 {args.id} 的任务")
+        emit_tasks(args, [task], single=True)
+        return True
+    print(f"❌ 找不到ID为 {args.id} 的任务")
+    return False
 
 
-def update_task_command(args: argparse.Namespace) -> None:
+def update_task_command(args: argparse.Namespace) -> bool:
     """处理更新任务命令"""
-    manager = TaskManager()
+    manager = open_manager(args)
     
     # 收集要更新的字段
     update_fields = {}
@@ -95,67 +266,451 @@ def update_task_command(args: argparse.Namespace) -> None:
         update_fields["due_date"] = args.due_date
     if args.status is not None:
         update_fields["status"] = args.status
+    if args.depends_on is not None:
+        update_fields["depends_on"] = args.depends_on
+    if args.priority is not None:
+        update_fields["priority"] = args.priority
     
     if not update_fields:
         print("❌ 没有提供要更新的字段")
-        return
+        return False
     
-    updated_task = manager.update_task(args.id, **update_fields)
+    try:
+        updated_task = manager.update_task(args.id, **update_fields)
+    except ValueError as e:
+        print(f"❌ 更新任务失败: {e}")
+        return False
     
     if updated_task:
         print(f"✅ 成功更新任务 (ID: {updated_task.id})")
         print_task(updated_task)
-    else:
-        print(f"❌ 找不到ID为 {args.id} 的任务")
+        return True
+    print(f"❌ 找不到ID为 {args.id} 的任务")
+    return False
 
 
-def delete_task_command(args: argparse.Namespace) -> None:
+def delete_task_command(args: argparse.Namespace) -> bool:
     """处理删除任务命令"""
-    manager = TaskManager()
+    manager = open_manager(args)
     success = manager.delete_task(args.id)
     
     if success:
         print(f"🗑️  成功删除ID为 {args.id} 的任务")
-    else:
-        print(f"❌ 找不到ID为 {args.id} 的任务")
+        return True
+    print(f"❌ 找不到ID为 {args.id} 的任务")
+    return False
 
 
-def mark_in_progress_command(args: argparse.Namespace) -> None:
+def mark_in_progress_command(args: argparse.Namespace) -> bool:
     """处理标记任务为进行中命令"""
-    manager = TaskManager()
+    manager = open_manager(args)
     updated_task = manager.update_task(args.id, status="in_progress")
     
     if updated_task:
         print(f"🔄 已将任务 {updated_task.title} (ID: {updated_task.id}) 标记为进行中")
-    else:
-        print(f"❌ 找不到ID为 {args.id} 的任务")
+        return True
+    print(f"❌ 找不到ID为 {args.id} 的任务")
+    return False
 
 
-def mark_completed_command(args: argparse.Namespace) -> None:
+def mark_completed_command(args: argparse.Namespace) -> bool:
     """处理标记任务为已完成命令"""
-    manager = TaskManager()
+    manager = open_manager(args)
     updated_task = manager.update_task(args.id, status="completed")
     
     if updated_task:
         print(f"✅ 已将任务 {updated_task.title} (ID: {updated_task.id}) 标记为已完成")
-    else:
-        print(f"❌ 找不到ID为 {args.id} 的任务")
+        return True
+    print(f"❌ 找不到ID为 {args.id} 的任务")
+    return False
 
 
-def search_tasks_command(args: argparse.Namespace) -> None:
+def search_tasks_command(args: argparse.Namespace) -> bool:
     """处理搜索任务命令"""
-    manager = TaskManager()
-    tasks = manager.search_tasks(args.keyword)
-    print_tasks(tasks)
+    manager = open_manager(args)
+    
+    if args.ranked:
+        if args.regex or args.cursor or args.offset or args.include_archived:
+            print("❌ --ranked 不能与 --regex、--cursor、--offset 或 --include-archived 同时使用")
+            return False
+        try:
+            results = manager.search_ranked(args.keyword, limit=args.limit if args.limit is not None else 10)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        emit_tasks(args, [task for task, _ in results])
+        return True
+    
+    # 正则搜索没有存储位置游标，按 offset/limit 截取（任务数多时自动并行扫描）
+    if args.regex:
+        if args.cursor:
+            print("❌ --cursor 不能与 --regex 同时使用，请改用 --offset")
+            return False
+        if args.offset < 0 or (args.limit is not None and args.limit < 0):
+            print("❌ limit 和 offset 不能为负数")
+            return False
+        try:
+            tasks = manager.search_tasks(args.keyword, include_archived=args.include_archived, regex=True)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        stop = args.offset + args.limit if args.limit is not None else None
+        emit_tasks(args, tasks[args.offset:stop])
+        return True
+    
+    try:
+        if stream_from_store(args):
+            tasks, next_cursor = manager.iter_tasks(offset=args.offset, cursor=args.cursor, keyword=args.keyword,
+                                                    include_archived=args.include_archived), None
+        else:
+            page = manager.get_tasks_page(limit=args.limit, offset=args.offset, cursor=args.cursor,
+                                          keyword=args.keyword, include_archived=args.include_archived)
+            tasks, next_cursor = page.tasks, page.next_cursor
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    
+    emit_tasks(args, tasks, next_cursor)
+    return True
 
 
-def main() -> None:
-    """主函数"""
+def agenda_command(args: argparse.Namespace) -> bool:
+    """处理议程命令"""
+    manager = open_manager(args)
+    sections = [
+        ("overdue", "⚠️  已过期", manager.get_overdue_tasks),
+        ("today", "📅 今天截止", manager.get_tasks_due_today),
+        ("week", "🗓️  本周截止", manager.get_tasks_due_this_week),
+    ]
+    selected = [name for name in ("overdue", "today", "week") if getattr(args, name)]
+    
+    for name, title, getter in sections:
+        if selected and name not in selected:
+            continue
+        print(f"\n{title}:")
+        print_tasks(getter())
+    return True
+
+
+def next_command(args: argparse.Namespace) -> bool:
+    """处理列出可以开始的任务命令"""
+    manager = open_manager(args)
+    print_tasks(manager.get_next_tasks(limit=args.limit))
+    return True
+
+
+def path_command(args: argparse.Namespace) -> bool:
+    """处理关键路径命令"""
+    manager = open_manager(args)
+    path = manager.critical_path(args.id)
+    
+    if path is None:
+        print(f"❌ 找不到ID为 {args.id} 的任务")
+        return False
+    if len(path) == 1:
+        print(f"任务 {path[0].title} 没有未完成的依赖，可以直接开始")
+        return True
+    
+    print(f"\n关键路径 (共 {len(path)} 个任务，按顺序完成):")
+    for step, task in enumerate(path, 1):
+        status = STATUS_LABELS.get(task.status, task.status)
+        print(f"{step:>3}. {status:<12} {task.title} (ID: {task.id}, 截止日期: {task.due_date or '无'})")
+    return True
+
+
+def sync_command(args: argparse.Namespace) -> bool:
+    """处理同步命令"""
+    manager = open_manager(args)
+    # 给出目录时使用其中与本地数据文件同名的文件
+    other = args.store
+    if os.path.isdir(other):
+        other = os.path.join(other, os.path.basename(manager.data_file))
+    if os.path.abspath(other) == os.path.abspath(manager.data_file):
+        print("❌ 不能与自身同步")
+        return False
+    
+    from task_manage import TaskManager
+    from sync import sync_managers
+    remote = TaskManager(manager.config.config_file, data_file=other)
+    try:
+        result = sync_managers(manager, remote, args.prefer or manager.config.get("sync_conflict", "newest"),
+                               dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    
+    prefix = "🔍 (预演) " if args.dry_run else "🔁 "
+    print(f"{prefix}与 {other} 同步: 拉取 {result.pulled} 个, 推送 {result.pushed} 个, "
+          f"其中冲突 {result.conflicts} 个 (比较了 {result.compared_nodes} 个树节点)")
+    return True
+
+
+def archive_command(args: argparse.Namespace) -> bool:
+    """处理归档命令"""
+    manager = open_manager(args)
+    try:
+        count = manager.archive_completed(args.completed_before)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    
+    if count:
+        print(f"📦 已归档 {count} 个在 {args.completed_before} 之前完成的任务 (归档中共 {manager.archive.count} 个)")
+    else:
+        print(f"没有在 {args.completed_before} 之前完成的任务需要归档")
+    return True
+
+
+CHANGE_LABELS = {
+    "add": "➕ 新增",
+    "update": "✏️  更新",
+    "delete": "🗑️  删除"
+}
+
+
+def watch_command(args: argparse.Namespace) -> bool:
+    """处理跟踪变更命令"""
+    manager = open_manager(args)
+    since = manager.seq if args.since is None else args.since
+    
+    if args.once:
+        changes = manager.changes_since(since)
+    else:
+        print(f"👀 正在跟踪序号 {since} 之后的变更 (Ctrl+C 退出)", file=sys.stderr)
+        changes = manager.changes.follow(since, args.interval)
+    
+    try:
+        for change in changes:
+            if args.json:
+                line = json.dumps(change, ensure_ascii=False, separators=(",", ":"))
+            else:
+                label = CHANGE_LABELS.get(change["op"], change["op"])
+                title = (change.get("task") or {}).get("title", "")
+                line = f"#{change['seq']:<6} {format_timestamp(change['at'], with_seconds=True)} {label} {title} (ID: {change['id']})"
+            print(line, flush=True)
+    except KeyboardInterrupt:
+        pass
+    return True
+
+
+def export_command(args: argparse.Namespace) -> bool:
+    """处理增量导出命令"""
+    from utils.io_utils import read_json_file, write_json_file
+    manager = open_manager(args)
+    watermark_file = args.watermark or manager.watermark_file
+    previous = read_json_file(watermark_file) or {}
+    
+    # --since 为整数时是变更序号，否则是时间；不给时从水位文件继续，没有水位文件时导出全部任务
+    try:
+        if args.since is not None and args.since.isdigit():
+            changes, watermark = manager.export_delta(since_seq=int(args.since))
+        elif args.since is not None:
+            datetime.datetime.fromisoformat(args.since)
+            changes, watermark = manager.export_delta(since=args.since)
+        else:
+            try:
+                changes, watermark = manager.export_delta(since_seq=previous.get("seq"))
+            except ValueError:
+                # 变更日志已经不包含水位之后的全部变更，退回时间水位
+                changes, watermark = manager.export_delta(since=previous.get("updated_at"))
+    except ValueError as e:
+        print(f"❌ 无效的水位 {args.since}: {e}", file=sys.stderr)
+        return False
+    
+    stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        buffer = []
+        for change in changes:
+            buffer.append(json.dumps(change, ensure_ascii=False, separators=(",", ":")) + "\n")
+            if len(buffer) >= WRITE_BATCH_ROWS:
+                stream.write("".join(buffer))
+                buffer.clear()
+        stream.write("".join(buffer))
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    
+    # 输出写完之后才推进水位，写出失败时下次会重新导出；没有导出变更时保留原来的时间水位
+    watermark["updated_at"] = watermark["updated_at"] or previous.get("updated_at")
+    write_json_file(watermark_file, watermark)
+    print(f"📤 导出 {len(changes)} 条变更，新的水位: 序号 {watermark['seq']}, 时间 {watermark['updated_at'] or '无'}",
+          file=sys.stderr)
+    return True
+
+
+REMINDER_LABELS = {
+    "due": "⏰ 今天截止",
+    "overdue": "⚠️  已过期"
+}
+
+
+def print_reminder(reminder) -> None:
+    """在标准输出打印一条提醒"""
+    label = REMINDER_LABELS.get(reminder.kind, reminder.kind)
+    print(f"{reminder.at:%Y-%m-%d %H:%M} {label} {reminder.title} (ID: {reminder.task_id})", flush=True)
+
+
+def remind_command(args: argparse.Namespace) -> bool:
+    """处理提醒命令"""
+    from reminders import ReminderScheduler, ReminderService, CommandHook, FifoHook, LogHook
+    manager = open_manager(args)
+    try:
+        remind_at = datetime.time.fromisoformat(manager.config.get("reminder_time", "09:00"))
+    except ValueError as e:
+        print(f"❌ 无效的 reminder_time: {e}")
+        return False
+    
+    hooks = [print_reminder]
+    hooks.extend(LogHook(path) for path in args.log or [])
+    hooks.extend(FifoHook(path) for path in args.fifo or [])
+    hooks.extend(CommandHook(command) for command in args.exec or [])
+    service = ReminderService(manager, hooks, ReminderScheduler(remind_at=remind_at))
+    print(f"🔔 正在等待 {len(service.scheduler)} 个任务的提醒 (Ctrl+C 退出)", file=sys.stderr)
+    try:
+        while True:
+            service.tick()
+            # 睡到下一个提醒或下一次检查变更日志，取较早者
+            time.sleep(service.seconds_until_next(args.interval))
+    except KeyboardInterrupt:
+        pass
+    return True
+
+
+def format_duration(seconds: float) -> str:
+    """把秒数格式化为 X天Y小时Z分钟"""
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}天{hours}小时"
+    if hours:
+        return f"{hours}小时{minutes}分钟"
+    return f"{minutes}分钟"
+
+
+def stats_command(args: argparse.Namespace) -> bool:
+    """处理统计命令"""
+    manager = open_manager(args)
+    stats = manager.get_stats(days=args.days, weeks=args.weeks)
+    
+    print(f"\n📊 任务统计 (共 {stats['total']} 个任务)")
+    print("-" * 50)
+    for status, label in STATUS_LABELS.items():
+        print(f"{label:<10} {stats['by_status'].get(status, 0)}")
+    print(f"⚠️  过期未完成 {stats['overdue']}")
+    
+    print(f"\n最近 {args.days} 天完成:")
+    for day, count in stats["completed_per_day"]:
+        print(f"  {day}  {count}")
+    print(f"\n最近 {args.weeks} 周完成:")
+    for week, count in stats["completed_per_week"]:
+        print(f"  {week}  {count}")
+    
+    average = stats["average_completion_seconds"]
+    print(f"\n平均完成耗时: {format_duration(average) if average is not None else '无'}")
+    print("-" * 50)
+    return True
+
+
+def metrics_command(args: argparse.Namespace) -> bool:
+    """处理导出指标命令"""
+    from utils.metrics import render_metrics, write_metrics_file, start_metrics_server
+    manager = open_manager(args)
+    
+    if args.serve is not None:
+        server = start_metrics_server(args.serve, args.host)
+        host, port = server.server_address[:2]
+        print(f"📈 指标服务已启动: http://{host}:{port}/metrics (Ctrl+C 退出)")
+        try:
+            while True:
+                # 定期重新加载数据文件，使存储规模指标保持最新
+                time.sleep(args.interval)
+                manager.reload()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return True
+    
+    if args.output:
+        if not write_metrics_file(args.output):
+            return False
+        print(f"📈 指标已写入 {args.output}")
+    else:
+        sys.stdout.write(render_metrics())
+    return True
+
+
+def batch_command(args: argparse.Namespace) -> bool:
+    """处理批量执行命令"""
+    parser = build_parser()
+    manager = open_manager(args)
+    stream = open(args.file, "r", encoding="utf-8") if args.file and args.file != "-" else sys.stdin
+    executed = failed = 0
+    
+    try:
+        with manager.deferred_save():
+            for line_number, line in enumerate(stream, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                print(f"[{line_number}] {line}")
+                try:
+                    tokens = shlex.split(line)
+                    # 允许直接粘贴带程序名的命令行
+                    if tokens and tokens[0] == "task-cli":
+                        tokens = tokens[1:]
+                    command_args = parser.parse_args(tokens)
+                except SystemExit:
+                    # argparse 已经把错误信息打印到标准错误
+                    failed += 1
+                    continue
+                except ValueError as e:
+                    print(f"❌ 无法解析: {e}")
+                    failed += 1
+                    continue
+                if command_args.command is None:
+                    print("❌ 缺少命令")
+                    failed += 1
+                    continue
+                if command_args.func in BATCH_EXCLUDED_COMMANDS:
+                    print(f"❌ {command_args.command} 不能在 batch 中使用")
+                    failed += 1
+                    continue
+                # 全局选项只对整个 batch 生效，写在单行中会被忽略，按错误处理
+                if command_args.metrics_file or command_args.memprofile:
+                    print("❌ --metrics-file 和 --memprofile 只能写在 batch 命令之前，不能用于单行命令")
+                    failed += 1
+                    continue
+                
+                command_args.manager = manager
+                if not command_args.func(command_args):
+                    failed += 1
+                    continue
+                executed += 1
+                if args.commit_every and executed % args.commit_every == 0:
+                    manager.save()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    
+    print(f"📦 批量执行完成: {executed} 条成功, {failed} 条失败")
+    return not failed
+
+
+# 长时间运行或会嵌套的命令不能在 batch 中执行
+BATCH_EXCLUDED_COMMANDS = {batch_command, watch_command, metrics_command, remind_command}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行解析器（batch 命令复用它解析每一行）"""
     parser = argparse.ArgumentParser(
         description="日常任务追踪器 - 命令行工具",
         usage="task-cli <command> [options]"
     )
     
+    parser.add_argument("--metrics-file", help="命令结束后将Prometheus格式的指标写入该文件")
+    parser.add_argument("--memprofile", action="store_true",
+                        help="用tracemalloc跟踪命令的内存，结束后在标准错误输出峰值、主要分配位置和每个任务的内存")
+    
     # 创建子命令解析器
     subparsers = parser.add_subparsers(dest="command", help="可用命令")
     
@@ -163,49 +718,154 @@ def main() -> None:
     add_parser = subparsers.add_parser("add", help="添加新任务")
     add_parser.add_argument("title", help="任务标题")
     add_parser.add_argument("-d", "--description", default="", help="任务描述")
-    add_parser.add_argument("-dd", "--due-date", help="截止日期 (格式: YYYY-MM-DD)")
+    add_parser.add_argument("-dd", "--due-date", help="截止日期 (格式: YYYY-MM-DD)；重复任务中为第一次发生的日期")
+    add_parser.add_argument("-r", "--repeat", metavar="RULE",
+                            help="重复规则，例如 FREQ=DAILY、FREQ=WEEKLY;BYDAY=MO,WE、FREQ=MONTHLY;BYMONTHDAY=1")
+    add_parser.add_argument("-p", "--priority", choices=["high", "medium", "low"], help="优先级 (默认不设置，按 medium 排序)")
+    add_parser.add_argument("--depends-on", type=parse_id_list, metavar="IDS", help="需要先完成的任务ID，逗号分隔")
     add_parser.set_defaults(func=add_task_command)
     
     # 列出任务命令
     list_parser = subparsers.add_parser("list", aliases=["ls"], help="列出所有任务")
     list_parser.add_argument("-s", "--status", choices=["pending", "in_progress", "completed"], help="按状态过滤任务")
     list_parser.add_argument("-q", "--search", help="搜索任务标题或描述")
+    list_parser.add_argument("--due-after", help="截止日期不早于 (YYYY-MM-DD)")
+    list_parser.add_argument("--due-before", help="截止日期不晚于 (YYYY-MM-DD)")
+    list_parser.add_argument("--created-after", help="创建时间不早于 (YYYY-MM-DD 或ISO时间)")
+    list_parser.add_argument("--created-before", help="创建时间不晚于 (YYYY-MM-DD 或ISO时间)")
+    list_parser.add_argument("--updated-after", help="更新时间不早于 (YYYY-MM-DD 或ISO时间)")
+    list_parser.add_argument("--updated-before", help="更新时间不晚于 (YYYY-MM-DD 或ISO时间)")
+    list_parser.add_argument("--sort", help="排序字段 (due_date, created_at, updated_at, title, status)，加后缀 :desc 表示降序")
+    list_parser.add_argument("--explain", action="store_true", help="打印查询计划")
+    add_pagination_arguments(list_parser)
+    add_format_argument(list_parser)
     list_parser.set_defaults(func=list_tasks_command)
     
     # 查看任务详情命令
     show_parser = subparsers.add_parser("show", help="查看任务详情")
-    show_parser.add_argument("id", type=int, help="任务ID")
+    show_parser.add_argument("id", help="任务ID")
+    add_format_argument(show_parser)
     show_parser.set_defaults(func=show_task_command)
     
     # 更新任务命令
     update_parser = subparsers.add_parser("update", aliases=["edit"], help="更新任务信息")
-    update_parser.add_argument("id", type=int, help="任务ID")
+    update_parser.add_argument("id", help="任务ID")
     update_parser.add_argument("-t", "--title", help="新的任务标题")
     update_parser.add_argument("-d", "--description", help="新的任务描述")
     update_parser.add_argument("-dd", "--due-date", help="新的截止日期 (格式: YYYY-MM-DD)")
     update_parser.add_argument("-s", "--status", choices=["pending", "in_progress", "completed"], help="新的任务状态")
+    update_parser.add_argument("-p", "--priority", choices=["high", "medium", "low"], help="新的优先级")
+    update_parser.add_argument("--depends-on", type=parse_id_list, metavar="IDS",
+                               help="新的依赖任务ID，逗号分隔；空字符串表示清除依赖")
     update_parser.set_defaults(func=update_task_command)
     
     # 删除任务命令
     delete_parser = subparsers.add_parser("delete", aliases=["rm"], help="删除任务")
-    delete_parser.add_argument("id", type=int, help="任务ID")
+    delete_parser.add_argument("id", help="任务ID")
     delete_parser.set_defaults(func=delete_task_command)
     
     # 标记任务为进行中命令
     in_progress_parser = subparsers.add_parser("start", help="标记任务为进行中")
-    in_progress_parser.add_argument("id", type=int, help="任务ID")
+    in_progress_parser.add_argument("id", help="任务ID")
     in_progress_parser.set_defaults(func=mark_in_progress_command)
     
     # 标记任务为已完成命令
     completed_parser = subparsers.add_parser("finish", help="标记任务为已完成")
-    completed_parser.add_argument("id", type=int, help="任务ID")
+    completed_parser.add_argument("id", help="任务ID")
     completed_parser.set_defaults(func=mark_completed_command)
     
     # 搜索任务命令
     search_parser = subparsers.add_parser("search", help="搜索任务")
     search_parser.add_argument("keyword", help="搜索关键词")
+    search_parser.add_argument("-E", "--regex", action="store_true", help="把关键词作为正则表达式（不区分大小写）")
+    search_parser.add_argument("-r", "--ranked", action="store_true", help="按相关度排序并容忍拼写错误 (默认返回前10个)")
+    add_pagination_arguments(search_parser)
+    add_format_argument(search_parser)
     search_parser.set_defaults(func=search_tasks_command)
     
+    # 议程命令
+    agenda_parser = subparsers.add_parser("agenda", help="显示已过期、今天截止和本周截止的任务")
+    agenda_parser.add_argument("--overdue", action="store_true", help="只显示已过期的任务")
+    agenda_parser.add_argument("--today", action="store_true", help="只显示今天截止的任务")
+    agenda_parser.add_argument("--week", action="store_true", help="只显示本周截止的任务")
+    agenda_parser.set_defaults(func=agenda_command)
+    
+    # 可以开始的任务命令
+    next_parser = subparsers.add_parser("next", help="按优先级、截止日期和创建时间列出最紧迫的可以开始的任务")
+    next_parser.add_argument("-n", "--limit", type=int, help="最多显示的任务数")
+    next_parser.set_defaults(func=next_command)
+    
+    # 关键路径命令
+    path_parser = subparsers.add_parser("path", help="显示任务的关键路径（最长的未完成依赖链）")
+    path_parser.add_argument("id", help="任务ID")
+    path_parser.set_defaults(func=path_command)
+    
+    # 同步命令
+    sync_parser = subparsers.add_parser("sync", help="与另一个任务存储双向同步")
+    sync_parser.add_argument("store", help="另一个存储的数据文件，或包含同名数据文件的目录")
+    # 取值由 sync_managers 校验（无效时报错），这里不为 choices 导入同步模块
+    sync_parser.add_argument("--prefer", metavar="{newest,local,remote}",
+                             help="冲突时以哪一方为准：newest 更新时间较新的一方，local 本地，remote 对方 (默认: 配置中的 sync_conflict)")
+    sync_parser.add_argument("--dry-run", action="store_true", help="只统计差异，不修改任何一方")
+    sync_parser.set_defaults(func=sync_command)
+    
+    # 归档命令
+    archive_parser = subparsers.add_parser("archive", help="把早先完成的任务移到压缩的归档分段")
+    archive_parser.add_argument("--completed-before", required=True, help="归档在该日期之前完成的任务 (格式: YYYY-MM-DD)")
+    archive_parser.set_defaults(func=archive_command)
+    
+    # 跟踪变更命令
+    watch_parser = subparsers.add_parser("watch", help="跟踪任务变更")
+    watch_parser.add_argument("--since", type=int, help="从该序号之后开始 (默认: 只显示新的变更)")
+    watch_parser.add_argument("--interval", type=float, default=1.0, help="轮询间隔秒数 (默认: 1)")
+    watch_parser.add_argument("--once", action="store_true", help="输出已有的变更后立即退出")
+    watch_parser.add_argument("--json", action="store_true", help="每行输出一条JSON格式的变更")
+    watch_parser.set_defaults(func=watch_command)
+    
+    # 增量导出命令
+    export_parser = subparsers.add_parser("export", help="以JSON Lines导出水位之后新增、修改和删除的任务")
+    export_parser.add_argument("--since", help="水位：时间 (YYYY-MM-DD 或ISO时间) 或变更序号 (默认: 水位文件中上次导出的位置)")
+    export_parser.add_argument("-o", "--output", help="写入文件而不是标准输出")
+    export_parser.add_argument("--watermark", metavar="FILE", help="水位文件 (默认: 数据文件旁的 .watermark.json)")
+    export_parser.set_defaults(func=export_command)
+    
+    # 统计命令
+    stats_parser = subparsers.add_parser("stats", help="显示任务统计")
+    stats_parser.add_argument("--days", type=int, default=7, help="按天统计完成数的天数 (默认: 7)")
+    stats_parser.add_argument("--weeks", type=int, default=4, help="按周统计完成数的周数 (默认: 4)")
+    stats_parser.set_defaults(func=stats_command)
+    
+    # 导出指标命令
+    metrics_parser = subparsers.add_parser("metrics", help="导出Prometheus格式的指标")
+    metrics_parser.add_argument("-o", "--output", help="写入指标文件而不是打印到标准输出")
+    metrics_parser.add_argument("--serve", type=int, metavar="PORT", help="在本地端口上提供 /metrics HTTP端点")
+    metrics_parser.add_argument("--host", default="127.0.0.1", help="HTTP端点监听地址 (默认: 127.0.0.1)")
+    metrics_parser.add_argument("--interval", type=float, default=15.0, help="HTTP模式下重新加载数据的间隔秒数")
+    metrics_parser.set_defaults(func=metrics_command)
+    
+    # 提醒命令
+    remind_parser = subparsers.add_parser("remind", help="常驻运行，在任务到期和过期时发出提醒")
+    remind_parser.add_argument("--log", action="append", metavar="FILE", help="把提醒以JSON行追加到文件 (可重复)")
+    remind_parser.add_argument("--fifo", action="append", metavar="PATH", help="把提醒以JSON行写入命名管道 (可重复)")
+    remind_parser.add_argument("--exec", action="append", metavar="CMD",
+                               help="提醒时运行命令，通过环境变量 TASK_REMINDER/TASK_ID/TASK_TITLE/TASK_DUE_DATE 传入 (可重复)")
+    remind_parser.add_argument("--interval", type=float, default=5.0, help="检查其他进程修改的间隔秒数 (默认: 5)")
+    remind_parser.set_defaults(func=remind_command)
+    
+    # 批量执行命令
+    batch_parser = subparsers.add_parser("batch", help="在一个进程中批量执行命令")
+    batch_parser.add_argument("file", nargs="?", help="命令文件，每行一条命令 (默认: 标准输入)")
+    batch_parser.add_argument("--commit-every", type=int, default=0, metavar="N",
+                              help="每执行N条命令保存一次 (默认: 全部执行完后保存一次)")
+    batch_parser.set_defaults(func=batch_command)
+    
+    return parser
+
+
+def main() -> None:
+    """主函数"""
+    parser = build_parser()
+    
     # 如果没有提供命令，显示帮助信息
     if len(sys.argv) == 1:
         parser.print_help()
@@ -213,7 +873,30 @@ def main() -> None:
     
     # 解析命令行参数并执行相应的函数
     args = parser.parse_args()
-    args.func(args)
+    # 只给了全局选项（例如 --metrics-file F）而没有子命令：显示帮助，按用法错误退出
+    if args.command is None:
+        parser.print_help(sys.stderr)
+        sys.exit(2)
+    try:
+        if args.memprofile:
+            from utils.memory import MemoryProfiler
+            with MemoryProfiler() as profiler:
+                succeeded = args.func(args)
+            print_memory_profile(profiler, getattr(args, "manager", None))
+        else:
+            succeeded = args.func(args)
+    except BrokenPipeError:
+        # 下游提前关闭了管道（例如 | head）：停止输出，把标准输出指向 /dev/null，
+        # 避免解释器退出时刷新缓冲区再次报错
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    
+    if args.metrics_file:
+        from utils.metrics import write_metrics_file
+        write_metrics_file(args.metrics_file)
+    if not succeeded:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -27,7 +27,14 @@ class Config:
             "default_status": "pending",
             "date_format": "YYYY-MM-DD",
             "auto_backup": False,
-            "backup_directory": "data/backups"
+            "backup_directory": "data/backups",
+            "storage": "json",
+            "data_format": "json",
+            "parallel_scan_threshold": 50000,
+            "sidecar_min_tasks": 1000,
+            "reminder_time": "09:00",
+            "sync_conflict": "newest",
+            "tenant_directory": "data/tenants"
         }
         self.config = self._load_config()
     
@@ -130,11 +137,16 @@ class Config:
         self.set(key, value)
 
 
-# 创建全局配置实例
-config = Config()
+def __getattr__(name: str) -> Any:
+    """全局配置实例 config 在第一次访问时才创建（创建时会读取、必要时写出 config.json），导入本模块没有磁盘I/O"""
+    if name == "config":
+        instance = globals()["config"] = Config()
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
+    config = Config()
     # 测试配置功能
     print("当前配置:")
     print(f"数据文件路径: {config['data_file']}")
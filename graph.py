@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器依赖图
+daily_task_tracker - graph.py
+功能：维护任务之间的依赖边和一个动态拓扑序，插入边时只在受影响的区间内检测环并调整顺序
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class DependencyGraph:
+    """
+    依赖图：边从前置任务指向依赖它的任务
+
+    同时维护一个拓扑序（每个节点一个序号，前置任务的序号总是更小）。插入一条边时如果序号已经
+    满足要求就是O(1)；否则只在两个端点序号之间的节点中向前、向后搜索（Pearce-Kelly 算法）：
+    向前搜索碰到前置任务说明出现环，否则把两次搜索到的节点重新分配它们原有的序号。
+    删除边不会破坏拓扑序，不需要调整。
+    """
+
+    def __init__(self):
+        # 任务ID -> 它依赖的任务ID
+        self._prerequisites: Dict[str, Set[str]] = {}
+        # 任务ID -> 依赖它的任务ID
+        self._dependents: Dict[str, Set[str]] = {}
+        # 任务ID -> 拓扑序号（只有参与边的节点才有序号）
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Tuple[str, Iterable[str]]]) -> "DependencyGraph":
+        """
+        全量构建（Kahn 算法求初始拓扑序，O(V+E)）
+
+        数据中已经存在的环不会报错，环上的节点排在最后，顺序任意。
+
+        Args:
+            edges: [(任务ID, 它依赖的任务ID)]
+        """
+        graph = cls()
+        for task_id, prerequisites in edges:
+            for prerequisite in prerequisites:
+                if prerequisite != task_id:
+                    graph._prerequisites.setdefault(task_id, set()).add(prerequisite)
+                    graph._dependents.setdefault(prerequisite, set()).add(task_id)
+        nodes = set(graph._prerequisites) | set(graph._dependents)
+        indegree = {node: len(graph._prerequisites.get(node, ())) for node in nodes}
+        queue = deque(sorted(node for node, degree in indegree.items() if degree == 0))
+        while queue:
+            node = queue.popleft()
+            graph._assign(node)
+            for dependent in graph._dependents.get(node, ()):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+        for node in sorted(nodes - set(graph._order)):
+            graph._assign(node)
+        return graph
+
+    def _assign(self, node: str) -> None:
+        self._order[node] = self._next_order
+        self._next_order += 1
+
+    def prerequisites(self, task_id: str) -> Set[str]:
+        """任务直接依赖的任务"""
+        return self._prerequisites.get(task_id, set())
+
+    def dependents(self, task_id: str) -> Set[str]:
+        """直接依赖该任务的任务"""
+        return self._dependents.get(task_id, set())
+
+    def add_edge(self, task_id: str, prerequisite: str) -> None:
+        """
+        添加依赖：task_id 依赖 prerequisite
+
+        Raises:
+            ValueError: 依赖自身，或添加后形成环
+        """
+        if task_id == prerequisite:
+            raise ValueError(f"任务 {task_id} 不能依赖自身")
+        if prerequisite in self._prerequisites.get(task_id, ()):
+            return
+        for node in (prerequisite, task_id):
+            if node not in self._order:
+                self._assign(node)
+        if self._order[prerequisite] > self._order[task_id]:
+            self._reorder(prerequisite, task_id, self._order[task_id], self._order[prerequisite])
+        self._prerequisites.setdefault(task_id, set()).add(prerequisite)
+        self._dependents.setdefault(prerequisite, set()).add(task_id)
+
+    def _reorder(self, prerequisite: str, task_id: str, lower: int, upper: int) -> None:
+        """在序号区间 [lower, upper] 内检测环并调整拓扑序"""
+        # 向前：从 task_id 沿"被依赖"方向，只访问序号不超过 upper 的节点
+        forward = self._search(task_id, self._dependents, lambda order: order <= upper, prerequisite)
+        # 向后：从 prerequisite 沿"依赖"方向，只访问序号不小于 lower 的节点
+        backward = self._search(prerequisite, self._prerequisites, lambda order: order >= lower, None)
+        affected = sorted(backward, key=self._order.__getitem__) + sorted(forward, key=self._order.__getitem__)
+        for node, order in zip(affected, sorted(self._order[node] for node in affected)):
+            self._order[node] = order
+
+    def _search(self, start: str, edges: Dict[str, Set[str]], in_range, target) -> List[str]:
+        """在序号区间内做深度优先搜索，碰到 target 时说明出现环"""
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbour in edges.get(node, ()):
+                if neighbour == target:
+                    raise ValueError(f"添加依赖会形成循环: {target} 已经间接依赖 {start}")
+                if neighbour not in visited and in_range(self._order[neighbour]):
+                    visited.add(neighbour)
+                    stack.append(neighbour)
+        return list(visited)
+
+    def remove_edge(self, task_id: str, prerequisite: str) -> None:
+        """删除依赖（拓扑序保持有效）"""
+        self._prerequisites.get(task_id, set()).discard(prerequisite)
+        self._dependents.get(prerequisite, set()).discard(task_id)
+
+    def set_prerequisites(self, task_id: str, prerequisites: Iterable[str]) -> None:
+        """
+        把任务的依赖替换为给定集合；出现环时撤销全部修改
+
+        Raises:
+            ValueError: 依赖自身，或会形成环
+        """
+        new = set(prerequisites)
+        old = set(self._prerequisites.get(task_id, ()))
+        for prerequisite in old - new:
+            self.remove_edge(task_id, prerequisite)
+        added = []
+        try:
+            for prerequisite in sorted(new - old):
+                self.add_edge(task_id, prerequisite)
+                added.append(prerequisite)
+        except ValueError:
+            for prerequisite in added:
+                self.remove_edge(task_id, prerequisite)
+            for prerequisite in old - new:
+                self.add_edge(task_id, prerequisite)
+            raise
+
+    def remove_node(self, task_id: str) -> None:
+        """删除任务的全部出边（它对其他任务的依赖）；其他任务对它的依赖保留，视为已满足"""
+        for prerequisite in self._prerequisites.pop(task_id, set()):
+            self._dependents.get(prerequisite, set()).discard(task_id)
+
+    def ancestors(self, task_id: str, follow) -> List[str]:
+        """
+        沿依赖方向可达的节点（包括自身），按拓扑序排列
+
+        Args:
+            task_id: 起点
+            follow: 判断是否继续沿某个前置任务展开的函数
+
+        Returns:
+            节点列表，前置任务在前
+        """
+        visited = {task_id}
+        stack = [task_id]
+        while stack:
+            for prerequisite in self._prerequisites.get(stack.pop(), ()):
+                if prerequisite not in visited and follow(prerequisite):
+                    visited.add(prerequisite)
+                    stack.append(prerequisite)
+        return sorted(visited, key=lambda node: self._order.get(node, -1))
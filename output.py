@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器输出格式
+daily_task_tracker - output.py
+功能：把任务以 json、ndjson、csv、tsv 格式分批编码后写入同一个缓冲输出，供脚本读取
+"""
+
+import csv
+import io
+import json
+import sys
+from itertools import islice
+from operator import attrgetter
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional
+
+
+FORMAT_TABLE = "table"
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMAT_TSV = "tsv"
+OUTPUT_FORMATS = (FORMAT_TABLE, FORMAT_JSON, FORMAT_NDJSON, FORMAT_CSV, FORMAT_TSV)
+
+# csv/tsv 的列（依赖的任务ID以逗号分隔写在一列中）
+CSV_FIELDS = ("id", "title", "description", "status", "priority", "due_date", "created_at", "updated_at",
+              "completed_at", "recurrence", "series_id", "depends_on")
+
+# 每累计多少个任务编码并写出一次
+DEFAULT_BATCH_ROWS = 512
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class TaskStreamWriter:
+    """
+    任务的流式输出
+
+    编码函数在创建时绑定一次（JSON编码器、csv写入器和字段取值器），任务按批编码后写入同一个二进制缓冲流，
+    每批之后刷新，因此下游提前关闭管道（例如 | head）时在下一批就会收到 BrokenPipeError，
+    不会继续读取和编码剩余的任务。时间字段原样输出存储中的ISO字符串，不做解析和格式化。
+    """
+
+    def __init__(self, output_format: str, stream: Optional[BinaryIO] = None,
+                 batch_rows: int = DEFAULT_BATCH_ROWS):
+        """
+        初始化输出
+
+        Args:
+            output_format: 输出格式 (json, ndjson, csv, tsv)
+            stream: 二进制输出流，默认为标准输出的缓冲区
+            batch_rows: 每批的任务数
+
+        Raises:
+            ValueError: 输出格式无效
+        """
+        if output_format not in OUTPUT_FORMATS or output_format == FORMAT_TABLE:
+            raise ValueError(f"无效的输出格式 {output_format}")
+        self.output_format = output_format
+        self.stream = stream if stream is not None else sys.stdout.buffer
+        self.batch_rows = batch_rows
+        if output_format in (FORMAT_JSON, FORMAT_NDJSON):
+            self._encode_batch = self._json_encoder()
+        else:
+            self._encode_batch = self._csv_encoder(self._dialect())
+
+    def _dialect(self) -> Any:
+        return csv.excel if self.output_format == FORMAT_CSV else csv.excel_tab
+
+    def _json_encoder(self) -> Callable[[List[Any]], str]:
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        separator = ",\n" if self.output_format == FORMAT_JSON else "\n"
+
+        def encode_batch(tasks: List[Any]) -> str:
+            return separator.join([encode(task.to_dict()) for task in tasks])
+        return encode_batch
+
+    @staticmethod
+    def _csv_encoder(dialect: Any) -> Callable[[List[Any]], str]:
+        buffer = io.StringIO()
+        writerows = csv.writer(buffer, dialect, lineterminator="\n").writerows
+        values = attrgetter(*CSV_FIELDS)
+        depends_on = CSV_FIELDS.index("depends_on")
+
+        def row(task: Any) -> List[Any]:
+            fields = list(values(task))
+            fields[depends_on] = ",".join(fields[depends_on])
+            return fields
+
+        def encode_batch(tasks: List[Any]) -> str:
+            buffer.seek(0)
+            buffer.truncate()
+            writerows([row(task) for task in tasks])
+            return buffer.getvalue()
+        return encode_batch
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text.encode("utf-8"))
+        self.stream.flush()
+
+    def write(self, tasks: Iterable[Any], single: bool = False) -> int:
+        """
+        写出任务
+
+        Args:
+            tasks: 任务（可以是生成器，按批读取）
+            single: 为True时只写出第一个任务；json 格式输出一个对象而不是数组
+
+        Returns:
+            写出的任务数
+
+        Raises:
+            BrokenPipeError: 下游已关闭（由调用方处理）
+        """
+        if single:
+            tasks = islice(tasks, 1)
+        if self.output_format == FORMAT_JSON and not single:
+            opening, separator, closing, empty = "[\n", ",\n", "\n]\n", "[]\n"
+        elif self.output_format in (FORMAT_JSON, FORMAT_NDJSON):
+            opening, separator, closing, empty = "", "\n", "\n", ""
+        else:
+            # 没有任务时仍输出表头
+            opening = empty = self._header()
+            separator = closing = ""
+
+        count = 0
+        pending = opening
+        for batch in _batches(tasks, self.batch_rows):
+            self._write(pending + self._encode_batch(batch))
+            pending = separator
+            count += len(batch)
+        if count:
+            self._write(closing)
+        elif empty:
+            self._write(empty)
+        return count
+
+    def _header(self) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, self._dialect(), lineterminator="\n").writerow(CSV_FIELDS)
+        return buffer.getvalue()
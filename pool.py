@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器多租户连接池
+daily_task_tracker - pool.py
+功能：按租户ID按需打开各自数据文件的TaskManager，按数量和估算内存做LRU淘汰，淘汰时保存未写出的修改
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    from .config import Config
+    from .task_manage import TaskManager
+    from .utils.metrics import record_cache_access, TENANT_EVICTIONS, TENANTS_OPEN, TENANT_POOL_BYTES
+except ImportError:
+    from config import Config
+    from task_manage import TaskManager
+    from utils.metrics import record_cache_access, TENANT_EVICTIONS, TENANTS_OPEN, TENANT_POOL_BYTES
+
+
+# 租户ID直接作为文件名，只允许字母、数字、下划线、连字符和点（不能以点开头）
+_TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]{0,127}$")
+
+# 内存估算：一个空的TaskManager约8KB，每个已加载任务（对象、字符串和各项索引）按2KB计
+MANAGER_BASE_BYTES = 8 * 1024
+TASK_BYTES = 2 * 1024
+
+
+def estimate_bytes(manager: TaskManager) -> int:
+    """
+    估算一个任务管理器占用的内存（O(1)，只按已加载的任务数计算）
+
+    这是固定系数的粗略估算（每个实例 MANAGER_BASE_BYTES 加每个任务 TASK_BYTES），不测量实际内存：
+    长标题、长描述或已建立全文索引的租户会被低估。需要实际数字时用 TaskManager.memory_report()
+    （遍历对象图，开销与任务数成正比，不适合在每次访问时调用）校准这两个系数或 max_bytes。
+    """
+    return MANAGER_BASE_BYTES + len(manager.tasks) * TASK_BYTES
+
+
+class TaskManagerPool:
+    """
+    多租户任务管理器池
+
+    每个租户对应 tenant_directory 下的一个数据文件 <租户ID>.json，第一次访问时打开，之后从池中直接返回，
+    省去每次请求重新读取配置、数据文件和索引的开销。池按最近使用排序，打开的租户数超过 max_tenants
+    或估算内存超过 max_bytes 时淘汰最久未使用的租户。
+
+    池本身是线程安全的；同一个 TaskManager 不是，同一租户的并发请求需要调用方自行串行化。
+
+    checkout() 在 with 块内固定租户，固定的租户不会被淘汰（池可能暂时超出上限，块结束时再淘汰）。
+    get() 返回的实例不固定，之后访问其他租户时可能被淘汰；淘汰时实例恢复自动保存，
+    之后通过旧实例的修改直接写入数据文件，不会在延迟写入模式下丢失。
+    """
+
+    def __init__(self, config_file: str = "config.json", max_tenants: int = 128,
+                 max_bytes: Optional[int] = None, write_behind: bool = False):
+        """
+        初始化任务管理器池
+
+        Args:
+            config_file: 配置文件路径（所有租户共用同一份配置，数据目录取自 tenant_directory）
+            max_tenants: 最多同时打开的租户数
+            max_bytes: 估算内存上限（字节，按 estimate_bytes 的固定系数估算，不是实测值），None表示不限制
+            write_behind: 为True时关闭各租户的自动保存，修改在淘汰、flush() 或 close() 时统一写出
+
+        Raises:
+            ValueError: max_tenants 小于1
+        """
+        if max_tenants < 1:
+            raise ValueError("max_tenants 必须至少为1")
+        self.config_file = config_file
+        self.directory = Config(config_file).get("tenant_directory", "data/tenants")
+        self.max_tenants = max_tenants
+        self.max_bytes = max_bytes
+        self.write_behind = write_behind
+        # 租户ID -> 任务管理器，按最近使用排序（最久未使用的在前）
+        self._managers: "OrderedDict[str, TaskManager]" = OrderedDict()
+        # 租户ID -> 上次访问时估算的内存
+        self._sizes: Dict[str, int] = {}
+        # 租户ID -> 正在使用（checkout 中）的次数
+        self._pins: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._managers)
+
+    def __contains__(self, tenant_id: str) -> bool:
+        return tenant_id in self._managers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._managers))
+
+    @property
+    def total_bytes(self) -> int:
+        """当前打开的租户的估算内存之和"""
+        return self._total_bytes
+
+    def data_file_for(self, tenant_id: str) -> str:
+        """
+        租户的数据文件路径
+
+        Raises:
+            ValueError: 租户ID包含路径分隔符等不允许的字符
+        """
+        if not isinstance(tenant_id, str) or not _TENANT_ID_PATTERN.match(tenant_id):
+            raise ValueError(f"无效的租户ID: {tenant_id!r}")
+        return os.path.join(self.directory, f"{tenant_id}.json")
+
+    def get(self, tenant_id: str) -> TaskManager:
+        """
+        获取租户的任务管理器，不在池中时打开它（可能淘汰其他租户）
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            任务管理器
+
+        Raises:
+            ValueError: 租户ID无效
+        """
+        return self._acquire(tenant_id, pin=False)
+
+    @contextmanager
+    def checkout(self, tenant_id: str) -> Iterator[TaskManager]:
+        """
+        在 with 块内使用租户的任务管理器，期间租户不会被淘汰
+
+        Args:
+            tenant_id: 租户ID
+
+        Raises:
+            ValueError: 租户ID无效
+        """
+        manager = self._acquire(tenant_id, pin=True)
+        try:
+            yield manager
+        finally:
+            with self._lock:
+                self._pins[tenant_id] -= 1
+                if not self._pins[tenant_id]:
+                    del self._pins[tenant_id]
+                self._evict_over_limit(keep=None)
+                self._update_metrics()
+
+    def _acquire(self, tenant_id: str, pin: bool) -> TaskManager:
+        """获取（必要时打开）租户的任务管理器；pin 为True时在淘汰之前固定该租户"""
+        data_file = self.data_file_for(tenant_id)
+        with self._lock:
+            manager = self._managers.get(tenant_id)
+            if manager is not None:
+                self.hits += 1
+                return self._touch(tenant_id, manager, hit=True, pin=pin)
+
+        # 在锁外打开：读取数据文件和建立索引期间不阻塞其他租户，包括已打开租户的命中
+        opened = TaskManager(self.config_file, data_file=data_file)
+        if self.write_behind:
+            opened.autosave = False
+        with self._lock:
+            self.misses += 1
+            # 双重检查：其他线程可能同时打开了同一个租户，使用先放入池中的实例，丢弃这里打开的
+            manager = self._managers.setdefault(tenant_id, opened)
+            return self._touch(tenant_id, manager, hit=False, pin=pin)
+
+    def _touch(self, tenant_id: str, manager: TaskManager, hit: bool, pin: bool) -> TaskManager:
+        """（持有池锁时调用）把租户标记为最近使用，需要时固定，重新估算内存并淘汰超限的租户"""
+        self._managers.move_to_end(tenant_id)
+        if pin:
+            self._pins[tenant_id] = self._pins.get(tenant_id, 0) + 1
+        record_cache_access("tenant_pool", hit)
+        # 上一次使用可能增减了任务，每次访问时重新估算
+        self._resize(tenant_id, estimate_bytes(manager))
+        self._evict_over_limit(keep=tenant_id)
+        self._update_metrics()
+        return manager
+
+    def _resize(self, tenant_id: str, size: int) -> None:
+        self._total_bytes += size - self._sizes.get(tenant_id, 0)
+        self._sizes[tenant_id] = size
+
+    def _over_limit(self) -> bool:
+        return (len(self._managers) > self.max_tenants
+                or (self.max_bytes is not None and self._total_bytes > self.max_bytes))
+
+    def _evict_over_limit(self, keep: Optional[str]) -> None:
+        """从最久未使用的租户开始淘汰，直到回到上限以内；刚访问的租户和固定的租户不淘汰"""
+        for tenant_id in list(self._managers):
+            if not self._over_limit():
+                return
+            if tenant_id != keep and tenant_id not in self._pins:
+                self._evict(tenant_id)
+
+    def _evict(self, tenant_id: str, closing: bool = False) -> bool:
+        """
+        保存并移除一个租户；保存失败时保留在池中，避免丢失修改（关闭池时不计入淘汰次数）
+
+        移除后实例恢复自动保存，调用方仍持有的实例之后的修改直接写入数据文件。
+        """
+        manager = self._managers[tenant_id]
+        if not manager.save():
+            print(f"保存租户 {tenant_id} 失败，暂不淘汰")
+            return False
+        manager.autosave = True
+        del self._managers[tenant_id]
+        self._total_bytes -= self._sizes.pop(tenant_id, 0)
+        if not closing:
+            self.evictions += 1
+            TENANT_EVICTIONS.inc()
+        return True
+
+    def evict(self, tenant_id: str) -> bool:
+        """
+        主动淘汰一个租户（例如租户被删除或迁移前）
+
+        Returns:
+            如果租户在池中、没有被固定并已保存移除返回True，否则返回False
+        """
+        with self._lock:
+            evicted = tenant_id in self._managers and tenant_id not in self._pins and self._evict(tenant_id)
+            self._update_metrics()
+            return evicted
+
+    def flush(self) -> List[str]:
+        """
+        保存所有有未写出修改的租户
+
+        Returns:
+            保存失败的租户ID
+        """
+        with self._lock:
+            return [tenant_id for tenant_id, manager in self._managers.items() if not manager.save()]
+
+    def close(self) -> List[str]:
+        """
+        保存并移除所有租户（固定的租户只保存，仍留在池中）
+
+        Returns:
+            保存失败或被固定（因此仍留在池中）的租户ID
+        """
+        with self._lock:
+            for tenant_id in list(self._managers):
+                if tenant_id in self._pins:
+                    self._managers[tenant_id].save()
+                else:
+                    self._evict(tenant_id, closing=True)
+            self._update_metrics()
+            return list(self._managers)
+
+    def stats(self) -> Dict[str, float]:
+        """池的命中、未命中、淘汰次数和当前规模"""
+        requests = self.hits + self.misses
+        return {
+            "tenants": len(self._managers),
+            "estimated_bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / requests if requests else 0.0
+        }
+
+    def _update_metrics(self) -> None:
+        TENANTS_OPEN.set(len(self._managers))
+        TENANT_POOL_BYTES.set(self._total_bytes)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器查询引擎
+daily_task_tracker - query.py
+功能：组合查询条件，根据索引选择度制定查询计划，求候选集交集，并用堆完成Top-K排序
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# 可排序字段；None 值总是排在最后
+SORTABLE_FIELDS = ("due_date", "created_at", "updated_at", "title", "status")
+# 按范围查询的有序索引字段
+RANGE_FIELDS = ("due_date", "created_at", "updated_at")
+# 只有当其他索引的候选集不超过驱动索引的这个倍数时才做交集，否则作为残余过滤条件
+INTERSECT_FACTOR = 4
+# 使范围上界 YYYY-MM-DD 包含当天所有时间点
+_END_OF_DAY = "\uffff"
+
+
+class SortedIndex:
+    """基于有序列表的二级索引，保存 (键, 任务ID)，支持增量维护和范围查询"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()):
+        self._entries: List[Tuple[str, str]] = sorted(entries)
+
+    @classmethod
+    def from_sorted(cls, entries: Iterable[Tuple[str, str]]) -> "SortedIndex":
+        """从已经按键排序的索引项构建（加载持久化的索引时使用），不再排序"""
+        index = cls()
+        index._entries = [tuple(entry) for entry in entries]
+        return index
+
+    def to_list(self) -> List[Tuple[str, str]]:
+        """按键顺序返回全部索引项，用于持久化"""
+        return list(self._entries)
+
+    def add(self, key: Optional[str], task_id: str) -> None:
+        """添加索引项，键为None时不索引"""
+        if key is not None:
+            insort(self._entries, (key, task_id))
+
+    def remove(self, key: Optional[str], task_id: str) -> None:
+        """删除索引项"""
+        if key is None:
+            return
+        i = bisect_left(self._entries, (key, task_id))
+        if i < len(self._entries) and self._entries[i] == (key, task_id):
+            del self._entries[i]
+
+    def _bounds(self, low: Optional[str], high: Optional[str]) -> Tuple[int, int]:
+        start = bisect_left(self._entries, (low,)) if low is not None else 0
+        stop = bisect_right(self._entries, (high, _END_OF_DAY)) if high is not None else len(self._entries)
+        return start, max(start, stop)
+
+    def count_range(self, low: Optional[str] = None, high: Optional[str] = None) -> int:
+        """统计键在 [low, high] 范围内的索引项数量，O(log n)"""
+        start, stop = self._bounds(low, high)
+        return stop - start
+
+    def range(self, low: Optional[str] = None, high: Optional[str] = None) -> List[str]:
+        """按键顺序返回键在 [low, high] 范围内的任务ID"""
+        start, stop = self._bounds(low, high)
+        return [task_id for _, task_id in self._entries[start:stop]]
+
+    def after(self, low: str) -> List[Tuple[str, str]]:
+        """按键顺序返回键严格大于 low 的索引项 (键, 任务ID)，O(log n + k)"""
+        return list(self._entries[bisect_right(self._entries, (low, _END_OF_DAY)):])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _inclusive_high(value: Optional[str]) -> Optional[str]:
+    """日期形式的上界扩展到当天结束，使 created_before=2025-12-01 包含当天创建的任务"""
+    if value is not None and len(value) == 10:
+        return value + _END_OF_DAY
+    return value
+
+
+class Query:
+    """组合查询条件"""
+
+    def __init__(self, status: Optional[str] = None, keyword: Optional[str] = None,
+                 due_after: Optional[str] = None, due_before: Optional[str] = None,
+                 created_after: Optional[str] = None, created_before: Optional[str] = None,
+                 updated_after: Optional[str] = None, updated_before: Optional[str] = None,
+                 sort: Optional[str] = None, limit: Optional[int] = None, offset: int = 0):
+        """
+        初始化查询
+
+        Args:
+            status: 任务状态
+            keyword: 标题或描述中的关键词（不区分大小写）
+            due_after/due_before: 截止日期范围（包含边界）
+            created_after/created_before: 创建时间范围（包含边界，可以只给日期）
+            updated_after/updated_before: 更新时间范围（包含边界，可以只给日期）
+            sort: 排序字段，前缀"-"或后缀":desc"表示降序，默认按创建时间升序
+            limit: 最多返回的任务数
+            offset: 跳过的任务数
+
+        Raises:
+            ValueError: 排序字段或分页参数无效
+        """
+        self.status = status
+        self.keyword = keyword.lower() if keyword else None
+        self.ranges: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for field, low, high in (("due_date", due_after, due_before),
+                                 ("created_at", created_after, created_before),
+                                 ("updated_at", updated_after, updated_before)):
+            if low is not None or high is not None:
+                self.ranges[field] = (low, _inclusive_high(high))
+
+        sort = sort or "created_at"
+        self.descending = sort.startswith("-") or sort.endswith(":desc")
+        self.sort_field = sort.lstrip("-").split(":", 1)[0]
+        if self.sort_field not in SORTABLE_FIELDS:
+            raise ValueError(f"无效的排序字段 {self.sort_field}，必须是 {', '.join(SORTABLE_FIELDS)} 之一")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit 和 offset 不能为负数")
+        self.limit = limit
+        self.offset = offset
+
+    def matches(self, task) -> bool:
+        """判断任务是否满足全部条件（用于全表扫描和残余过滤）"""
+        if self.status is not None and task.status != self.status:
+            return False
+        for field, (low, high) in self.ranges.items():
+            value = getattr(task, field)
+            if value is None or (low is not None and value < low) or (high is not None and value > high):
+                return False
+        if self.keyword is not None and self.keyword not in task.title.lower() \
+                and self.keyword not in task.description.lower():
+            return False
+        return True
+
+
+class QueryPlan:
+    """查询计划，记录驱动索引、交集索引、残余过滤条件和排序策略"""
+
+    def __init__(self, query: Query, total: int):
+        self.query = query
+        self.total = total
+        self.driver: Optional[str] = None
+        self.driver_rows = total
+        self.intersected: List[Tuple[str, int]] = []
+        self.residual: List[str] = []
+        self.candidate_ids: Optional[Set[str]] = None
+        self.archived_rows: Optional[int] = None
+        self.occurrence_rows: Optional[int] = None
+        self.result_rows: Optional[int] = None
+
+    @property
+    def sort_strategy(self) -> str:
+        """排序策略说明"""
+        if self.query.limit is not None:
+            return f"heap top-k (k={self.query.offset + self.query.limit})"
+        return "full sort"
+
+    def describe(self) -> List[str]:
+        """生成人类可读的计划说明"""
+        if self.driver is None:
+            lines = [f"扫描: 全表扫描 ({self.total} 行)"]
+        else:
+            lines = [f"驱动索引: {self.driver} (估计 {self.driver_rows}/{self.total} 行)"]
+        for name, rows in self.intersected:
+            lines.append(f"交集索引: {name} ({rows} 行)")
+        if self.candidate_ids is not None:
+            lines.append(f"候选集: {len(self.candidate_ids)} 行")
+        if self.residual:
+            lines.append(f"残余过滤: {', '.join(self.residual)}")
+        if self.archived_rows is not None:
+            lines.append(f"归档扫描: {self.archived_rows} 行")
+        if self.occurrence_rows:
+            lines.append(f"重复任务实例: {self.occurrence_rows} 行")
+        order = "降序" if self.query.descending else "升序"
+        lines.append(f"排序: {self.query.sort_field} {order}, {self.sort_strategy}")
+        if self.result_rows is not None:
+            lines.append(f"结果: {self.result_rows} 行")
+        return lines
+
+
+def plan_query(query: Query, total: int, status_index: Dict[str, Set[str]],
+               sorted_indexes: Dict[str, SortedIndex]) -> QueryPlan:
+    """
+    为查询选择最有选择性的索引作为驱动，并把足够小的其他索引候选集求交集
+
+    Args:
+        query: 查询条件
+        total: 任务总数
+        status_index: 状态 -> 任务ID集合
+        sorted_indexes: 字段 -> 有序索引
+
+    Returns:
+        查询计划
+    """
+    plan = QueryPlan(query, total)
+
+    # 估计每个可用索引的候选行数（状态索引为集合大小，范围索引为二分计数）
+    estimates: List[Tuple[int, str, Callable[[], Iterable[str]]]] = []
+    if query.status is not None:
+        ids = status_index.get(query.status, set())
+        estimates.append((len(ids), f"status={query.status}", lambda ids=ids: ids))
+    for field, (low, high) in query.ranges.items():
+        index = sorted_indexes[field]
+        rows = index.count_range(low, high)
+        estimates.append((rows, f"{field}[{low or ''}..{(high or '').rstrip(_END_OF_DAY)}]",
+                          lambda index=index, low=low, high=high: index.range(low, high)))
+    if query.keyword is not None:
+        plan.residual.append(f"keyword~{query.keyword}")
+
+    if not estimates:
+        return plan
+
+    estimates.sort(key=lambda item: item[0])
+    driver_rows, driver_name, driver_ids = estimates[0]
+    plan.driver = driver_name
+    plan.driver_rows = driver_rows
+    candidates = set(driver_ids())
+
+    for rows, name, ids in estimates[1:]:
+        if candidates and rows <= max(len(candidates), 1) * INTERSECT_FACTOR:
+            candidates &= set(ids())
+            plan.intersected.append((name, rows))
+        else:
+            plan.residual.append(name)
+
+    plan.candidate_ids = candidates
+    return plan
+
+
+def _sort_key(field: str, descending: bool) -> Callable:
+    """
+    None 值总是排在最后：升序时 (是否为None, 值)，降序时 (是否有值, 值) 配合 nlargest
+
+    值相同时再按 (创建时间, ID) 排序（降序时同样反向），顺序与候选集的迭代顺序无关，分页不会跳过或重复任务。
+    """
+    if descending:
+        return lambda task: (getattr(task, field) is not None, getattr(task, field) or "", task.created_at, task.id)
+    return lambda task: (getattr(task, field) is None, getattr(task, field) or "", task.created_at, task.id)
+
+
+def execute_plan(plan: QueryPlan, tasks_by_id: Dict, all_tasks: List,
+                 archived: Optional[List] = None, occurrences: Optional[List] = None) -> List:
+    """
+    执行查询计划：取候选集、应用全部条件、用堆取Top-K或全量排序
+
+    Args:
+        plan: 查询计划
+        tasks_by_id: 任务ID -> 任务
+        all_tasks: 所有任务（全表扫描时使用）
+        archived: 没有索引的归档任务，给出时全部扫描后与候选结果合并
+        occurrences: 按需展开的重复任务实例（没有索引），同样逐个校验后合并
+
+    Returns:
+        结果任务列表
+    """
+    query = plan.query
+    if plan.candidate_ids is None:
+        source = all_tasks
+    else:
+        # 候选集是集合，按ID排序后再取，结果与哈希种子无关
+        source = (tasks_by_id[task_id] for task_id in sorted(plan.candidate_ids))
+    # 交集已经保证了被交集的条件，这里统一再校验一次，保证正确性与索引无关
+    matched = [task for task in source if query.matches(task)]
+    if archived is not None:
+        plan.archived_rows = len(archived)
+        matched.extend(task for task in archived if query.matches(task))
+    if occurrences:
+        plan.occurrence_rows = len(occurrences)
+        matched.extend(task for task in occurrences if query.matches(task))
+
+    key = _sort_key(query.sort_field, query.descending)
+    if query.limit is not None:
+        k = query.offset + query.limit
+        if query.descending:
+            ordered = heapq.nlargest(k, matched, key=key)
+        else:
+            ordered = heapq.nsmallest(k, matched, key=key)
+    else:
+        ordered = sorted(matched, key=key, reverse=query.descending)
+
+    results = ordered[query.offset:]
+    plan.result_rows = len(results)
+    return results
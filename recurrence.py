@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器重复规则
+daily_task_tracker - recurrence.py
+功能：解析RRULE风格的重复规则子集（每天、每周的指定星期、每月的指定日期），并按日期窗口惰性展开发生日期
+"""
+
+import calendar
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+
+FREQ_DAILY = "DAILY"
+FREQ_WEEKLY = "WEEKLY"
+FREQ_MONTHLY = "MONTHLY"
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+def _parse_date(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"无效的{name} {value}，格式必须是 YYYY-MM-DD")
+
+
+def _ceil_to_multiple(value: int, step: int) -> int:
+    """不小于 value 的最小的 step 的倍数（value >= 0）"""
+    return -(-value // step) * step
+
+
+class Recurrence:
+    """
+    重复规则
+
+    规则写成 RRULE 风格的字符串，例如 ``FREQ=WEEKLY;BYDAY=MO,WE,FR;DTSTART=2025-01-06``：
+
+    - FREQ: DAILY、WEEKLY 或 MONTHLY
+    - INTERVAL: 每隔几个周期，默认为1
+    - BYDAY: WEEKLY 时的星期（MO..SU），默认为开始日期的星期
+    - BYMONTHDAY: MONTHLY 时的日期（1-31），默认为开始日期的日；没有该日的月份跳过
+    - DTSTART: 第一次发生的日期（YYYY-MM-DD）
+    - UNTIL: 最后可能发生的日期（包含）
+    """
+
+    def __init__(self, freq: str, start: str, interval: int = 1, weekdays: Optional[List[int]] = None,
+                 monthday: Optional[int] = None, until: Optional[str] = None):
+        """
+        初始化重复规则
+
+        Args:
+            freq: 重复频率 (DAILY, WEEKLY, MONTHLY)
+            start: 开始日期 (YYYY-MM-DD)
+            interval: 周期间隔
+            weekdays: 每周重复的星期（0为周一），仅 WEEKLY
+            monthday: 每月重复的日期，仅 MONTHLY
+            until: 结束日期 (YYYY-MM-DD)，包含
+
+        Raises:
+            ValueError: 规则无效
+        """
+        if freq not in (FREQ_DAILY, FREQ_WEEKLY, FREQ_MONTHLY):
+            raise ValueError(f"无效的重复频率 {freq}，必须是 {FREQ_DAILY}、{FREQ_WEEKLY} 或 {FREQ_MONTHLY} 之一")
+        if not isinstance(interval, int) or interval < 1:
+            raise ValueError("重复间隔必须是正整数")
+        self.freq = freq
+        self.start = _parse_date(start, "开始日期")
+        self.interval = interval
+        self.until = _parse_date(until, "结束日期") if until else None
+        self.weekdays: Tuple[int, ...] = ()
+        self.monthday: Optional[int] = None
+        if freq == FREQ_WEEKLY:
+            if weekdays and not all(0 <= day <= 6 for day in weekdays):
+                raise ValueError("星期必须在 0-6 之间")
+            self.weekdays = tuple(sorted(set(weekdays))) if weekdays else (self.start.weekday(),)
+        elif weekdays:
+            raise ValueError("BYDAY 只能用于 WEEKLY")
+        if freq == FREQ_MONTHLY:
+            self.monthday = monthday or self.start.day
+            if not 1 <= self.monthday <= 31:
+                raise ValueError("每月的日期必须在 1-31 之间")
+        elif monthday:
+            raise ValueError("BYMONTHDAY 只能用于 MONTHLY")
+
+    @classmethod
+    def parse(cls, rule: str, start: Optional[str] = None) -> "Recurrence":
+        """
+        解析规则字符串
+
+        Args:
+            rule: 规则字符串（键不区分大小写，可以带 RRULE: 前缀）
+            start: 规则中没有 DTSTART 时使用的开始日期
+
+        Returns:
+            重复规则
+
+        Raises:
+            ValueError: 规则无效
+        """
+        text = rule.strip()
+        if text.upper().startswith("RRULE:"):
+            text = text[len("RRULE:"):]
+        parts = {}
+        for part in filter(None, text.split(";")):
+            key, sep, value = part.partition("=")
+            if not sep or not value:
+                raise ValueError(f"无效的重复规则 {rule}")
+            parts[key.strip().upper()] = value.strip()
+
+        unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "BYMONTHDAY", "DTSTART", "UNTIL"}
+        if unknown:
+            raise ValueError(f"不支持的重复规则参数 {', '.join(sorted(unknown))}")
+        if "FREQ" not in parts:
+            raise ValueError(f"重复规则缺少 FREQ: {rule}")
+        start = parts.get("DTSTART", start)
+        if not start:
+            raise ValueError(f"重复规则缺少开始日期: {rule}")
+
+        weekdays = None
+        if "BYDAY" in parts:
+            try:
+                weekdays = [WEEKDAYS.index(day.strip().upper()) for day in parts["BYDAY"].split(",")]
+            except ValueError:
+                raise ValueError(f"无效的星期 {parts['BYDAY']}，必须是 {','.join(WEEKDAYS)} 中的值")
+        try:
+            interval = int(parts.get("INTERVAL", "1"))
+            monthday = int(parts["BYMONTHDAY"]) if "BYMONTHDAY" in parts else None
+        except ValueError:
+            raise ValueError(f"无效的重复规则 {rule}")
+        return cls(parts["FREQ"].upper(), start, interval, weekdays, monthday, parts.get("UNTIL"))
+
+    def __str__(self) -> str:
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.freq == FREQ_WEEKLY:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.weekdays))
+        if self.freq == FREQ_MONTHLY:
+            parts.append(f"BYMONTHDAY={self.monthday}")
+        parts.append(f"DTSTART={self.start.isoformat()}")
+        if self.until:
+            parts.append(f"UNTIL={self.until.isoformat()}")
+        return ";".join(parts)
+
+    def _candidates(self, first: date) -> Iterator[date]:
+        """从 first 所在的周期开始按时间顺序生成候选日期（可能早于 first 或开始日期，由调用方过滤）"""
+        if self.freq == FREQ_DAILY:
+            step = _ceil_to_multiple(max(0, (first - self.start).days), self.interval)
+            day = self.start + timedelta(days=step)
+            while True:
+                yield day
+                day += timedelta(days=self.interval)
+        elif self.freq == FREQ_WEEKLY:
+            week0 = self.start - timedelta(days=self.start.weekday())
+            week = _ceil_to_multiple(max(0, (first - week0).days // 7), self.interval)
+            while True:
+                monday = week0 + timedelta(weeks=week)
+                for weekday in self.weekdays:
+                    yield monday + timedelta(days=weekday)
+                week += self.interval
+        else:
+            month0 = self.start.year * 12 + self.start.month - 1
+            month = _ceil_to_multiple(max(0, first.year * 12 + first.month - 1 - month0), self.interval)
+            while True:
+                year, index = divmod(month0 + month, 12)
+                if self.monthday <= calendar.monthrange(year, index + 1)[1]:
+                    yield date(year, index + 1, self.monthday)
+                elif date(year, index + 1, 1) > max(first, self.start) + timedelta(days=366 * self.interval):
+                    # 每个间隔都至少有一个月包含该日期，走得太远说明已经越过任何可能的窗口
+                    return
+                month += self.interval
+
+    def occurrences(self, window_start: Optional[str] = None,
+                    window_end: Optional[str] = None) -> Iterator[str]:
+        """
+        惰性生成窗口内的发生日期，按时间顺序
+
+        只从窗口起点所在的周期开始推算，不会从开始日期逐个遍历。
+
+        Args:
+            window_start: 窗口起点 (YYYY-MM-DD)，包含；默认为开始日期
+            window_end: 窗口终点 (YYYY-MM-DD)，包含；默认不限（直到 UNTIL）
+
+        Yields:
+            发生日期 (YYYY-MM-DD)
+        """
+        first = max(self.start, date.fromisoformat(window_start)) if window_start else self.start
+        last = date.fromisoformat(window_end) if window_end else None
+        if self.until is not None and (last is None or self.until < last):
+            last = self.until
+        for day in self._candidates(first):
+            if last is not None and day > last:
+                return
+            if day >= first:
+                yield day.isoformat()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器提醒
+daily_task_tracker - reminders.py
+功能：用最小堆按触发时间保存未完成任务的到期和过期提醒，任务变化时增量调整，到时调用钩子（命令、FIFO、日志）
+"""
+
+import errno
+import heapq
+import json
+import os
+import shlex
+import subprocess
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    from .utils.metrics import REMINDERS_FIRED, REMINDERS_PENDING
+except ImportError:
+    from utils.metrics import REMINDERS_FIRED, REMINDERS_PENDING
+
+
+REMINDER_DUE = "due"
+REMINDER_OVERDUE = "overdue"
+
+
+class Reminder(NamedTuple):
+    """一次触发的提醒"""
+    kind: str
+    task_id: str
+    title: str
+    due_date: str
+    at: datetime
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"kind": self.kind, "id": self.task_id, "title": self.title,
+                "due_date": self.due_date, "at": self.at.isoformat()}
+
+
+class ReminderScheduler:
+    """
+    提醒调度器
+
+    每个未完成且有截止日期的任务对应两个提醒：截止当天 remind_at 时刻的"到期"和次日零点的"过期"。
+    提醒按触发时间放在最小堆中；任务变化时只压入新的条目（O(log n)），旧条目不从堆中删除，
+    而是通过版本号在弹出时识别并丢弃（惰性删除）。堆中失效条目过多时整体重建。
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.now, remind_at: time = time(9, 0)):
+        """
+        初始化提醒调度器
+
+        Args:
+            clock: 返回当前时间的函数（便于测试注入）
+            remind_at: 截止当天发出到期提醒的时刻
+        """
+        self.clock = clock
+        self.remind_at = remind_at
+        # (触发时间, 序号, 任务ID, 版本, 提醒类型)
+        self._heap: List[Tuple[datetime, int, str, int, str]] = []
+        # 任务ID -> (版本, 截止日期, 标题)，只包含需要提醒的任务
+        self._tasks: Dict[str, Tuple[int, str, str]] = {}
+        self._version = 0
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def _events(self, due_date: str) -> List[Tuple[datetime, str]]:
+        day = date.fromisoformat(due_date)
+        return [(datetime.combine(day, self.remind_at), REMINDER_DUE),
+                (datetime.combine(day + timedelta(days=1), time()), REMINDER_OVERDUE)]
+
+    def _push(self, fire_at: datetime, task_id: str, version: int, kind: str) -> None:
+        self._counter += 1
+        heapq.heappush(self._heap, (fire_at, self._counter, task_id, version, kind))
+
+    def schedule(self, task_id: str, title: str, due_date: Optional[str], status: str,
+                 catch_up: bool = True) -> None:
+        """
+        按任务的当前状态安排提醒（任务状态未变化时不做任何事）
+
+        Args:
+            task_id: 任务ID
+            title: 任务标题
+            due_date: 截止日期 (YYYY-MM-DD)
+            status: 任务状态，已完成的任务不提醒
+            catch_up: 为True时已经过去的提醒中最近的一个立即触发（例如截止日期被改到过去）；
+                为False时直接跳过（例如启动时加载已有任务）
+        """
+        current = self._tasks.get(task_id)
+        if status == "completed" or not due_date:
+            if current is not None:
+                del self._tasks[task_id]
+                self._compact()
+            return
+        if current is not None and current[1:] == (due_date, title):
+            return
+        try:
+            events = self._events(due_date)
+        except ValueError:
+            return
+
+        self._version += 1
+        self._tasks[task_id] = (self._version, due_date, title)
+        now = self.clock()
+        past = [event for event in events if event[0] <= now]
+        for fire_at, kind in events:
+            if fire_at > now:
+                self._push(fire_at, task_id, self._version, kind)
+        if catch_up and past:
+            fire_at, kind = past[-1]
+            self._push(fire_at, task_id, self._version, kind)
+        self._compact()
+
+    def unschedule(self, task_id: str) -> None:
+        """取消任务的提醒（惰性删除）"""
+        if self._tasks.pop(task_id, None) is not None:
+            self._compact()
+
+    def load(self, tasks: Iterable[Any]) -> None:
+        """加载已有任务；已经过去的提醒不再补发"""
+        for task in tasks:
+            self.schedule(task.id, task.title, task.due_date, task.status, catch_up=False)
+
+    def on_change(self, op: str, task: Any) -> None:
+        """任务变化回调（签名与 TaskManager.subscribe 一致）"""
+        if op == "delete":
+            self.unschedule(task.id)
+        else:
+            self.schedule(task.id, task.title, task.due_date, task.status)
+
+    def _valid(self, entry: Tuple[datetime, int, str, int, str]) -> bool:
+        current = self._tasks.get(entry[2])
+        return current is not None and current[0] == entry[3]
+
+    def _compact(self) -> None:
+        """失效条目超过有效条目的两倍时重建堆"""
+        if len(self._heap) > 2 * (2 * len(self._tasks) + 16):
+            self._heap = [entry for entry in self._heap if self._valid(entry)]
+            heapq.heapify(self._heap)
+        REMINDERS_PENDING.set(len(self._tasks))
+
+    def next_fire_time(self) -> Optional[datetime]:
+        """下一个有效提醒的触发时间，没有时返回None"""
+        while self._heap and not self._valid(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[Reminder]:
+        """
+        弹出所有到时的提醒
+
+        Args:
+            now: 当前时间，默认取自 clock
+
+        Returns:
+            按触发时间排序的提醒
+        """
+        now = now or self.clock()
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, _, task_id, version, kind = heapq.heappop(self._heap)
+            current = self._tasks.get(task_id)
+            if current is None or current[0] != version:
+                continue
+            fired.append(Reminder(kind, task_id, current[2], current[1], fire_at))
+            REMINDERS_FIRED.inc(kind=kind)
+        return fired
+
+
+class LogHook:
+    """把提醒以JSON行追加到日志文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, reminder: Reminder) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(reminder.to_dict(), ensure_ascii=False) + "\n")
+
+
+class FifoHook:
+    """把提醒以JSON行写入命名管道；没有读取方时丢弃，不阻塞"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, reminder: Reminder) -> None:
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                return
+            raise
+        try:
+            os.write(fd, (json.dumps(reminder.to_dict(), ensure_ascii=False) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+class CommandHook:
+    """运行命令（不经过shell），提醒内容通过环境变量 TASK_REMINDER、TASK_ID、TASK_TITLE、TASK_DUE_DATE 传入"""
+
+    def __init__(self, command: str, timeout: float = 30.0):
+        self.argv = shlex.split(command)
+        self.timeout = timeout
+
+    def __call__(self, reminder: Reminder) -> None:
+        env = dict(os.environ, TASK_REMINDER=reminder.kind, TASK_ID=reminder.task_id,
+                   TASK_TITLE=reminder.title, TASK_DUE_DATE=reminder.due_date)
+        subprocess.run(self.argv, env=env, timeout=self.timeout, check=False)
+
+
+class ReminderService:
+    """
+    常驻进程中的提醒服务：启动时从任务管理器加载，之后从变更日志增量获取其他进程的修改，
+    同一进程中的修改通过 TaskManager.subscribe 直接送达
+    """
+
+    def __init__(self, manager: Any, hooks: List[Callable[[Reminder], None]],
+                 scheduler: Optional[ReminderScheduler] = None):
+        """
+        初始化提醒服务
+
+        Args:
+            manager: 任务管理器
+            hooks: 提醒触发时依次调用的钩子
+            scheduler: 提醒调度器，默认新建
+        """
+        self.manager = manager
+        self.hooks = hooks
+        self.scheduler = scheduler if scheduler is not None else ReminderScheduler()
+        self.scheduler.load(manager.get_all_tasks())
+        manager.subscribe(self.scheduler.on_change)
+        self.seq = manager.seq
+        self._offset: Optional[int] = None
+
+    def _apply_external_changes(self) -> None:
+        """读取变更日志中新增的变更（只读新增的字节）"""
+        records, self._offset = self.manager.changes.read_since(self.seq, self._offset)
+        for record in records:
+            self.seq = record["seq"]
+            task = record.get("task")
+            if not task:
+                continue
+            if record["op"] == "delete":
+                self.scheduler.unschedule(record["id"])
+            else:
+                self.scheduler.schedule(record["id"], task.get("title", ""), task.get("due_date"),
+                                        task.get("status", "pending"))
+
+    def tick(self) -> List[Reminder]:
+        """
+        处理一轮：应用新的变更，触发到时的提醒
+
+        Returns:
+            本轮触发的提醒
+        """
+        self._apply_external_changes()
+        fired = self.scheduler.pop_due()
+        for reminder in fired:
+            for hook in self.hooks:
+                try:
+                    hook(reminder)
+                except (OSError, subprocess.SubprocessError) as e:
+                    print(f"提醒钩子执行失败 {hook.__class__.__name__}: {e}")
+        return fired
+
+    def seconds_until_next(self, limit: float) -> float:
+        """距离下一个提醒的秒数，不超过 limit（用于在两次检查变更之间休眠）"""
+        fire_at = self.scheduler.next_fire_time()
+        if fire_at is None:
+            return limit
+        return max(0.0, min(limit, (fire_at - self.scheduler.clock()).total_seconds()))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器并行扫描
+daily_task_tracker - scan.py
+功能：没有索引可用的谓词（正则、任意条件）在大数据量时拆分到多个进程中求值，并按原顺序合并结果
+"""
+
+import os
+import re
+import sys
+import threading
+from typing import Callable, List, Optional, Sequence
+
+try:
+    from .utils.metrics import PARALLEL_SCANS
+except ImportError:
+    from utils.metrics import PARALLEL_SCANS
+
+
+# 每个工作进程分到的块数，块越多负载越均衡，但进程间传输的次数也越多
+CHUNKS_PER_WORKER = 4
+
+# fork 方式启动的工作进程中由 _init_shared 设置为继承的任务列表，之后只需要传递下标范围；父进程中始终为空
+_shared_tasks: Sequence = ()
+
+
+class KeywordPredicate:
+    """标题或描述中包含关键词（不区分大小写）"""
+
+    def __init__(self, keyword: str):
+        self.keyword = keyword.lower()
+
+    def __call__(self, task) -> bool:
+        return self.keyword in task.title.lower() or self.keyword in task.description.lower()
+
+
+class RegexPredicate:
+    """标题或描述匹配正则表达式"""
+
+    def __init__(self, pattern: str, ignore_case: bool = True):
+        """
+        初始化正则谓词
+
+        Args:
+            pattern: 正则表达式
+            ignore_case: 是否忽略大小写
+
+        Raises:
+            ValueError: 正则表达式无效
+        """
+        try:
+            self.regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            raise ValueError(f"无效的正则表达式 {pattern}: {e}")
+
+    def __call__(self, task) -> bool:
+        return self.regex.search(task.title) is not None or self.regex.search(task.description) is not None
+
+
+def _init_shared(tasks: Sequence) -> None:
+    """工作进程初始化（fork）：进程创建时参数直接继承而不序列化，任务列表只属于这个进程池"""
+    global _shared_tasks
+    _shared_tasks = tasks
+
+
+def _scan_shared(predicate: Callable, start: int, stop: int) -> List[int]:
+    """工作进程中执行（fork）：返回继承的任务列表在 [start, stop) 内满足谓词的下标"""
+    tasks = _shared_tasks
+    return [i for i in range(start, stop) if predicate(tasks[i])]
+
+
+def _scan_chunk(predicate: Callable, start: int, tasks: Sequence) -> List[int]:
+    """工作进程中执行（spawn）：返回传入的任务块中满足谓词的下标"""
+    return [start + i for i, task in enumerate(tasks) if predicate(task)]
+
+
+def scan_serial(tasks: Sequence, predicate: Callable) -> List:
+    """在当前进程中顺序扫描"""
+    return [task for task in tasks if predicate(task)]
+
+
+def scan_parallel(tasks: Sequence, predicate: Callable, workers: Optional[int] = None) -> List:
+    """
+    把任务分块交给进程池求值谓词，按原顺序合并结果
+
+    支持 fork 的平台上工作进程直接继承任务列表，只传递下标范围；否则任务块要被序列化传输。
+    任务列表通过进程池的初始化参数交给工作进程，不经过父进程中的全局变量，多个线程可以同时扫描。
+    当前进程有其他线程时（例如多租户池、指标服务）fork 不安全，改用 forkserver/spawn 并传输任务块。
+    谓词总是要被序列化，因此必须是模块级可序列化的对象（例如 KeywordPredicate、RegexPredicate）。
+    进程池不可用时退回顺序扫描。
+
+    Args:
+        tasks: 任务序列
+        predicate: 谓词，接收任务返回布尔值
+        workers: 工作进程数，默认为CPU核数
+
+    Returns:
+        满足谓词的任务列表，保持原顺序
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) < 2:
+        return scan_serial(tasks, predicate)
+
+    size = max(1, -(-len(tasks) // (workers * CHUNKS_PER_WORKER)))
+    starts = list(range(0, len(tasks), size))
+    stops = [min(start + size, len(tasks)) for start in starts]
+    predicates = [predicate] * len(starts)
+    # 进程池只在真正并行扫描时才导入，避免拖慢每条命令的启动
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    methods = multiprocessing.get_all_start_methods()
+    fork = "fork" in methods and threading.active_count() == 1
+    try:
+        if fork:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                                           initializer=_init_shared, initargs=(tasks,))
+        else:
+            method = "forkserver" if "forkserver" in methods else "spawn"
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+        with executor:
+            # map 按提交顺序返回结果，合并后自然保持原顺序
+            if fork:
+                results = executor.map(_scan_shared, predicates, starts, stops)
+            else:
+                results = executor.map(_scan_chunk, predicates, starts,
+                                       [tasks[start:stop] for start, stop in zip(starts, stops)])
+            matched = [tasks[i] for hits in results for i in hits]
+    except (OSError, BrokenProcessPool) as e:
+        # 写到标准错误，不混入 --format json/ndjson/csv 等输出
+        print(f"并行扫描不可用，改为顺序扫描: {e}", file=sys.stderr)
+        return scan_serial(tasks, predicate)
+    PARALLEL_SCANS.inc()
+    return matched
+
+
+def scan(tasks: Sequence, predicate: Callable, threshold: Optional[int],
+         workers: Optional[int] = None) -> List:
+    """
+    扫描任务：数量达到阈值时并行，否则顺序
+
+    Args:
+        tasks: 任务序列
+        predicate: 谓词
+        threshold: 启用并行扫描的最小任务数，None或0表示从不并行
+        workers: 工作进程数
+
+    Returns:
+        满足谓词的任务列表，保持原顺序
+    """
+    if threshold and len(tasks) >= threshold:
+        return scan_parallel(tasks, predicate, workers)
+    return scan_serial(tasks, predicate)
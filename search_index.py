@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器全文检索
+daily_task_tracker - search_index.py
+功能：增量维护的倒排索引，按BM25对标题和描述打分（标题加权），通过删除邻域索引支持编辑距离为1的模糊匹配
+"""
+
+import heapq
+import math
+import re
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 标题命中相对于描述命中的权重
+TITLE_BOOST = 2.0
+# 模糊匹配到的词相对于精确匹配的权重
+FUZZY_WEIGHT = 0.5
+# 参与模糊匹配的最短词长，太短的词编辑距离为1的邻居太多
+FUZZY_MIN_LENGTH = 4
+
+_ASCII_WORD = re.compile(r"[a-z0-9]+")
+_CJK_RUN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词：ASCII字母数字按单词切分（小写），连续的汉字切成相邻二元组（单个汉字保留为一个词）
+
+    Args:
+        text: 文本
+
+    Returns:
+        词列表
+    """
+    text = text.lower()
+    tokens = _ASCII_WORD.findall(text)
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _deletions(term: str) -> Set[str]:
+    """删除一个字符得到的所有变体"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _fuzzy_eligible(term: str) -> bool:
+    return len(term) >= FUZZY_MIN_LENGTH and term.isascii()
+
+
+def _term_frequencies(tokens: Iterable[str]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+class SearchIndex:
+    """
+    倒排索引
+
+    每个词记录包含它的文档及在标题、描述中的词频；文档频率、文档数和字段总长度随 add/remove 增量维护，
+    打分时直接使用，不需要扫描文档。模糊匹配使用对称删除：词和它的所有单字符删除变体都作为键
+    指向该词，查询词及其删除变体命中的词与查询词相差一次插入、删除、替换或相邻字符换位。
+    """
+
+    def __init__(self):
+        # 词 -> {任务ID: (标题词频, 描述词频)}
+        self._postings: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        # 任务ID -> (标题词数, 描述词数, 该任务的全部词)
+        self._documents: Dict[str, Tuple[int, int, Tuple[str, ...]]] = {}
+        self._title_length_total = 0
+        self._description_length_total = 0
+        # 删除变体（及词本身）-> 词
+        self._neighbourhood: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @classmethod
+    def from_tasks(cls, tasks) -> "SearchIndex":
+        """从任务列表全量构建"""
+        index = cls()
+        for task in tasks:
+            index.add(task)
+        return index
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出索引状态，用于持久化"""
+        return {
+            "postings": self._postings,
+            "documents": self._documents,
+            "title_length_total": self._title_length_total,
+            "description_length_total": self._description_length_total,
+            "neighbourhood": self._neighbourhood
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchIndex":
+        """从持久化的状态恢复索引"""
+        index = cls()
+        index._postings = {term: {task_id: tuple(tf) for task_id, tf in postings.items()}
+                           for term, postings in data["postings"].items()}
+        index._documents = {task_id: (document[0], document[1], tuple(document[2]))
+                            for task_id, document in data["documents"].items()}
+        index._title_length_total = data["title_length_total"]
+        index._description_length_total = data["description_length_total"]
+        index._neighbourhood = {key: set(terms) for key, terms in data["neighbourhood"].items()}
+        return index
+
+    def add(self, task) -> None:
+        """加入任务的标题和描述"""
+        if task.id in self._documents:
+            self.remove(task)
+        title_tokens = tokenize(task.title)
+        description_tokens = tokenize(task.description)
+        title_tf = _term_frequencies(title_tokens)
+        description_tf = _term_frequencies(description_tokens)
+        terms = tuple(set(title_tf) | set(description_tf))
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if _fuzzy_eligible(term):
+                    for key in _deletions(term) | {term}:
+                        self._neighbourhood.setdefault(key, set()).add(term)
+            postings[task.id] = (title_tf.get(term, 0), description_tf.get(term, 0))
+
+        self._documents[task.id] = (len(title_tokens), len(description_tokens), terms)
+        self._title_length_total += len(title_tokens)
+        self._description_length_total += len(description_tokens)
+
+    def remove(self, task) -> None:
+        """移除任务（按ID，与当前字段值无关）"""
+        document = self._documents.pop(task.id, None)
+        if document is None:
+            return
+        title_length, description_length, terms = document
+        self._title_length_total -= title_length
+        self._description_length_total -= description_length
+        for term in terms:
+            postings = self._postings[term]
+            del postings[task.id]
+            if postings:
+                continue
+            del self._postings[term]
+            if _fuzzy_eligible(term):
+                for key in _deletions(term) | {term}:
+                    neighbours = self._neighbourhood[key]
+                    neighbours.discard(term)
+                    if not neighbours:
+                        del self._neighbourhood[key]
+
+    def _expand(self, term: str, fuzzy: bool) -> Dict[str, float]:
+        """查询词 -> {索引中的词: 权重}，精确匹配权重为1，编辑距离为1的词为 FUZZY_WEIGHT"""
+        expansions = {term: 1.0} if term in self._postings else {}
+        if fuzzy and _fuzzy_eligible(term):
+            for key in _deletions(term) | {term}:
+                for candidate in self._neighbourhood.get(key, ()):
+                    expansions.setdefault(candidate, FUZZY_WEIGHT)
+        return expansions
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Tuple[str, float]]:
+        """
+        BM25排序检索
+
+        Args:
+            query: 查询文本（按 tokenize 分词）
+            limit: 返回的最大结果数
+            fuzzy: 是否启用编辑距离为1的模糊匹配
+
+        Returns:
+            [(任务ID, 分数)]，按分数降序
+        """
+        count = len(self._documents)
+        if count == 0 or limit <= 0:
+            return []
+        average_title = self._title_length_total / count or 1.0
+        average_description = self._description_length_total / count or 1.0
+
+        scores: Dict[str, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            # 同一个查询词的多个扩展词对同一文档只取最高分，避免模糊变体重复累加
+            best: Dict[str, float] = {}
+            for candidate, weight in self._expand(term, fuzzy).items():
+                postings = self._postings[candidate]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for task_id, (title_tf, description_tf) in postings.items():
+                    title_length, description_length, _ = self._documents[task_id]
+                    score = 0.0
+                    if title_tf:
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * title_length / average_title)
+                        score += TITLE_BOOST * title_tf * (BM25_K1 + 1) / (title_tf + norm)
+                    if description_tf:
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * description_length / average_description)
+                        score += description_tf * (BM25_K1 + 1) / (description_tf + norm)
+                    score *= weight * idf
+                    if score > best.get(task_id, 0.0):
+                        best[task_id] = score
+            for task_id, score in best.items():
+                scores[task_id] = scores.get(task_id, 0.0) + score
+
+        # 堆选Top-K：O(n log k)，不对全部命中排序
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器派生文件
+daily_task_tracker - sidecar.py
+功能：读写数据文件旁的二进制派生文件（如持久化的索引），以数据文件的大小、修改时间和内容哈希判断是否过期
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from .utils.io_utils import ensure_directory, file_fingerprint, temp_path_for
+    from .utils.metrics import record_storage_io
+except ImportError:
+    from utils.io_utils import ensure_directory, file_fingerprint, temp_path_for
+    from utils.metrics import record_storage_io
+
+
+# 2: 索引文件中的Merkle树包含归档任务
+SIDECAR_VERSION = 2
+_HASH_BLOCK = 1 << 20
+# 修改时间的精度窗口：数据文件在标记写出前这段时间内被修改过时，同样大小和修改时间的改写无法通过 stat 区分
+_RACY_WINDOW_NS = 2 * 10 ** 9
+
+
+def content_hash(file_path: str) -> Optional[str]:
+    """
+    计算文件内容的SHA-256（分块读取）
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        十六进制摘要，如果文件无法读取则返回None
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def source_stamp(file_path: str, expected: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+    """
+    数据文件的完整标记：大小、纳秒级修改时间、内容哈希和标记时间
+
+    Args:
+        file_path: 数据文件路径
+        expected: 期望的数据文件指纹，给出时数据文件（在计算哈希前后）不是这个状态则返回None
+
+    Returns:
+        标记字典，如果文件无法读取或已变化则返回None
+    """
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is None or (expected is not None and fingerprint != expected):
+        return None
+    digest = content_hash(file_path)
+    if digest is None or file_fingerprint(file_path) != fingerprint:
+        return None
+    return {**fingerprint, "sha256": digest, "stamped_ns": time.time_ns()}
+
+
+def stamp_matches(stamp: Dict[str, Any], file_path: str) -> bool:
+    """
+    判断标记是否仍然对应数据文件
+
+    大小不同直接判为过期；大小和修改时间都相同、且标记写出时数据文件已经超过一个精度窗口没有修改时
+    直接认为有效（只需一次 stat）；其余情况（修改时间变化，或修改时间离标记太近、可能有同样大小的改写
+    落在同一个时间刻度内）计算内容哈希确认。
+    """
+    fingerprint = file_fingerprint(file_path)
+    if fingerprint is None or stamp.get("size") != fingerprint["size"]:
+        return False
+    if stamp.get("mtime_ns") == fingerprint["mtime_ns"] \
+            and stamp.get("stamped_ns", 0) - fingerprint["mtime_ns"] >= _RACY_WINDOW_NS:
+        return True
+    return stamp.get("sha256") is not None and stamp["sha256"] == content_hash(file_path)
+
+
+def write_sidecar(path: str, kind: str, source_file: str, payload: Any,
+                  source: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    写出派生文件：第一行是JSON头（类型、版本和数据文件标记），其后是 marshal 编码的内容
+
+    内容派生自先前读取的数据时，应传入读取之前记下的指纹（file_fingerprint）作为 source：
+    写出前发现数据文件已经不是这个状态时直接放弃。不传 source 时以写出时的数据文件为准。
+    两种情况下标记都包含数据文件的内容哈希。
+
+    Args:
+        path: 派生文件路径
+        kind: 派生文件类型，读取时校验
+        source_file: 派生自的数据文件
+        payload: 只包含基本类型（dict/list/tuple/set/str/int/float/None）的内容
+        source: 读取数据之前记下的数据文件指纹
+
+    Returns:
+        如果写入成功返回True，否则（包括数据文件已变化）返回False
+    """
+    stamp = source_stamp(source_file, source)
+    if stamp is None:
+        return False
+    header = json.dumps({"kind": kind, "version": SIDECAR_VERSION, "source": stamp}).encode("utf-8")
+    try:
+        body = marshal.dumps(payload)
+        ensure_directory(os.path.dirname(path))
+        temp_path = temp_path_for(path)
+        with open(temp_path, "wb") as f:
+            f.write(header + b"\n")
+            f.write(body)
+        os.replace(temp_path, path)
+    except (OSError, ValueError) as e:
+        print(f"写入派生文件失败 {path}: {e}")
+        return False
+    record_storage_io("write", len(header) + 1 + len(body))
+    return True
+
+
+def read_sidecar(path: str, kind: str, source_file: str) -> Optional[Any]:
+    """
+    读取派生文件；先只读取并校验头部，类型、版本或数据文件标记不符时不读取内容
+
+    Args:
+        path: 派生文件路径
+        kind: 期望的派生文件类型
+        source_file: 派生自的数据文件
+
+    Returns:
+        内容，如果文件不存在、已过期或已损坏则返回None
+    """
+    try:
+        with open(path, "rb") as f:
+            header_line = f.readline()
+            header = json.loads(header_line)
+            if not isinstance(header, dict) or header.get("kind") != kind \
+                    or header.get("version") != SIDECAR_VERSION \
+                    or not stamp_matches(header.get("source") or {}, source_file):
+                record_storage_io("read", len(header_line))
+                return None
+            body = f.read()
+        payload = marshal.loads(body)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    record_storage_io("read", len(header_line) + len(body))
+    return payload
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器统计
+daily_task_tracker - stats.py
+功能：随任务的增删改增量维护统计计数，使统计查询不需要扫描全部任务
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+
+STATS_VERSION = 1
+
+
+def _completion_time(task) -> Optional[str]:
+    """已完成任务的完成时间；旧数据没有 completed_at 时以最后更新时间近似"""
+    if task.status != "completed":
+        return None
+    return task.completed_at or task.updated_at
+
+
+def _duration_seconds(start: str, end: str) -> Optional[float]:
+    """计算两个ISO时间之间的秒数，无法解析时返回None"""
+    try:
+        return (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+def _week_key(day: date) -> str:
+    """ISO周编号，例如 2025-W50"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class TaskStats:
+    """
+    增量维护的任务统计
+
+    每个任务对统计的贡献由 add/remove 对称地加减，更新任务时先 remove 旧状态再 add 新状态。
+    过期数量依赖当天日期，按天缓存，只在日期变化时从未完成任务的截止日期直方图重新汇总。
+    """
+
+    def __init__(self):
+        self.status_counts: Counter = Counter()
+        # 未完成任务的截止日期直方图：截止日期 -> 任务数
+        self.open_due_dates: Counter = Counter()
+        # 每天完成的任务数：YYYY-MM-DD -> 任务数
+        self.completions_by_day: Counter = Counter()
+        self.completion_seconds_total = 0.0
+        self.completion_count = 0
+        self._overdue_cache: Optional[Tuple[str, int]] = None
+
+    def _apply(self, task, sign: int) -> None:
+        self.status_counts[task.status] += sign
+        if self.status_counts[task.status] <= 0:
+            del self.status_counts[task.status]
+
+        if task.status != "completed":
+            if task.due_date:
+                self.open_due_dates[task.due_date] += sign
+                if self.open_due_dates[task.due_date] <= 0:
+                    del self.open_due_dates[task.due_date]
+                if self._overdue_cache is not None and task.due_date < self._overdue_cache[0]:
+                    day, count = self._overdue_cache
+                    self._overdue_cache = (day, count + sign)
+            return
+
+        completed_at = _completion_time(task)
+        day = completed_at[:10]
+        self.completions_by_day[day] += sign
+        if self.completions_by_day[day] <= 0:
+            del self.completions_by_day[day]
+        duration = _duration_seconds(task.created_at, completed_at)
+        if duration is not None:
+            self.completion_seconds_total += sign * duration
+            self.completion_count += sign
+
+    def add(self, task) -> None:
+        """加入一个任务的贡献"""
+        self._apply(task, 1)
+
+    def remove(self, task) -> None:
+        """移除一个任务的贡献（必须在修改任务字段之前调用）"""
+        self._apply(task, -1)
+
+    @classmethod
+    def from_tasks(cls, tasks) -> "TaskStats":
+        """从任务列表全量构建统计"""
+        stats = cls()
+        for task in tasks:
+            stats.add(task)
+        return stats
+
+    @property
+    def total(self) -> int:
+        """任务总数"""
+        return sum(self.status_counts.values())
+
+    def overdue_count(self, today: Optional[str] = None) -> int:
+        """
+        过期未完成的任务数
+
+        Args:
+            today: 当天日期 (YYYY-MM-DD)，默认为今天
+
+        Returns:
+            截止日期早于今天且未完成的任务数
+        """
+        today = today or date.today().isoformat()
+        if self._overdue_cache is None or self._overdue_cache[0] != today:
+            count = sum(n for due_date, n in self.open_due_dates.items() if due_date < today)
+            self._overdue_cache = (today, count)
+        return self._overdue_cache[1]
+
+    def completions_per_day(self, days: int = 7, today: Optional[str] = None) -> List[Tuple[str, int]]:
+        """最近若干天每天完成的任务数（按日期升序）"""
+        end = date.fromisoformat(today) if today else date.today()
+        result = []
+        for offset in range(days - 1, -1, -1):
+            day = (end - timedelta(days=offset)).isoformat()
+            result.append((day, self.completions_by_day.get(day, 0)))
+        return result
+
+    def completions_per_week(self, weeks: int = 4, today: Optional[str] = None) -> List[Tuple[str, int]]:
+        """最近若干个ISO周每周完成的任务数（按周升序）"""
+        end = date.fromisoformat(today) if today else date.today()
+        monday = end - timedelta(days=end.weekday())
+        result = []
+        for offset in range(weeks - 1, -1, -1):
+            start = monday - timedelta(weeks=offset)
+            count = sum(self.completions_by_day.get((start + timedelta(days=i)).isoformat(), 0)
+                        for i in range(7))
+            result.append((_week_key(start), count))
+        return result
+
+    @property
+    def average_completion_seconds(self) -> Optional[float]:
+        """从创建到完成的平均耗时（秒），没有已完成任务时返回None"""
+        if self.completion_count <= 0:
+            return None
+        return self.completion_seconds_total / self.completion_count
+
+    def summary(self, today: Optional[str] = None, days: int = 7, weeks: int = 4) -> Dict[str, Any]:
+        """
+        生成统计摘要
+
+        Args:
+            today: 当天日期 (YYYY-MM-DD)，默认为今天
+            days: 按天统计完成数的天数
+            weeks: 按周统计完成数的周数
+
+        Returns:
+            统计摘要字典
+        """
+        return {
+            "total": self.total,
+            "by_status": dict(self.status_counts),
+            "overdue": self.overdue_count(today),
+            "completed_per_day": self.completions_per_day(days, today),
+            "completed_per_week": self.completions_per_week(weeks, today),
+            "average_completion_seconds": self.average_completion_seconds
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可持久化的字典"""
+        return {
+            "version": STATS_VERSION,
+            "status_counts": dict(self.status_counts),
+            "open_due_dates": dict(self.open_due_dates),
+            "completions_by_day": dict(self.completions_by_day),
+            "completion_seconds_total": self.completion_seconds_total,
+            "completion_count": self.completion_count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["TaskStats"]:
+        """从持久化的字典恢复统计，版本不符或格式无效时返回None"""
+        if not isinstance(data, dict) or data.get("version") != STATS_VERSION:
+            return None
+        try:
+            stats = cls()
+            stats.status_counts = Counter(data["status_counts"])
+            stats.open_due_dates = Counter(data["open_due_dates"])
+            stats.completions_by_day = Counter(data["completions_by_day"])
+            stats.completion_seconds_total = float(data["completion_seconds_total"])
+            stats.completion_count = int(data["completion_count"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return stats
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器存储后端
+daily_task_tracker - storage.py
+功能：抽象任务记录的持久化方式，支持单个JSON文件和按创建月份分区、带清单文件的多文件存储
+"""
+
+import os
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .utils.io_utils import read_json_file, write_json_file, write_rows_file, file_fingerprint
+except ImportError:
+    from utils.io_utils import read_json_file, write_json_file, write_rows_file, file_fingerprint
+
+
+STORAGE_JSON = "json"
+STORAGE_PARTITIONED = "partitioned"
+# 任务文件的写出格式：缩进的JSON对象列表，或带字段头的紧凑行格式（读取时自动识别）
+FORMAT_JSON = "json"
+FORMAT_ROWS = "rows"
+MANIFEST_VERSION = 1
+# 分区摘要中记录取值范围的字段；open_due 是未完成任务的截止日期
+SUMMARY_FIELDS = ("due_date", "created_at", "updated_at", "open_due")
+
+Span = Tuple[Optional[str], Optional[str]]
+
+
+def partition_key(created_at: Optional[str]) -> str:
+    """按创建时间的年月分区，例如 2025-12"""
+    return (created_at or "")[:7]
+
+
+def summarize_partition(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    计算分区摘要，用于在不读取分区文件的情况下判断查询是否需要它
+
+    Args:
+        records: 分区中的任务记录
+
+    Returns:
+        {"count": 任务数, "status_counts": 各状态任务数, "spans": {字段: [最小值, 最大值]},
+         "recurring": 重复任务定义和已物化实例的数量}
+    """
+    count = 0
+    recurring = 0
+    status_counts: Counter = Counter()
+    spans: Dict[str, List[str]] = {}
+
+    def extend(field: str, value: Optional[str]) -> None:
+        if not value:
+            return
+        span = spans.get(field)
+        if span is None:
+            spans[field] = [value, value]
+        elif value < span[0]:
+            span[0] = value
+        elif value > span[1]:
+            span[1] = value
+
+    for record in records:
+        count += 1
+        status = record.get("status", "pending")
+        status_counts[status] += 1
+        for field in ("due_date", "created_at", "updated_at"):
+            extend(field, record.get(field))
+        if status != "completed":
+            extend("open_due", record.get("due_date"))
+        if record.get("recurrence") or record.get("series_id"):
+            recurring += 1
+    return {"count": count, "status_counts": dict(status_counts), "spans": spans, "recurring": recurring}
+
+
+def write_records(file_path: str, records: List[Dict[str, Any]], data_format: str) -> bool:
+    """按指定格式写出任务记录"""
+    if data_format == FORMAT_ROWS:
+        return write_rows_file(file_path, records)
+    return write_json_file(file_path, records)
+
+
+def _overlaps(span: Optional[List[str]], low: Optional[str], high: Optional[str]) -> bool:
+    """分区中某字段的取值范围是否与 [low, high] 相交；分区中没有该字段的值时不相交"""
+    if not span:
+        return False
+    return (low is None or span[1] >= low) and (high is None or span[0] <= high)
+
+
+class JsonFileStorage:
+    """
+    单文件存储：全部任务保存在一个JSON列表中
+
+    整个文件视为键为空字符串的唯一分区，打开时一次性加载。
+    """
+
+    lazy = False
+
+    def __init__(self, data_file: str, data_format: str = FORMAT_JSON):
+        """
+        初始化单文件存储
+
+        Args:
+            data_file: 数据文件路径
+            data_format: 写出格式 (json, rows)
+        """
+        self.data_file = data_file
+        self.data_format = data_format
+
+    def refresh(self) -> None:
+        """重新读取存储元数据（单文件存储没有元数据）"""
+
+    def partition_of(self, created_at: Optional[str]) -> str:
+        return ""
+
+    def partitions(self) -> List[str]:
+        return [""]
+
+    def prune(self, status: Optional[str] = None,
+              ranges: Optional[Dict[str, Span]] = None) -> List[str]:
+        return [""]
+
+    def recurring_partitions(self) -> List[str]:
+        return [""]
+
+    def path_of(self, key: str) -> str:
+        return self.data_file
+
+    def read_partition(self, key: str) -> List[Dict[str, Any]]:
+        data = read_json_file(self.data_file)
+        return data if isinstance(data, list) else []
+
+    def write_partition(self, key: str, records: List[Dict[str, Any]]) -> bool:
+        return write_records(self.data_file, records, self.data_format)
+
+    def commit(self) -> bool:
+        return True
+
+    def fingerprint(self) -> Optional[Dict[str, int]]:
+        """用于判断派生文件（如统计）是否过期的存储指纹"""
+        return file_fingerprint(self.data_file)
+
+    def task_count(self) -> Optional[int]:
+        """不读取数据时已知的任务总数，单文件存储未知"""
+        return None
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.data_file) if os.path.exists(self.data_file) else 0
+
+
+class PartitionedStorage:
+    """
+    按创建月份分区的存储
+
+    每个分区是数据目录下的一个JSON列表文件 <stem>-YYYY-MM.json，清单文件 <stem>.manifest.json
+    记录每个分区的文件名和摘要（任务数、各状态任务数、各时间字段的取值范围）。
+    查询先用摘要排除不可能命中的分区，只读取剩下的分区；保存时只重写被修改的分区和清单。
+    """
+
+    lazy = True
+
+    def __init__(self, data_file: str, data_format: str = FORMAT_JSON):
+        """
+        初始化分区存储；清单不存在而旧的单文件数据存在时，把它按月拆分迁移过来（原文件保留不动）
+
+        Args:
+            data_file: 数据文件路径，分区文件和清单放在它所在的目录，并以它的文件名为前缀
+            data_format: 分区文件的写出格式 (json, rows)
+        """
+        self.data_file = data_file
+        self.data_format = data_format
+        self.directory = os.path.dirname(data_file)
+        self.stem = os.path.splitext(os.path.basename(data_file))[0]
+        self.manifest_file = os.path.join(self.directory, f"{self.stem}.manifest.json")
+        self.manifest: Dict[str, Any] = {}
+        self.refresh()
+        if not os.path.exists(self.manifest_file) and os.path.exists(data_file):
+            self._migrate(JsonFileStorage(data_file).read_partition(""))
+
+    def refresh(self) -> None:
+        """重新读取清单"""
+        data = read_json_file(self.manifest_file)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            data = {"version": MANIFEST_VERSION, "partitions": {}}
+        self.manifest = data
+
+    def _migrate(self, records: List[Dict[str, Any]]) -> None:
+        """把单文件数据按分区写出"""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            grouped.setdefault(self.partition_of(record.get("created_at")), []).append(record)
+        for key in sorted(grouped):
+            self.write_partition(key, grouped[key])
+        self.commit()
+
+    def partition_of(self, created_at: Optional[str]) -> str:
+        return partition_key(created_at)
+
+    def partitions(self) -> List[str]:
+        """所有分区的键，按时间升序"""
+        return sorted(self.manifest["partitions"])
+
+    def prune(self, status: Optional[str] = None,
+              ranges: Optional[Dict[str, Span]] = None) -> List[str]:
+        """
+        根据分区摘要选出可能包含匹配任务的分区
+
+        Args:
+            status: 任务状态，分区中没有该状态的任务时跳过
+            ranges: {字段: (下界, 上界)}，字段取自 SUMMARY_FIELDS，边界包含在内
+
+        Returns:
+            需要读取的分区键，按时间升序
+        """
+        keys = []
+        for key in self.partitions():
+            summary = self.manifest["partitions"][key]
+            if status is not None and not summary["status_counts"].get(status):
+                continue
+            if ranges and not all(_overlaps(summary["spans"].get(field), low, high)
+                                  for field, (low, high) in ranges.items() if field in SUMMARY_FIELDS):
+                continue
+            keys.append(key)
+        return keys
+
+    def recurring_partitions(self) -> List[str]:
+        """含有重复任务定义或已物化实例的分区（重复任务出现之前写出的摘要没有该计数，即为0）"""
+        return [key for key in self.partitions() if self.manifest["partitions"][key].get("recurring", 0)]
+
+    def path_of(self, key: str) -> str:
+        return os.path.join(self.directory, f"{self.stem}-{key}.json")
+
+    def read_partition(self, key: str) -> List[Dict[str, Any]]:
+        if key not in self.manifest["partitions"]:
+            return []
+        data = read_json_file(self.path_of(key))
+        return data if isinstance(data, list) else []
+
+    def write_partition(self, key: str, records: List[Dict[str, Any]]) -> bool:
+        """
+        重写一个分区并更新它在清单中的摘要（清单在 commit 时写出）；分区变空时删除文件
+
+        Returns:
+            如果写入成功返回True，否则返回False
+        """
+        path = self.path_of(key)
+        if not records:
+            self.manifest["partitions"].pop(key, None)
+            if os.path.exists(path):
+                os.remove(path)
+            return True
+        if not write_records(path, records, self.data_format):
+            return False
+        summary = summarize_partition(records)
+        summary["file"] = os.path.basename(path)
+        self.manifest["partitions"][key] = summary
+        return True
+
+    def commit(self) -> bool:
+        """写出清单"""
+        return write_json_file(self.manifest_file, self.manifest)
+
+    def fingerprint(self) -> Optional[Dict[str, int]]:
+        return file_fingerprint(self.manifest_file)
+
+    def task_count(self) -> Optional[int]:
+        return sum(summary["count"] for summary in self.manifest["partitions"].values())
+
+    def size_bytes(self) -> int:
+        paths = [self.path_of(key) for key in self.manifest["partitions"]] + [self.manifest_file]
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def open_storage(data_file: str, kind: str = STORAGE_JSON, data_format: str = FORMAT_JSON):
+    """
+    按配置打开存储后端
+
+    Args:
+        data_file: 数据文件路径
+        kind: 存储类型 (json, partitioned)
+        data_format: 任务文件的写出格式 (json, rows)；读取时总是按文件内容识别
+
+    Returns:
+        存储后端实例
+
+    Raises:
+        ValueError: 存储类型或写出格式无效
+    """
+    if data_format not in (FORMAT_JSON, FORMAT_ROWS):
+        raise ValueError(f"无效的数据格式 {data_format}，必须是 {FORMAT_JSON} 或 {FORMAT_ROWS} 之一")
+    if kind == STORAGE_JSON:
+        return JsonFileStorage(data_file, data_format)
+    if kind == STORAGE_PARTITIONED:
+        return PartitionedStorage(data_file, data_format)
+    raise ValueError(f"无效的存储类型 {kind}，必须是 {STORAGE_JSON} 或 {STORAGE_PARTITIONED} 之一")
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器并发压力测试
+daily_task_tracker - stress.py
+功能：启动多个进程、每个进程多个线程对同一个存储混合执行增删改查，结束后校验没有丢失的修改、
+重复的ID和损坏的文件，并报告吞吐量和尾延迟
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+try:
+    from .task_manage import TaskManager
+    from .utils.io_utils import read_json_file
+except ImportError:
+    from task_manage import TaskManager
+    from utils.io_utils import read_json_file
+
+
+# 操作及其权重
+OPERATION_MIX = (("add", 40), ("update", 30), ("delete", 10), ("read", 20))
+OPERATIONS = tuple(name for name, _ in OPERATION_MIX)
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """最近秩百分位数，没有数据时为0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def _worker(config_file: str, worker_id: str, operations: int, seed: int) -> Dict[str, Any]:
+    """
+    一个写入方：用自己的TaskManager执行随机操作，只修改和删除自己添加的任务，
+    因此每个任务的最终状态是确定的，记在账本中供结束后核对
+
+    Returns:
+        {"ledger": {任务ID: 期望的标题，已删除为None}, "latencies": {操作: [秒]},
+         "mutations": 修改次数, "errors": [错误]}
+    """
+    rng = random.Random(seed)
+    names, weights = zip(*OPERATION_MIX)
+    ledger: Dict[str, Optional[str]] = {}
+    live: List[str] = []
+    latencies: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+    errors: List[str] = []
+    mutations = 0
+    manager = TaskManager(config_file)
+    for n in range(operations):
+        op = rng.choices(names, weights)[0]
+        if not live:
+            op = "add"
+        title = f"{worker_id}#{n}"
+        start = time.perf_counter()
+        if op == "add":
+            task = manager.add_task(title)
+            ledger[task.id] = title
+            live.append(task.id)
+        elif op == "update":
+            task_id = rng.choice(live)
+            if manager.update_task(task_id, title=title) is None:
+                errors.append(f"{worker_id}: 更新时找不到自己添加的任务 {task_id}")
+            ledger[task_id] = title
+        elif op == "delete":
+            task_id = live.pop(rng.randrange(len(live)))
+            if not manager.delete_task(task_id):
+                errors.append(f"{worker_id}: 删除时找不到自己添加的任务 {task_id}")
+            ledger[task_id] = None
+        else:
+            # 不加锁地重新读取存储：写入方正在替换文件时也必须读到完整的数据
+            task_id = rng.choice(live)
+            manager.reload()
+            task = manager.get_task(task_id)
+            if task is None or task.title != ledger[task_id]:
+                errors.append(f"{worker_id}: 读取任务 {task_id} 得到 {task and task.title!r}，"
+                              f"期望 {ledger[task_id]!r}")
+        latencies[op].append(time.perf_counter() - start)
+        mutations += op != "read"
+    return {"ledger": ledger, "latencies": latencies, "mutations": mutations, "errors": errors}
+
+
+def _run_process(config_file: str, process_index: int, threads: int, operations: int,
+                 seed: int) -> List[Dict[str, Any]]:
+    """在一个进程中启动 threads 个写入线程，每个线程各自打开存储"""
+    results: List[Optional[Dict[str, Any]]] = [None] * threads
+
+    def run(thread_index: int) -> None:
+        worker_id = f"p{process_index}t{thread_index}"
+        try:
+            results[thread_index] = _worker(config_file, worker_id, operations,
+                                            seed * 1000 + process_index * 100 + thread_index)
+        except Exception as e:  # 异常本身就是要报告的问题
+            results[thread_index] = {"ledger": {}, "latencies": {}, "mutations": 0,
+                                     "errors": [f"{worker_id}: {type(e).__name__}: {e}"]}
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+class StressReport:
+    """一次压力测试的结果"""
+
+    def __init__(self, processes: int, threads: int, seconds: float,
+                 latencies: Dict[str, List[float]], errors: List[str]):
+        self.processes = processes
+        self.threads = threads
+        self.seconds = seconds
+        self.latencies = latencies
+        self.errors = errors
+
+    @property
+    def operations(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def throughput(self) -> float:
+        """每秒完成的操作数"""
+        return self.operations / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "processes": self.processes,
+            "threads": self.threads,
+            "operations": self.operations,
+            "seconds": round(self.seconds, 3),
+            "ops_per_second": round(self.throughput, 1),
+            "latency_ms": {
+                op: {**{f"p{q}": round(percentile(values, q) * 1000, 3) for q in PERCENTILES},
+                     "max": round(max(values, default=0.0) * 1000, 3), "count": len(values)}
+                for op, values in self.latencies.items()
+            },
+            "errors": self.errors
+        }
+
+    def format(self) -> str:
+        """人类可读的报告"""
+        lines = [f"{self.processes} 个进程 × {self.threads} 个线程，{self.operations} 次操作，"
+                 f"用时 {self.seconds:.2f} 秒，吞吐量 {self.throughput:.1f} 次/秒",
+                 f"{'操作':<8}{'次数':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}"]
+        for op, values in self.latencies.items():
+            lines.append(f"{op:<10}{len(values):>8}"
+                         + "".join(f"{percentile(values, q) * 1000:>10.2f}" for q in PERCENTILES)
+                         + f"{max(values, default=0.0) * 1000:>10.2f}")
+        if self.errors:
+            lines.append(f"❌ 发现 {len(self.errors)} 个问题:")
+            lines.extend(f"  - {error}" for error in self.errors[:20])
+        else:
+            lines.append("✅ 没有丢失的修改、重复的ID或损坏的文件")
+        return "\n".join(lines)
+
+
+def verify_store(config_file: str, ledgers: List[Dict[str, Optional[str]]], initial_ids: set,
+                 initial_seq: int, mutations: int) -> List[str]:
+    """
+    核对压力测试后的存储
+
+    Args:
+        config_file: 配置文件路径
+        ledgers: 各写入方的账本 {任务ID: 期望的标题，已删除为None}
+        initial_ids: 测试开始前已有的任务ID（不参与核对）
+        initial_seq: 测试开始前变更日志的最后序号
+        mutations: 各写入方完成的修改总数
+
+    Returns:
+        发现的问题，为空表示存储正确
+    """
+    errors: List[str] = []
+    manager = TaskManager(config_file)
+    records: List[Dict[str, Any]] = []
+    for key in manager.storage.partitions():
+        data = read_json_file(manager.storage.path_of(key))
+        if not isinstance(data, list):
+            errors.append(f"数据文件损坏: {manager.storage.path_of(key)}")
+            continue
+        records.extend(data)
+
+    counts = Counter(record.get("id") for record in records)
+    errors.extend(f"任务ID重复 {count} 次: {task_id}" for task_id, count in counts.items() if count > 1)
+
+    stored = {record.get("id"): record for record in records}
+    # 新打开的实例从快照和索引文件加载（任务数达到 sidecar_min_tasks 时），必须与数据文件一致
+    loaded = {task.id: task.to_dict() for task in manager.get_all_tasks()}
+    if loaded != stored:
+        errors.append("从快照或索引文件加载的任务与数据文件不一致")
+    expected: Dict[str, Optional[str]] = {}
+    for ledger in ledgers:
+        expected.update(ledger)
+    for task_id, title in expected.items():
+        record = stored.get(task_id)
+        if title is None and record is not None:
+            errors.append(f"已删除的任务又出现了: {task_id}")
+        elif title is not None and record is None:
+            errors.append(f"丢失的任务: {task_id} ({title})")
+        elif title is not None and record.get("title") != title:
+            errors.append(f"丢失的更新: {task_id} 为 {record.get('title')!r}，期望 {title!r}")
+    errors.extend(f"来历不明的任务: {task_id}" for task_id in stored.keys() - expected.keys() - initial_ids)
+
+    seqs = [change["seq"] for change in manager.changes.read_since(initial_seq)[0]]
+    if seqs != list(range(initial_seq + 1, initial_seq + 1 + mutations)):
+        errors.append(f"变更日志序号不连续或重复: 期望 {mutations} 条从 {initial_seq + 1} 开始的连续序号，"
+                      f"实际 {len(seqs)} 条")
+    return errors
+
+
+def seed_store(config_file: str, count: int) -> None:
+    """预先添加 count 个任务（一次保存），使存储达到 sidecar_min_tasks 时压力测试覆盖快照和索引文件"""
+    manager = TaskManager(config_file)
+    with manager.deferred_save():
+        for i in range(count):
+            manager.add_task(f"预置任务 {i}")
+
+
+def run_stress(config_file: str, processes: int = 4, threads: int = 4, operations: int = 100,
+               seed: int = 0) -> StressReport:
+    """
+    对配置指向的存储运行压力测试并核对结果
+
+    Args:
+        config_file: 配置文件路径（压力测试会修改其中的存储，应使用专门的测试存储）
+        processes: 进程数
+        threads: 每个进程的线程数
+        operations: 每个线程执行的操作数
+        seed: 随机种子
+
+    Returns:
+        测试报告
+    """
+    before = TaskManager(config_file)
+    initial_ids = {task.id for task in before.get_all_tasks()}
+    initial_seq = before.seq
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_run_process, config_file, i, threads, operations, seed)
+                   for i in range(processes)]
+        results = [result for future in futures for result in future.result()]
+    seconds = time.perf_counter() - start
+
+    latencies: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+    errors: List[str] = []
+    for result in results:
+        for op, values in result["latencies"].items():
+            latencies[op].extend(values)
+        errors.extend(result["errors"])
+    errors.extend(verify_store(config_file, [result["ledger"] for result in results], initial_ids,
+                               initial_seq, sum(result["mutations"] for result in results)))
+    return StressReport(processes, threads, seconds, latencies, errors)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="多进程多线程并发写入同一个存储的压力测试")
+    parser.add_argument("--processes", type=int, default=4, help="进程数（默认4）")
+    parser.add_argument("--threads", type=int, default=4, help="每个进程的线程数（默认4）")
+    parser.add_argument("--operations", type=int, default=100, help="每个线程的操作数（默认100）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--storage", choices=["json", "partitioned"], default="json", help="存储类型")
+    parser.add_argument("--data-format", choices=["json", "rows"], default="json", help="数据文件格式")
+    parser.add_argument("--initial-tasks", type=int, default=0, help="测试前预先添加的任务数")
+    parser.add_argument("--sidecar-min-tasks", type=int, help="写出快照和索引文件的最少任务数（默认沿用配置的默认值）")
+    parser.add_argument("--json", action="store_true", help="以JSON输出报告")
+    args = parser.parse_args(argv)
+
+    # 始终在临时目录中新建存储，不会修改真实数据
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = os.path.join(directory, "config.json")
+        settings = {"data_file": os.path.join(directory, "tasks.json"), "storage": args.storage,
+                    "data_format": args.data_format}
+        if args.sidecar_min_tasks is not None:
+            settings["sidecar_min_tasks"] = args.sidecar_min_tasks
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump(settings, f)
+        seed_store(config_file, args.initial_tasks)
+        report = run_stress(config_file, args.processes, args.threads, args.operations, args.seed)
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2) if args.json else report.format())
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
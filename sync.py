@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器同步
+daily_task_tracker - sync.py
+功能：用按任务ID哈希分桶的Merkle树比较两个任务存储，只展开哈希不同的子树，按更新时间和冲突策略双向合并，删除以墓碑传播
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from .utils.metrics import record_storage_io
+except ImportError:
+    from utils.metrics import record_storage_io
+
+
+# 冲突策略：更新时间较新的一方、本地或对方优先
+SYNC_NEWEST = "newest"
+SYNC_LOCAL = "local"
+SYNC_REMOTE = "remote"
+SYNC_POLICIES = (SYNC_NEWEST, SYNC_LOCAL, SYNC_REMOTE)
+
+# 树的每层按ID哈希的一个十六进制位分出16个子节点，叶子在第 TREE_DEPTH 层
+TREE_DEPTH = 3
+_HEX_DIGITS = "0123456789abcdef"
+
+# 同步状态：("live", 任务字典, 更新时间) 或 ("deleted", None, 删除时间)
+STATE_LIVE = "live"
+STATE_DELETED = "deleted"
+SyncState = Tuple[str, Optional[Dict[str, Any]], str]
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:16], "big")
+
+
+def state_digest(state: SyncState) -> int:
+    """同步状态的内容哈希（128位整数）"""
+    kind, record, stamp = state
+    if kind == STATE_LIVE:
+        return _digest(json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(",", ":")))
+    return _digest(f"{STATE_DELETED}:{stamp}")
+
+
+def bucket_of(task_id: str) -> str:
+    """任务所在的叶子桶：ID哈希的前 TREE_DEPTH 个十六进制位（使任意格式的ID均匀分布）"""
+    return hashlib.sha1(task_id.encode("utf-8")).hexdigest()[:TREE_DEPTH]
+
+
+class MerkleTree:
+    """
+    按ID哈希范围划分的Merkle树
+
+    叶子保存桶内每个任务的内容哈希，内部节点的值是子树中所有 (ID, 内容) 哈希的异或，
+    因此单个任务变化只需更新从叶子到根的 TREE_DEPTH + 1 个节点（O(1)），不必重算整棵树。
+    """
+
+    def __init__(self):
+        # 前缀 -> 子树中条目哈希的异或（缺省为0，即空子树）
+        self._nodes: Dict[str, int] = {}
+        # 叶子前缀 -> {任务ID: 内容哈希}
+        self._leaves: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(leaf) for leaf in self._leaves.values())
+
+    def _toggle(self, task_id: str, digest: int) -> None:
+        entry = digest ^ _digest(task_id)
+        bucket = bucket_of(task_id)
+        for depth in range(TREE_DEPTH + 1):
+            prefix = bucket[:depth]
+            self._nodes[prefix] = self._nodes.get(prefix, 0) ^ entry
+
+    def set(self, task_id: str, digest: int) -> None:
+        """设置任务的内容哈希（替换已有的值）"""
+        leaf = self._leaves.setdefault(bucket_of(task_id), {})
+        old = leaf.get(task_id)
+        if old == digest:
+            return
+        if old is not None:
+            self._toggle(task_id, old)
+        leaf[task_id] = digest
+        self._toggle(task_id, digest)
+
+    def discard(self, task_id: str) -> None:
+        """移除任务"""
+        old = self._leaves.get(bucket_of(task_id), {}).pop(task_id, None)
+        if old is not None:
+            self._toggle(task_id, old)
+
+    def node(self, prefix: str) -> int:
+        return self._nodes.get(prefix, 0)
+
+    def leaf(self, prefix: str) -> Dict[str, int]:
+        return self._leaves.get(prefix, {})
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """导出节点和叶子，用于持久化"""
+        return {"nodes": self._nodes, "leaves": self._leaves}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, Any]]) -> "MerkleTree":
+        """从持久化的节点和叶子恢复（不重新计算哈希）"""
+        tree = cls()
+        tree._nodes = dict(data["nodes"])
+        tree._leaves = {bucket: dict(entries) for bucket, entries in data["leaves"].items()}
+        return tree
+
+
+def diff_trees(local: MerkleTree, remote: MerkleTree) -> Tuple[List[str], int]:
+    """
+    找出两棵树中内容不同的任务ID
+
+    从根开始只展开哈希不同的节点，比较的节点数与差异的数量成正比。
+
+    Returns:
+        (不同的任务ID, 比较过的节点数)
+    """
+    differing: List[str] = []
+    compared = 0
+    stack = [""]
+    while stack:
+        prefix = stack.pop()
+        compared += 1
+        if local.node(prefix) == remote.node(prefix):
+            continue
+        if len(prefix) < TREE_DEPTH:
+            stack.extend(prefix + digit for digit in _HEX_DIGITS)
+            continue
+        ours, theirs = local.leaf(prefix), remote.leaf(prefix)
+        differing.extend(task_id for task_id in ours.keys() | theirs.keys()
+                         if ours.get(task_id) != theirs.get(task_id))
+    return sorted(differing), compared
+
+
+def resolve(local: Optional[SyncState], remote: Optional[SyncState], policy: str) -> Optional[str]:
+    """
+    决定一个任务以哪一方为准
+
+    Args:
+        local: 本地状态，不存在时为None
+        remote: 对方状态，不存在时为None
+        policy: 冲突策略 (newest, local, remote)
+
+    Returns:
+        "local" 或 "remote"；两边相同时返回None
+    """
+    if local == remote:
+        return None
+    if local is None:
+        return SYNC_REMOTE
+    if remote is None:
+        return SYNC_LOCAL
+    if policy in (SYNC_LOCAL, SYNC_REMOTE):
+        return policy
+    # 时间较新的一方为准；时间相同时删除优先，仍相同时按内容哈希决定，保证从哪一方发起结果都一样
+    local_key = (local[2], local[0] == STATE_DELETED, state_digest(local))
+    remote_key = (remote[2], remote[0] == STATE_DELETED, state_digest(remote))
+    return SYNC_LOCAL if local_key > remote_key else SYNC_REMOTE
+
+
+class SyncResult(NamedTuple):
+    """
+    一次同步的结果
+
+    没有共同祖先版本，两边都有（包括已删除）但内容不同的任务都算作冲突，由冲突策略决定。
+    """
+
+    pulled: int
+    pushed: int
+    conflicts: int
+    compared_nodes: int
+
+
+def sync_managers(local: Any, remote: Any, policy: str = SYNC_NEWEST, dry_run: bool = False) -> SyncResult:
+    """
+    双向同步两个任务管理器
+
+    两边的修改都在内存中完成后各自保存一次。两个存储的写锁按锁文件路径的顺序获取
+    （两个方向的同步同时进行时不会死锁），差异在持有写锁后才比较。
+
+    Args:
+        local: 本地任务管理器
+        remote: 对方任务管理器
+        policy: 冲突策略 (newest, local, remote)
+        dry_run: 为True时只统计差异，不修改任何一方
+
+    Returns:
+        同步结果
+
+    Raises:
+        ValueError: 冲突策略无效，或两边是同一个存储
+    """
+    if policy not in SYNC_POLICIES:
+        raise ValueError(f"无效的冲突策略 {policy}，必须是 {', '.join(SYNC_POLICIES)} 之一")
+    if os.path.abspath(local.lock_file) == os.path.abspath(remote.lock_file):
+        raise ValueError("不能与自身同步")
+    first, second = sorted((local, remote), key=lambda manager: os.path.abspath(manager.lock_file))
+    pulled = pushed = conflicts = 0
+    with first.deferred_save(), second.deferred_save():
+        differing, compared = diff_trees(local.merkle_tree(), remote.merkle_tree())
+        for task_id in differing:
+            ours, theirs = local.sync_state(task_id), remote.sync_state(task_id)
+            winner = resolve(ours, theirs, policy)
+            if winner is None:
+                continue
+            if ours is not None and theirs is not None:
+                conflicts += 1
+            if winner == SYNC_REMOTE:
+                pulled += 1
+                if not dry_run:
+                    local.apply_sync_state(task_id, theirs)
+            else:
+                pushed += 1
+                if not dry_run:
+                    remote.apply_sync_state(task_id, ours)
+    return SyncResult(pulled, pushed, conflicts, compared)
+
+
+class TombstoneLog:
+    """
+    追加写的删除记录（墓碑）
+
+    每行一条 {"id": 任务ID, "at": 删除时间}，同一任务以最后一行为准。同步时用它区分
+    "对方删除了"和"本地从未有过"，使删除能够传播而不是被另一方的副本恢复。
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def read(self) -> Dict[str, str]:
+        """读取全部墓碑 {任务ID: 删除时间}，文件不存在时为空"""
+        tombstones: Dict[str, str] = {}
+        if not os.path.exists(self.file_path):
+            return tombstones
+        size = 0
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                size += len(line)
+                try:
+                    record = json.loads(line)
+                    tombstones[record["id"]] = record["at"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+        record_storage_io("read", size)
+        return tombstones
+
+    def append(self, records: List[Dict[str, str]]) -> bool:
+        """
+        追加墓碑
+
+        Returns:
+            如果写入成功返回True，否则返回False
+        """
+        if not records:
+            return True
+        payload = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                          for record in records)
+        try:
+            directory = os.path.dirname(self.file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(payload)
+        except OSError as e:
+            print(f"写入删除记录失败 {self.file_path}: {e}")
+            return False
+        record_storage_io("write", len(payload.encode("utf-8")))
+        return True
@@ -3,39 +3,1760 @@
 """
 日常任务追踪器核心文件
 daily_task_tracker - task_manage.py
-功能：提供任务添加、查询、删除的基础函数
+功能：提供Task任务模型和TaskManager任务管理器，负责任务的添加、查询、更新、删除和持久化
 """
 
-def add_task(task_name):
-    """
-    添加新任务
-    :param task_name: 字符串，任务名称
-    :return: 无返回值，仅打印添加结果
-    """
-    print(f"✅ 成功添加任务：{task_name}")
-
-def query_task(task_id=None):
-    """
-    查询任务
-    :param task_id: 可选参数，整数，任务ID；若不传则查询所有任务
-    :return: 无返回值，仅打印查询结果
-    """
-    if task_id:
-        print(f"🔍 查询ID为 {task_id} 的任务：暂无具体数据（基础演示版）")
-    else:
-        print("🔍 查询所有任务：暂无具体数据（基础演示版）")
-
-def delete_task(task_id):
-    """
-    删除指定任务
-    :param task_id: 整数，任务ID
-    :return: 无返回值，仅打印删除结果
-    """
-    print(f"🗑️  成功删除ID为 {task_id} 的任务")
-
-# 可选：测试函数（方便本地验证功能，不影响GitHub提交）
-if __name__ == "__main__":
-    add_task("完成GitHub操作练习")
-    query_task(1)
-    query_task()
-    delete_task(1)
+import base64
+import binascii
+import json
+import os
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import wraps
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    from .config import Config
+    from .archive import ArchiveStore
+    from .changes import ChangeFeed
+    from .stats import TaskStats
+    from .views import AgendaViews, UrgencyQueue, urgency_key, week_end, VIEW_OVERDUE, VIEW_TODAY, VIEW_WEEK
+    from .search_index import SearchIndex
+    from .recurrence import Recurrence
+    from .graph import DependencyGraph
+    from .scan import KeywordPredicate, RegexPredicate, scan
+    from .query import Query, QueryPlan, SortedIndex, RANGE_FIELDS, plan_query, execute_plan
+    from .storage import open_storage, STORAGE_JSON, FORMAT_JSON
+    from .sidecar import read_sidecar, write_sidecar
+    from .sync import MerkleTree, TombstoneLog, state_digest, STATE_LIVE, STATE_DELETED
+    from .utils.date_utils import get_today_date, is_valid_date
+    from .utils.io_utils import read_json_file, write_json_file, backup_file, file_lock
+    from .utils.memory import deep_sizeof
+    from .utils.metrics import (timed, record_cache_access, INDEX_REBUILDS, STORE_TASKS, STORE_BYTES,
+                                 JOURNAL_ENTRIES, JOURNAL_SEQ, PARTITION_LOADS, ARCHIVED_TASKS)
+    from .utils.validation_utils import validate_task_data
+except ImportError:
+    from config import Config
+    from archive import ArchiveStore
+    from changes import ChangeFeed
+    from stats import TaskStats
+    from views import AgendaViews, UrgencyQueue, urgency_key, week_end, VIEW_OVERDUE, VIEW_TODAY, VIEW_WEEK
+    from search_index import SearchIndex
+    from recurrence import Recurrence
+    from graph import DependencyGraph
+    from scan import KeywordPredicate, RegexPredicate, scan
+    from query import Query, QueryPlan, SortedIndex, RANGE_FIELDS, plan_query, execute_plan
+    from storage import open_storage, STORAGE_JSON, FORMAT_JSON
+    from sidecar import read_sidecar, write_sidecar
+    from sync import MerkleTree, TombstoneLog, state_digest, STATE_LIVE, STATE_DELETED
+    from utils.date_utils import get_today_date, is_valid_date
+    from utils.io_utils import read_json_file, write_json_file, backup_file, file_lock
+    from utils.memory import deep_sizeof
+    from utils.metrics import (timed, record_cache_access, INDEX_REBUILDS, STORE_TASKS, STORE_BYTES,
+                               JOURNAL_ENTRIES, JOURNAL_SEQ, PARTITION_LOADS, ARCHIVED_TASKS)
+    from utils.validation_utils import validate_task_data
+
+
+# 允许通过 update 修改的字段
+UPDATABLE_FIELDS = ("title", "description", "due_date", "status", "depends_on", "priority")
+
+# Task.to_row / from_row 中字段的顺序
+TASK_FIELDS = ("id", "title", "description", "status", "due_date", "created_at", "updated_at", "completed_at",
+               "recurrence", "series_id", "depends_on", "priority")
+
+# 重复任务实例的ID：系列ID@发生日期
+OCCURRENCE_SEPARATOR = "@"
+
+# memory_report 中各项索引对应的属性
+MEMORY_INDEXES = (
+    ("by_id", ("_tasks_by_id",)),
+    ("status", ("_status_index",)),
+    ("sorted", ("_sorted_indexes",)),
+    ("agenda", ("_agenda",)),
+    ("stats", ("_stats",)),
+    ("recurrence", ("_series", "_occurrence_days")),
+    ("graph", ("_graph",)),
+    ("search", ("_search_index",)),
+    ("urgency", ("_urgency",)),
+    ("merkle", ("_merkle",)),
+)
+
+
+def occurrence_id(series_id: str, day: str) -> str:
+    """重复任务在某一天的实例ID"""
+    return f"{series_id}{OCCURRENCE_SEPARATOR}{day}"
+
+
+class Task:
+    """任务类"""
+
+    def __init__(self, title: str, description: str = "", due_date: Optional[str] = None,
+                 status: str = "pending", task_id: Optional[str] = None,
+                 created_at: Optional[str] = None, updated_at: Optional[str] = None,
+                 completed_at: Optional[str] = None, recurrence: Optional[str] = None,
+                 series_id: Optional[str] = None, depends_on: Optional[List[str]] = None,
+                 priority: Optional[str] = None):
+        """
+        初始化任务
+
+        Args:
+            title: 任务标题
+            description: 任务描述
+            due_date: 截止日期 (YYYY-MM-DD)，可以为None
+            status: 任务状态
+            task_id: 任务ID，默认生成新的UUID
+            created_at: 创建时间 (ISO格式)，默认为当前时间
+            updated_at: 更新时间 (ISO格式)，默认与创建时间相同
+            completed_at: 完成时间 (ISO格式)，仅已完成的任务有值
+            recurrence: 重复规则（见 Recurrence），仅重复任务的定义有值
+            series_id: 所属重复任务的ID，仅已物化的重复任务实例有值
+            depends_on: 该任务依赖的（需要先完成的）任务ID
+            priority: 优先级 (high, medium, low)，可以为None
+        """
+        self.id = task_id or str(uuid.uuid4())
+        self.title = title
+        self.description = description or ""
+        self.status = status
+        self.due_date = due_date
+        self.created_at = created_at or datetime.now().isoformat()
+        self.updated_at = updated_at or self.created_at
+        self.completed_at = completed_at
+        self.recurrence = recurrence
+        self.series_id = series_id
+        self.depends_on = list(depends_on) if depends_on else []
+        self.priority = priority
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为字典
+
+        Returns:
+            任务字典；completed_at、recurrence、series_id、depends_on 和 priority 只在有值时输出，保持普通任务的记录格式不变
+        """
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status,
+            "due_date": self.due_date,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+        if self.completed_at is not None:
+            data["completed_at"] = self.completed_at
+        if self.recurrence is not None:
+            data["recurrence"] = self.recurrence
+        if self.series_id is not None:
+            data["series_id"] = self.series_id
+        if self.depends_on:
+            data["depends_on"] = list(self.depends_on)
+        if self.priority is not None:
+            data["priority"] = self.priority
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Task":
+        """
+        从字典创建任务
+
+        Args:
+            data: 任务字典
+
+        Returns:
+            任务实例
+        """
+        return cls(
+            title=data["title"],
+            description=data.get("description", ""),
+            due_date=data.get("due_date"),
+            status=data.get("status", "pending"),
+            task_id=data.get("id"),
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at"),
+            completed_at=data.get("completed_at"),
+            recurrence=data.get("recurrence"),
+            series_id=data.get("series_id"),
+            depends_on=data.get("depends_on"),
+            priority=data.get("priority")
+        )
+
+    def to_row(self) -> Tuple[Optional[str], ...]:
+        """按 TASK_FIELDS 的顺序转换为元组"""
+        return (self.id, self.title, self.description, self.status, self.due_date,
+                self.created_at, self.updated_at, self.completed_at, self.recurrence, self.series_id,
+                self.depends_on, self.priority)
+
+    @classmethod
+    def from_row(cls, row: Tuple[Optional[str], ...]) -> "Task":
+        """
+        从 to_row 生成的元组创建任务（不经过 __init__ 的默认值处理，只用于读取自己写出的数据）
+
+        Args:
+            row: 任务元组
+
+        Returns:
+            任务实例
+        """
+        task = cls.__new__(cls)
+        (task.id, task.title, task.description, task.status, task.due_date,
+         task.created_at, task.updated_at, task.completed_at, task.recurrence, task.series_id,
+         task.depends_on, task.priority) = row
+        return task
+
+    def update(self, **kwargs: Any) -> None:
+        """
+        更新任务属性并刷新更新时间
+
+        Args:
+            kwargs: 要更新的字段，只接受 UPDATABLE_FIELDS 中的字段
+        """
+        now = datetime.now().isoformat()
+        if "status" in kwargs and kwargs["status"] != self.status:
+            self.completed_at = now if kwargs["status"] == "completed" else None
+        for key in UPDATABLE_FIELDS:
+            if key in kwargs:
+                setattr(self, key, kwargs[key])
+        self.updated_at = now
+
+    def __str__(self) -> str:
+        return f"[{self.status}] {self.title} (截止日期: {self.due_date or '无'})"
+
+    def __repr__(self) -> str:
+        return f"Task(id={self.id!r}, title={self.title!r}, status={self.status!r})"
+
+
+class TaskPage(NamedTuple):
+    """分页查询结果"""
+
+    tasks: List[Task]
+    next_cursor: Optional[str]
+
+
+def _encode_cursor(position: int, task_id: str) -> str:
+    """把存储位置和最后一个任务ID编码为不透明的游标"""
+    raw = json.dumps([position, task_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, str]:
+    """解码游标，无效时抛出ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position, task_id = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError(f"无效的游标: {cursor}")
+    if not isinstance(position, int) or position < 0 or not isinstance(task_id, str):
+        raise ValueError(f"无效的游标: {cursor}")
+    return position, task_id
+
+
+# 持久化索引文件和任务快照文件的类型标记
+INDEX_SIDECAR_KIND = "index"
+TASKS_SIDECAR_KIND = "tasks"
+SEARCH_SIDECAR_KIND = "search"
+
+
+def _exclusive(method: Callable) -> Callable:
+    """装饰器：在存储的写锁内执行修改操作（见 TaskManager.transaction）"""
+    @wraps(method)
+    def wrapper(self: "TaskManager", *args: Any, **kwargs: Any) -> Any:
+        with self.transaction():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class TaskManager:
+    """任务管理器，负责任务的增删改查和持久化"""
+
+    def __init__(self, config_file: str = "config.json", data_file: Optional[str] = None):
+        """
+        初始化任务管理器
+
+        Args:
+            config_file: 配置文件路径
+            data_file: 数据文件路径，默认使用配置中的 data_file（例如同步时打开另一个存储）
+        """
+        self.config = Config(config_file)
+        self.data_file = data_file or self.config.get("data_file")
+        self.stats_file = os.path.splitext(self.data_file)[0] + ".stats.json"
+        self.index_file = os.path.splitext(self.data_file)[0] + ".index"
+        self.snapshot_file = os.path.splitext(self.data_file)[0] + ".cache"
+        self.search_file = os.path.splitext(self.data_file)[0] + ".search"
+        # export 命令默认的水位文件
+        self.watermark_file = os.path.splitext(self.data_file)[0] + ".watermark.json"
+        self.storage = open_storage(self.data_file, self.config.get("storage", STORAGE_JSON),
+                                    self.config.get("data_format", FORMAT_JSON))
+        self.changes = ChangeFeed(os.path.splitext(self.data_file)[0] + ".changes.jsonl")
+        self.archive = ArchiveStore(os.path.splitext(self.data_file)[0] + ".archive")
+        self.tombstones = TombstoneLog(os.path.splitext(self.data_file)[0] + ".tombstones.jsonl")
+        # 多个进程（或同一进程中各自打开存储的线程）写同一个存储时用它互斥
+        self.lock_file = os.path.splitext(self.data_file)[0] + ".lock"
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        # 最近一次加载或保存后的存储指纹，用于发现其他写入方的修改
+        self._fingerprint: Optional[Dict[str, int]] = None
+        self.seq = 0
+        # 为False时修改只保留在内存中，直到调用 save()（见 deferred_save）
+        self.autosave = True
+        self._pending_changes: List[Dict[str, Any]] = []
+        # 已删除任务的墓碑（同步时才读取）和尚未写出的墓碑
+        self._tombstones: Optional[Dict[str, str]] = None
+        self._pending_tombstones: List[Dict[str, str]] = []
+        # 同一进程内的变更订阅者，见 subscribe
+        self._listeners: List[Callable[[str, Task], None]] = []
+        self.tasks: List[Task] = []
+        # 已加载到内存和有未保存修改的分区（单文件存储只有一个键为空字符串的分区）
+        self._loaded_partitions: Set[str] = set()
+        self._dirty_partitions: Set[str] = set()
+        self._tasks_by_id: Dict[str, Task] = {}
+        self._status_index: Dict[str, Set[str]] = {}
+        self._sorted_indexes: Dict[str, SortedIndex] = {}
+        # 重复任务的定义，以及每个系列已经物化的实例日期
+        self._series: Dict[str, Task] = {}
+        self._occurrence_days: Dict[str, Set[str]] = {}
+        # 任务之间的依赖（只包含已加载的任务）
+        self._graph = DependencyGraph()
+        self._stats = TaskStats()
+        self._agenda = AgendaViews()
+        # 全文检索索引在第一次排序检索时构建，之后随任务变化增量维护
+        self._search_index: Optional[SearchIndex] = None
+        # "下一步"优先队列在第一次查询时构建，之后随任务变化增量维护
+        self._urgency: Optional[UrgencyQueue] = None
+        # 同步用的Merkle树在第一次同步时构建，之后随任务变化增量维护
+        self._merkle: Optional[MerkleTree] = None
+        # 归档任务只在显式请求时才读取，读取后缓存
+        self._archived: Optional[List[Task]] = None
+        self._load_tasks()
+
+    @timed("load")
+    def _load_tasks(self) -> None:
+        """从存储加载任务；分区存储只读取清单，分区在查询需要时才加载"""
+        self.storage.refresh()
+        self.archive.refresh()
+        # 先记下序号和指纹再读取数据：读取期间有其他写入方保存时，下次事务会发现并重新加载
+        seq = self.changes.last_seq()
+        fingerprint = self.storage.fingerprint()
+        self.tasks = []
+        self._archived = None
+        self._loaded_partitions = set()
+        self._dirty_partitions = set()
+        self._pending_changes = []
+        self._tombstones = None
+        self._pending_tombstones = []
+        # 持久化的索引以读取之前的指纹为标记
+        self._fingerprint = fingerprint
+        if self.storage.lazy:
+            self._rebuild_indexes()
+        else:
+            self._ensure_partitions(self.storage.partitions(), rebuild=False)
+            if not self._restore_indexes():
+                self._rebuild_indexes()
+                self._save_indexes()
+
+        self._stats = self._load_stats()
+        if self._stats is None:
+            self._ensure_partitions(self.storage.partitions())
+            # 统计同时覆盖活跃任务和归档任务
+            self._stats = TaskStats.from_tasks(self.tasks + self._archived_tasks())
+            if self.storage.lazy:
+                # 持久化重建的统计，避免下次打开时再次加载全部分区
+                self._save_stats()
+        self.seq = seq
+        self._update_store_metrics()
+
+    def _load_stats(self) -> Optional[TaskStats]:
+        """读取持久化的统计，只有当它与存储的指纹一致时才使用"""
+        data = read_json_file(self.stats_file)
+        stats = None
+        if isinstance(data, dict) and data.get("fingerprint") == self.storage.fingerprint():
+            stats = TaskStats.from_dict(data.get("stats"))
+        record_cache_access("stats", stats is not None)
+        return stats
+
+    def _save_stats(self) -> None:
+        """持久化统计，并记录对应的存储指纹"""
+        write_json_file(self.stats_file, {
+            "fingerprint": self.storage.fingerprint(),
+            "stats": self._stats.to_dict()
+        })
+
+    def reload(self) -> None:
+        """重新从数据文件加载任务（用于常驻进程感知外部修改；未保存的修改会被丢弃）"""
+        self._load_tasks()
+
+    def _is_stale(self) -> bool:
+        """存储在本实例上次加载或保存之后是否被其他写入方修改过"""
+        self.storage.refresh()
+        return self.changes.last_seq() != self.seq or self.storage.fingerprint() != self._fingerprint
+
+    @contextmanager
+    def transaction(self) -> Iterator["TaskManager"]:
+        """
+        持有存储的写锁，在锁内先感知其他写入方的修改再执行修改
+
+        进入时如果存储已被其他进程修改且本实例没有未保存的修改，先重新加载，保证修改基于最新的数据，
+        保存时不会覆盖别人的修改；变更序号也在锁内分配，不会重复。可以嵌套，只有最外层加锁。
+        所有修改方法都自动在事务中执行；deferred_save 块整体是一个事务。
+
+        有未保存修改时（例如多租户池的延迟写入）不会重新加载，保存时以本实例为准。
+        """
+        with self._thread_lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._lock_depth -= 1
+                return
+            with file_lock(self.lock_file):
+                self._lock_depth = 1
+                try:
+                    if not self.dirty and self._is_stale():
+                        self._load_tasks()
+                    yield self
+                finally:
+                    self._lock_depth = 0
+
+    def _ensure_partitions(self, keys: Iterable[str], rebuild: bool = True) -> None:
+        """
+        加载尚未加载的分区并重建索引
+
+        Args:
+            keys: 需要的分区键
+            rebuild: 是否重建索引（初次加载时由调用方先尝试持久化的索引）
+        """
+        missing = sorted(set(keys) - self._loaded_partitions)
+        if not missing:
+            return
+        out_of_order = bool(self._loaded_partitions) and missing[0] < max(self._loaded_partitions)
+        for key in missing:
+            self.tasks.extend(self._read_partition(key))
+            self._loaded_partitions.add(key)
+        PARTITION_LOADS.inc(len(missing))
+        if out_of_order:
+            # 保持内存中的任务按分区排列（稳定排序，分区内保持存储顺序）
+            self.tasks.sort(key=lambda task: self.storage.partition_of(task.created_at))
+        if rebuild:
+            self._rebuild_indexes()
+
+    def _read_partition(self, key: str) -> List[Task]:
+        """
+        读取一个分区的任务；单文件存储优先使用与数据文件一致的二进制快照，
+        快照不存在或已过期时解析JSON并重新写出快照
+
+        Args:
+            key: 分区键
+
+        Returns:
+            任务列表
+        """
+        if self.storage.lazy:
+            return [Task.from_dict(item) for item in self.storage.read_partition(key)]
+        rows = read_sidecar(self.snapshot_file, TASKS_SIDECAR_KIND, self.data_file)
+        tasks = None
+        if isinstance(rows, list):
+            try:
+                tasks = [Task.from_row(row) for row in rows]
+            except (TypeError, ValueError):
+                tasks = None
+        record_cache_access("snapshot", tasks is not None)
+        if tasks is None:
+            # 先记下指纹再读取：解析期间其他写入方保存了修改时，快照以旧指纹为标记，不会被当作有效
+            fingerprint = self.storage.fingerprint()
+            tasks = [Task.from_dict(item) for item in self.storage.read_partition(key)]
+            self._save_snapshot(tasks, fingerprint)
+        return tasks
+
+    def _save_snapshot(self, tasks: List[Task], fingerprint: Optional[Dict[str, int]]) -> None:
+        """
+        把解析后的任务写成二进制快照（任务数达到 sidecar_min_tasks 时才写），数据文件仍是唯一的权威来源
+
+        Args:
+            tasks: 任务
+            fingerprint: 读取（或保存）这些任务时数据文件的指纹，数据文件已不是这个状态时不写出；
+                标记中另含数据文件的内容哈希，加载时同样按内容确认快照没有过期
+        """
+        if fingerprint is not None and self._sidecars_enabled(tasks):
+            write_sidecar(self.snapshot_file, TASKS_SIDECAR_KIND, self.data_file,
+                          [task.to_row() for task in tasks], source=fingerprint)
+
+    def _sidecars_enabled(self, tasks: List[Task]) -> bool:
+        """是否写出派生文件：仅单文件存储，且任务数达到 sidecar_min_tasks"""
+        return not self.storage.lazy and len(tasks) >= self.config.get("sidecar_min_tasks", 1000)
+
+    def _find_task(self, task_id: str) -> Optional[Task]:
+        """按ID查找任务；分区存储中从最新的分区开始逐个加载，直到找到为止"""
+        task = self._tasks_by_id.get(task_id)
+        if task is None and self.storage.lazy:
+            for key in reversed(self.storage.partitions()):
+                if key not in self._loaded_partitions:
+                    self._ensure_partitions([key])
+                    task = self._tasks_by_id.get(task_id)
+                    if task is not None:
+                        break
+        return task
+
+    def _archived_tasks(self) -> List[Task]:
+        """读取（并缓存）归档层中的任务"""
+        if self._archived is None:
+            self._archived = [Task.from_dict(item) for item in self.archive.read()]
+        return self._archived
+
+    def _archived_task(self, task_id: str) -> Optional[Task]:
+        """归档中的任务（不取回）；ID不在归档清单中时不读取分段"""
+        record = self.archive.find(task_id)
+        return Task.from_dict(record) if record else None
+
+    def _unarchive(self, task: Task) -> None:
+        """
+        把归档中的任务取回活跃存储（修改或删除归档任务时透明地调用，调用方已完成全部检查）
+
+        任务的统计贡献一直保留，这里只把它重新加入内存和索引，并标记所在分区待保存；
+        归档清单在 _save_tasks 写出活跃存储之后才更新。
+        """
+        self.archive.mark_restored(task.id)
+        self._ensure_partitions([self.storage.partition_of(task.created_at)])
+        self.tasks.append(task)
+        self._index_task(task)
+        self._dirty_partitions.add(self.storage.partition_of(task.created_at))
+        if self._archived is not None:
+            self._archived = [item for item in self._archived if item.id != task.id]
+
+    def _find_or_unarchive(self, task_id: str) -> Optional[Task]:
+        """活跃存储中的任务，不在其中时从归档中取回"""
+        task = self._find_task(task_id)
+        if task is None:
+            task = self._archived_task(task_id)
+            if task is not None:
+                self._unarchive(task)
+        return task
+
+    def _rebuild_indexes(self) -> None:
+        """全量重建ID索引、状态索引和各时间字段的有序索引"""
+        self._tasks_by_id = {task.id: task for task in self.tasks}
+        INDEX_REBUILDS.inc(index="id")
+
+        self._status_index = {}
+        for task in self.tasks:
+            self._status_index.setdefault(task.status, set()).add(task.id)
+        INDEX_REBUILDS.inc(index="status")
+
+        for field in RANGE_FIELDS:
+            self._sorted_indexes[field] = SortedIndex(
+                (getattr(task, field), task.id) for task in self.tasks if getattr(task, field) is not None)
+            INDEX_REBUILDS.inc(index=field)
+
+        self._agenda = AgendaViews.from_tasks(self.tasks)
+        INDEX_REBUILDS.inc(index="agenda")
+
+        self._rebuild_recurrences()
+        self._rebuild_graph()
+        self._search_index = None
+        self._urgency = None
+        self._merkle = None
+
+    def _rebuild_recurrences(self) -> None:
+        """重建重复任务定义和已物化实例的索引"""
+        self._series = {}
+        self._occurrence_days = {}
+        for task in self.tasks:
+            self._index_recurrence(task)
+
+    def _index_recurrence(self, task: Task) -> None:
+        if task.recurrence:
+            self._series[task.id] = task
+        if task.series_id:
+            day = task.id.rpartition(OCCURRENCE_SEPARATOR)[2]
+            self._occurrence_days.setdefault(task.series_id, set()).add(day)
+
+    def _unindex_recurrence(self, task: Task) -> None:
+        if task.recurrence:
+            self._series.pop(task.id, None)
+        if task.series_id:
+            self._occurrence_days.get(task.series_id, set()).discard(task.id.rpartition(OCCURRENCE_SEPARATOR)[2])
+
+    def _rebuild_graph(self) -> None:
+        """全量重建依赖图"""
+        self._graph = DependencyGraph.from_edges((task.id, task.depends_on) for task in self.tasks if task.depends_on)
+
+    def _link_dependencies(self, task: Task) -> None:
+        """把任务的依赖加入依赖图；调用方已检查过不会成环，外部修改造成的环不阻止加载，只是不加入图"""
+        try:
+            self._graph.set_prerequisites(task.id, task.depends_on)
+        except ValueError:
+            pass
+
+    def _restore_indexes(self) -> bool:
+        """
+        从持久化的索引文件恢复索引（仅单文件存储）
+
+        Returns:
+            如果索引文件存在、与数据文件一致且与已加载的任务对应则返回True，否则返回False
+        """
+        state = None if self.storage.lazy else read_sidecar(self.index_file, INDEX_SIDECAR_KIND, self.data_file)
+        restored = False
+        if isinstance(state, dict) and state.get("ids") == [task.id for task in self.tasks]:
+            try:
+                sorted_indexes = {field: SortedIndex.from_sorted(state["sorted"][field]) for field in RANGE_FIELDS}
+                agenda = AgendaViews.from_dict(state["agenda"])
+                search_index = SearchIndex.from_dict(state["search"]) if state["search"] is not None else None
+                merkle = MerkleTree.from_dict(state["merkle"]) if state.get("merkle") is not None else None
+                status_index = {status: set(ids) for status, ids in state["status"].items()}
+            except (KeyError, TypeError, ValueError, IndexError):
+                pass
+            else:
+                self._tasks_by_id = {task.id: task for task in self.tasks}
+                self._status_index = status_index
+                self._sorted_indexes = sorted_indexes
+                self._agenda = agenda
+                self._search_index = search_index
+                self._merkle = merkle
+                self._rebuild_recurrences()
+                self._rebuild_graph()
+                self._urgency = None
+                restored = True
+        record_cache_access("index", restored)
+        return restored
+
+    def _save_indexes(self) -> None:
+        """
+        把索引持久化到数据文件旁的索引文件（任务数达到 sidecar_min_tasks 时才写；分区存储只持久化全文索引）
+
+        索引对应本实例上次加载或保存时的数据，以当时记下的指纹为准，标记中另含数据文件的内容哈希；
+        有未保存的修改时索引与数据文件不一致，不写出；数据文件已被其他写入方替换时 write_sidecar 放弃写出。
+        """
+        if self.dirty or self._fingerprint is None:
+            return
+        if self.storage.lazy:
+            self._save_search_index()
+            return
+        if not self._sidecars_enabled(self.tasks):
+            return
+        write_sidecar(self.index_file, INDEX_SIDECAR_KIND, self.data_file, {
+            "ids": [task.id for task in self.tasks],
+            "status": {status: list(ids) for status, ids in self._status_index.items()},
+            "sorted": {field: self._sorted_indexes[field].to_list() for field in RANGE_FIELDS},
+            "agenda": self._agenda.to_dict(),
+            "search": self._search_index.to_dict() if self._search_index is not None else None,
+            "merkle": self._merkle.to_dict() if self._merkle is not None else None
+        }, source=self._fingerprint)
+
+    def _save_search_index(self) -> None:
+        """
+        分区存储中把全文索引持久化到单独的派生文件（已建立全文索引且任务数达到 sidecar_min_tasks 时才写）
+
+        以存储清单为标记：每次保存都会重写清单，清单不变即各分区不变。
+        """
+        if self._search_index is None or len(self.tasks) < self.config.get("sidecar_min_tasks", 1000):
+            return
+        write_sidecar(self.search_file, SEARCH_SIDECAR_KIND, self.storage.manifest_file, {
+            "ids": sorted(self._tasks_by_id),
+            "search": self._search_index.to_dict()
+        }, source=self._fingerprint)
+
+    def _restore_search_index(self) -> bool:
+        """
+        分区存储中从派生文件恢复全文索引（调用前已加载全部分区）
+
+        Returns:
+            如果派生文件存在、与清单一致且与已加载的任务对应则返回True，否则返回False
+        """
+        state = read_sidecar(self.search_file, SEARCH_SIDECAR_KIND, self.storage.manifest_file)
+        restored = False
+        if isinstance(state, dict) and state.get("ids") == sorted(self._tasks_by_id):
+            try:
+                self._search_index = SearchIndex.from_dict(state["search"])
+                restored = True
+            except (KeyError, TypeError, ValueError, IndexError):
+                pass
+        record_cache_access("search_index", restored)
+        return restored
+
+    def _index_task(self, task: Task) -> None:
+        """把任务的当前状态加入所有索引"""
+        self._tasks_by_id[task.id] = task
+        self._status_index.setdefault(task.status, set()).add(task.id)
+        for field in RANGE_FIELDS:
+            self._sorted_indexes[field].add(getattr(task, field), task.id)
+        self._agenda.add(task)
+        self._index_recurrence(task)
+        if task.depends_on:
+            self._link_dependencies(task)
+        if self._urgency is not None:
+            self._urgency.add(task)
+        if self._merkle is not None:
+            self._merkle.set(task.id, state_digest(self._live_state(task)))
+        if self._search_index is not None:
+            self._search_index.add(task)
+
+    def _unindex_task(self, task: Task) -> None:
+        """从所有索引中移除任务的当前状态（必须在修改任务字段之前调用）"""
+        self._tasks_by_id.pop(task.id, None)
+        self._status_index.get(task.status, set()).discard(task.id)
+        for field in RANGE_FIELDS:
+            self._sorted_indexes[field].remove(getattr(task, field), task.id)
+        self._agenda.remove(task)
+        self._unindex_recurrence(task)
+        self._graph.remove_node(task.id)
+        if self._urgency is not None:
+            self._urgency.remove(task)
+        if self._merkle is not None:
+            self._merkle.discard(task.id)
+        if self._search_index is not None:
+            self._search_index.remove(task)
+
+    @timed("save")
+    def _save_tasks(self) -> bool:
+        """
+        保存有修改的分区（单文件存储即整个数据文件），其余分区不重写
+
+        Returns:
+            如果保存成功返回True，否则返回False
+        """
+        saved = True
+        for key in sorted(self._dirty_partitions):
+            if self.config.get("auto_backup"):
+                backup_file(self.storage.path_of(key), self.config.get("backup_directory", "data/backups"))
+            records = [task.to_dict() for task in self.tasks
+                       if self.storage.partition_of(task.created_at) == key]
+            if self.storage.write_partition(key, records):
+                self._dirty_partitions.discard(key)
+            else:
+                saved = False
+        # 活跃存储写出之后才提交归档中的取回
+        saved = saved and self.storage.commit() and self.archive.save()
+        if saved:
+            self._fingerprint = self.storage.fingerprint()
+            self._save_stats()
+            if self.changes.append(self._pending_changes):
+                self._pending_changes = []
+            if self.tombstones.append(self._pending_tombstones):
+                self._pending_tombstones = []
+            self._save_snapshot(self.tasks, self._fingerprint)
+            self._save_indexes()
+        self._update_store_metrics()
+        return saved
+
+    def _commit(self) -> bool:
+        """一次修改完成后调用：自动保存开启时立即保存，否则留到 save()"""
+        return self._save_tasks() if self.autosave else True
+
+    @property
+    def dirty(self) -> bool:
+        """是否有尚未保存的修改"""
+        return bool(self._dirty_partitions or self._pending_changes or self._pending_tombstones or self.archive.dirty)
+
+    def save(self) -> bool:
+        """
+        保存所有尚未保存的修改
+
+        Returns:
+            如果保存成功（或没有需要保存的修改）返回True，否则返回False
+        """
+        if not self.dirty:
+            return True
+        with self.transaction():
+            return self._save_tasks()
+
+    @contextmanager
+    def deferred_save(self) -> Iterator["TaskManager"]:
+        """
+        在 with 块内关闭自动保存，块结束时（包括异常退出）统一保存一次
+
+        整个块在一个事务中执行（持有写锁）。块内可以调用 save() 提前提交一部分修改。
+        """
+        with self.transaction():
+            previous = self.autosave
+            self.autosave = False
+            try:
+                yield self
+            finally:
+                self.autosave = previous
+                self.save()
+
+    def _update_store_metrics(self) -> None:
+        """更新存储规模指标"""
+        count = self.storage.task_count()
+        STORE_TASKS.set(len(self.tasks) if count is None else count)
+        STORE_BYTES.set(self.storage.size_bytes())
+        ARCHIVED_TASKS.set(self.archive.count)
+        JOURNAL_SEQ.set(self.seq)
+        first_seq = self.changes.first_seq()
+        JOURNAL_ENTRIES.set(self.seq - first_seq + 1 if first_seq else 0)
+
+    def _record_change(self, op: str, task: Task) -> None:
+        """
+        为一次变更分配下一个序号并标记任务所在的分区，在下次保存数据后追加到变更日志
+
+        Args:
+            op: 变更类型 (add, update, delete)
+            task: 变更后的任务（删除时为被删除的任务）
+        """
+        self.seq += 1
+        self._dirty_partitions.add(self.storage.partition_of(task.created_at))
+        self._pending_changes.append({
+            "seq": self.seq,
+            "op": op,
+            "id": task.id,
+            "at": datetime.now().isoformat(),
+            "task": task.to_dict()
+        })
+        for listener in self._listeners:
+            listener(op, task)
+
+    def subscribe(self, listener: Callable[[str, Task], None]) -> None:
+        """
+        订阅本进程内的任务变更（其他进程的变更通过变更日志获取）
+
+        Args:
+            listener: 回调，参数为变更类型 (add, update, delete) 和变更后的任务
+        """
+        self._listeners.append(listener)
+
+    @staticmethod
+    def _validate(title: str, description: Optional[str] = None, due_date: Optional[str] = None,
+                  status: Optional[str] = None, priority: Optional[str] = None) -> None:
+        """验证任务数据，无效时抛出ValueError"""
+        errors = validate_task_data(title, description, due_date, status, priority)
+        if errors:
+            raise ValueError("; ".join(message for messages in errors.values() for message in messages))
+
+    @timed("add_task")
+    @_exclusive
+    def add_task(self, title: str, description: str = "", due_date: Optional[str] = None,
+                 status: Optional[str] = None, recurrence: Optional[str] = None,
+                 depends_on: Optional[List[str]] = None, priority: Optional[str] = None) -> Task:
+        """
+        添加新任务
+
+        Args:
+            title: 任务标题
+            description: 任务描述
+            due_date: 截止日期 (YYYY-MM-DD)；重复任务中为第一次发生的日期，默认为今天
+            status: 任务状态，默认使用配置中的 default_status
+            recurrence: 重复规则（如 FREQ=WEEKLY;BYDAY=MO,TH），给出时添加的是重复任务的定义，
+                各次发生在查询时按需展开，不单独保存
+            depends_on: 需要先完成的任务ID
+            priority: 优先级 (high, medium, low)，默认不设置（排序时视为 medium）
+
+        Returns:
+            新添加的任务
+
+        Raises:
+            ValueError: 任务数据、重复规则或依赖无效
+        """
+        status = status or self.config.get("default_status", "pending")
+        self._validate(title, description, due_date, status, priority)
+        depends_on = self._check_dependencies(None, depends_on)
+        if recurrence:
+            # 定义本身没有截止日期，开始日期写入规则
+            recurrence = str(Recurrence.parse(recurrence, due_date or get_today_date()))
+            due_date = None
+
+        task = Task(title, description, due_date, status, recurrence=recurrence, depends_on=depends_on,
+                    priority=priority)
+        if status == "completed":
+            task.completed_at = task.created_at
+        # 分区保存时整体重写，先加载新任务所在分区的已有任务
+        self._ensure_partitions([self.storage.partition_of(task.created_at)])
+        self.tasks.append(task)
+        self._index_task(task)
+        self._stats.add(task)
+        self._record_change("add", task)
+        self._commit()
+        return task
+
+    def _check_dependencies(self, task_id: Optional[str], depends_on: Optional[Iterable[str]]) -> List[str]:
+        """
+        检查依赖的任务都存在且不是任务自身（是否成环由依赖图在加边时检查）
+
+        Args:
+            task_id: 任务ID，新任务为None
+            depends_on: 依赖的任务ID
+
+        Returns:
+            去重后的依赖列表
+
+        Raises:
+            ValueError: 依赖的任务不存在或依赖自身
+        """
+        prerequisites = list(dict.fromkeys(depends_on or ()))
+        for prerequisite in prerequisites:
+            if prerequisite == task_id:
+                raise ValueError(f"任务 {task_id} 不能依赖自身")
+            if self._find_task(prerequisite) is None:
+                raise ValueError(f"依赖的任务不存在: {prerequisite}")
+        return prerequisites
+
+    @timed("archive_completed")
+    @_exclusive
+    def archive_completed(self, before: str) -> int:
+        """
+        把完成日期早于 before 的已完成任务移到归档层
+
+        先写出归档分段再重写活跃存储；两步之间中断时任务会同时出现在两处，以活跃存储中的为准。
+
+        Args:
+            before: 日期 (YYYY-MM-DD)，不包含当天
+
+        Returns:
+            归档的任务数
+
+        Raises:
+            ValueError: 日期格式无效
+        """
+        if not is_valid_date(before):
+            raise ValueError(f"无效的日期 {before}，格式必须是 YYYY-MM-DD")
+        self._ensure_partitions(self.storage.prune(status="completed"))
+        moving = [task for task in self.tasks
+                  if task.status == "completed" and (task.completed_at or task.updated_at)[:10] < before]
+        if not moving or not self.archive.append([task.to_dict() for task in moving]):
+            return 0
+
+        moved_ids = set()
+        for task in moving:
+            self._unindex_task(task)
+            # 归档任务仍参与同步，Merkle树保留它的条目（状态不变）
+            if self._merkle is not None:
+                self._merkle.set(task.id, state_digest(self._live_state(task)))
+            self._dirty_partitions.add(self.storage.partition_of(task.created_at))
+            moved_ids.add(task.id)
+        self.tasks = [task for task in self.tasks if task.id not in moved_ids]
+        if self._archived is not None:
+            self._archived.extend(moving)
+        self._commit()
+        return len(moving)
+
+    @timed("get_task")
+    def get_task(self, task_id: str, include_archived: bool = False) -> Optional[Task]:
+        """
+        根据ID获取任务
+
+        Args:
+            task_id: 任务ID
+            include_archived: 为True时在活跃存储中找不到的任务再到归档中查找（不取回）
+
+        Returns:
+            任务实例，如果不存在则返回None
+        """
+        task = self._find_task(task_id) or self._virtual_occurrence(task_id)
+        if task is None and include_archived:
+            record = self.archive.find(task_id)
+            task = Task.from_dict(record) if record else None
+        return task
+
+    def _scope(self, include_archived: bool) -> List[Task]:
+        """查询范围：活跃任务，需要时在其后接上归档任务"""
+        return self.tasks + self._archived_tasks() if include_archived else self.tasks
+
+    @timed("get_all_tasks")
+    def get_all_tasks(self, include_archived: bool = False) -> List[Task]:
+        """
+        获取所有任务
+
+        Args:
+            include_archived: 是否包含归档任务
+
+        Returns:
+            任务列表
+        """
+        self._ensure_partitions(self.storage.partitions())
+        return list(self._scope(include_archived))
+
+    @timed("get_tasks_by_status")
+    def get_tasks_by_status(self, status: str, include_archived: bool = False) -> List[Task]:
+        """
+        按状态获取任务
+
+        Args:
+            status: 任务状态
+            include_archived: 是否包含归档任务
+
+        Returns:
+            任务列表
+        """
+        self._ensure_partitions(self.storage.prune(status=status))
+        return [task for task in self._scope(include_archived) if task.status == status]
+
+    @timed("search_tasks")
+    def search_tasks(self, keyword: str, include_archived: bool = False, regex: bool = False) -> List[Task]:
+        """
+        搜索标题或描述中包含关键词的任务（不区分大小写）
+
+        Args:
+            keyword: 搜索关键词
+            include_archived: 是否包含归档任务
+            regex: 为True时把关键词作为正则表达式匹配
+
+        Returns:
+            任务列表
+
+        Raises:
+            ValueError: 正则表达式无效
+        """
+        predicate = RegexPredicate(keyword) if regex else KeywordPredicate(keyword)
+        return self.filter_tasks(predicate, include_archived)
+
+    @timed("search_ranked")
+    def search_ranked(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Tuple[Task, float]]:
+        """
+        按相关度排序的全文检索（BM25，标题加权，可容忍一个字符的拼写错误）
+
+        Args:
+            query: 查询文本
+            limit: 返回的最大结果数
+            fuzzy: 是否启用编辑距离为1的模糊匹配
+
+        Returns:
+            [(任务, 分数)]，按分数降序
+
+        Raises:
+            ValueError: limit 为负数
+        """
+        if limit < 0:
+            raise ValueError("limit 和 offset 不能为负数")
+        self._ensure_partitions(self.storage.partitions())
+        if self._search_index is None and not (self.storage.lazy and self._restore_search_index()):
+            self._search_index = SearchIndex.from_tasks(self.tasks)
+            INDEX_REBUILDS.inc(index="search")
+            # 把新建的全文索引一并持久化，下次启动不必重建
+            self._save_indexes()
+        return [(self._tasks_by_id[task_id], score)
+                for task_id, score in self._search_index.search(query, limit, fuzzy)]
+
+    @timed("filter_tasks")
+    def filter_tasks(self, predicate: Callable[[Task], bool], include_archived: bool = False) -> List[Task]:
+        """
+        按任意谓词过滤任务
+
+        任务数达到配置的 parallel_scan_threshold 时拆分到进程池中并行求值，
+        此时谓词必须可以被序列化（模块级函数或类实例，不能是lambda）。
+
+        Args:
+            predicate: 谓词，接收任务返回布尔值
+            include_archived: 是否包含归档任务
+
+        Returns:
+            满足谓词的任务列表，保持存储顺序
+        """
+        self._ensure_partitions(self.storage.partitions())
+        return scan(self._scope(include_archived), predicate,
+                    self.config.get("parallel_scan_threshold"), self.config.get("parallel_scan_workers"))
+
+    @staticmethod
+    def _resolve_cursor(tasks: List[Task], cursor: str) -> int:
+        """
+        把游标解析为继续扫描的存储位置
+
+        游标记录了上一页最后一个任务的位置和ID；如果该位置上的任务已经变化
+        （例如中间有任务被删除），则按ID重新定位。
+        """
+        position, task_id = _decode_cursor(cursor)
+        if 0 < position <= len(tasks) and tasks[position - 1].id == task_id:
+            return position
+        for index, task in enumerate(tasks):
+            if task.id == task_id:
+                return index + 1
+        raise ValueError(f"游标指向的任务已不存在: {task_id}")
+
+    @staticmethod
+    def _iter_matching(tasks: List[Task], start: int = 0, status: Optional[str] = None,
+                       keyword: Optional[str] = None) -> Iterator[Tuple[int, Task]]:
+        """按存储顺序从start位置开始惰性地生成 (位置, 任务)"""
+        keyword = keyword.lower() if keyword else None
+        for position in range(start, len(tasks)):
+            task = tasks[position]
+            if status is not None and task.status != status:
+                continue
+            if keyword is not None and keyword not in task.title.lower() \
+                    and keyword not in task.description.lower():
+                continue
+            yield position, task
+
+    @timed("get_tasks_page")
+    def get_tasks_page(self, limit: Optional[int] = None, offset: int = 0, cursor: Optional[str] = None,
+                       status: Optional[str] = None, keyword: Optional[str] = None,
+                       include_archived: bool = False) -> TaskPage:
+        """
+        分页获取任务，只扫描到所需的一页为止；重复任务当前的实例排在存储的任务之后
+
+        Args:
+            limit: 每页最多返回的任务数，None表示不限制
+            offset: 跳过的匹配任务数（相对于游标位置）
+            cursor: 上一页返回的游标，从其后继续
+            status: 按状态过滤
+            keyword: 按标题或描述关键词过滤
+            include_archived: 是否在活跃任务之后继续扫描归档任务
+
+        Returns:
+            TaskPage(当前页任务, 下一页游标)；没有下一页时游标为None
+
+        Raises:
+            ValueError: 分页参数或游标无效
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit 和 offset 不能为负数")
+        page = list(islice(self._iter_from(offset, cursor, status, keyword, include_archived), limit))
+
+        next_cursor = None
+        if limit and len(page) == limit:
+            position, last_task = page[-1]
+            next_cursor = _encode_cursor(position + 1, last_task.id)
+        return TaskPage([task for _, task in page], next_cursor)
+
+    def iter_tasks(self, offset: int = 0, cursor: Optional[str] = None, status: Optional[str] = None,
+                   keyword: Optional[str] = None, include_archived: bool = False) -> Iterator[Task]:
+        """
+        按 get_tasks_page 的顺序和过滤条件惰性地生成全部匹配的任务（不分页）
+
+        需要的分区在调用时加载，参数也在调用时校验；过滤在取用时才进行，调用方提前停止
+        （例如输出管道被关闭）时不再扫描剩余的任务。迭代期间不应修改任务。
+
+        Args:
+            offset: 跳过的匹配任务数（相对于游标位置）
+            cursor: get_tasks_page 返回的游标，从其后继续
+            status: 按状态过滤
+            keyword: 按标题或描述关键词过滤
+            include_archived: 是否在活跃任务之后继续扫描归档任务
+
+        Returns:
+            任务迭代器
+
+        Raises:
+            ValueError: offset 为负数或游标无效
+        """
+        if offset < 0:
+            raise ValueError("limit 和 offset 不能为负数")
+        return (task for _, task in self._iter_from(offset, cursor, status, keyword, include_archived))
+
+    def _iter_from(self, offset: int, cursor: Optional[str], status: Optional[str], keyword: Optional[str],
+                   include_archived: bool) -> Iterator[Tuple[int, Task]]:
+        """加载需要的分区、解析游标，返回从游标和 offset 之后开始的 (位置, 任务) 惰性迭代器"""
+        self._ensure_partitions(self.storage.prune(status=status))
+        tasks = self._scope(include_archived)
+        # 重复任务当前的实例接在存储的任务之后
+        occurrences = self._current_occurrences(get_today_date())
+        if occurrences:
+            tasks = tasks + occurrences
+        start = self._resolve_cursor(tasks, cursor) if cursor else 0
+        return islice(self._iter_matching(tasks, start, status, keyword), offset, None)
+
+    def plan_query(self, **criteria: Any) -> QueryPlan:
+        """
+        为组合查询制定计划（不执行）
+
+        Args:
+            criteria: Query 支持的查询条件 (status, keyword, due_after, due_before,
+                created_after, created_before, updated_after, updated_before, sort, limit, offset)
+
+        Returns:
+            查询计划
+
+        Raises:
+            ValueError: 查询条件无效
+        """
+        query = Query(**criteria)
+        self._ensure_partitions(self.storage.prune(query.status, query.ranges))
+        return plan_query(query, len(self.tasks), self._status_index, self._sorted_indexes)
+
+    @timed("query")
+    def query(self, explain: bool = False, include_archived: bool = False, **criteria: Any) -> Any:
+        """
+        执行组合查询：用最有选择性的索引驱动，求候选集交集，排序时用堆取Top-K
+
+        Args:
+            explain: 为True时同时返回执行后的查询计划
+            include_archived: 为True时同时扫描归档任务（归档任务没有索引）
+            criteria: 查询条件，见 plan_query
+
+        Returns:
+            任务列表；explain为True时返回 (任务列表, 查询计划)
+
+        Raises:
+            ValueError: 查询条件无效
+        """
+        plan = self.plan_query(**criteria)
+        archived = self._archived_tasks() if include_archived else None
+        tasks = execute_plan(plan, self._tasks_by_id, self.tasks, archived, self._query_occurrences(plan.query))
+        return (tasks, plan) if explain else tasks
+
+    def _query_occurrences(self, query: Query) -> List[Task]:
+        """查询要并入的重复任务实例：给出截止日期上界时为窗口内的全部实例，否则为各系列当前的实例"""
+        today = get_today_date()
+        low, high = query.ranges.get("due_date", (None, None))
+        if high is None:
+            return self._current_occurrences(today)
+        return self._occurrences_between(low or today, high[:10])
+
+    @timed("update_task")
+    @_exclusive
+    def update_task(self, task_id: str, **kwargs: Any) -> Optional[Task]:
+        """
+        更新任务
+
+        Args:
+            task_id: 任务ID
+            kwargs: 要更新的字段 (title, description, due_date, status, depends_on, priority)
+
+        Returns:
+            更新后的任务，如果任务不存在则返回None
+
+        Raises:
+            ValueError: 更新后的任务数据无效，或新的依赖会形成循环
+        """
+        task = self._find_task(task_id)
+        # 归档任务和尚未物化的实例先只取出，检查全部通过后才取回或物化，无效的修改不改动任何存储
+        source = None
+        if task is None:
+            task, source = self._archived_task(task_id), self._unarchive
+        if task is None:
+            task, source = self._virtual_occurrence(task_id), self._materialize
+        if task is None:
+            return None
+
+        fields = {key: value for key, value in kwargs.items() if key in UPDATABLE_FIELDS}
+        self._validate(fields.get("title", task.title), fields.get("description"),
+                       fields.get("due_date"), fields.get("status"), fields.get("priority"))
+        if "depends_on" in fields:
+            fields["depends_on"] = self._check_dependencies(task.id, fields["depends_on"])
+            # 先在图中替换依赖，形成循环时抛出异常，任务保持不变
+            self._graph.set_prerequisites(task.id, fields["depends_on"])
+        if source is not None:
+            source(task)
+
+        self._unindex_task(task)
+        self._stats.remove(task)
+        task.update(**fields)
+        self._index_task(task)
+        self._stats.add(task)
+        self._record_change("update", task)
+        self._commit()
+        return task
+
+    @timed("delete_task")
+    @_exclusive
+    def delete_task(self, task_id: str) -> bool:
+        """
+        删除任务
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            如果删除成功返回True，否则返回False
+        """
+        task = self._find_or_unarchive(task_id)
+        if task is None:
+            return False
+
+        self._unindex_task(task)
+        self._stats.remove(task)
+        self.tasks.remove(task)
+        self._record_change("delete", task)
+        self._add_tombstone(task.id, datetime.now().isoformat())
+        self._commit()
+        return True
+
+    def mark_as_completed(self, task_id: str) -> Optional[Task]:
+        """
+        标记任务为已完成
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            更新后的任务，如果任务不存在则返回None
+        """
+        return self.update_task(task_id, status="completed")
+
+    def mark_as_in_progress(self, task_id: str) -> Optional[Task]:
+        """
+        标记任务为进行中
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            更新后的任务，如果任务不存在则返回None
+        """
+        return self.update_task(task_id, status="in_progress")
+
+    @staticmethod
+    def _live_state(task: Task) -> Tuple[str, Dict[str, Any], str]:
+        return (STATE_LIVE, task.to_dict(), task.updated_at)
+
+    def _read_tombstones(self) -> Dict[str, str]:
+        """读取（并缓存）墓碑，包括尚未写出的"""
+        if self._tombstones is None:
+            self._tombstones = self.tombstones.read()
+            for record in self._pending_tombstones:
+                self._tombstones[record["id"]] = record["at"]
+        return self._tombstones
+
+    def _add_tombstone(self, task_id: str, deleted_at: str) -> None:
+        """记录任务已删除，保存时追加到墓碑文件"""
+        self._pending_tombstones.append({"id": task_id, "at": deleted_at})
+        if self._tombstones is not None:
+            self._tombstones[task_id] = deleted_at
+        if self._merkle is not None:
+            self._merkle.set(task_id, state_digest((STATE_DELETED, None, deleted_at)))
+
+    def merkle_tree(self) -> MerkleTree:
+        """
+        同步用的Merkle树：每个活跃任务、每个归档任务和每个（之后没有重新出现的）已删除任务一个条目
+
+        与 sync_state 一致：归档任务按归档中的记录视为存在，同ID的活跃任务或墓碑优先。
+        第一次调用时加载全部分区并构建，之后随任务变化增量维护，并随索引文件持久化。
+        """
+        self._ensure_partitions(self.storage.partitions())
+        if self._merkle is None:
+            tree = MerkleTree()
+            for task in self._archived_tasks():
+                tree.set(task.id, state_digest(self._live_state(task)))
+            for task_id, deleted_at in self._read_tombstones().items():
+                if task_id not in self._tasks_by_id:
+                    tree.set(task_id, state_digest((STATE_DELETED, None, deleted_at)))
+            for task in self.tasks:
+                tree.set(task.id, state_digest(self._live_state(task)))
+            self._merkle = tree
+            INDEX_REBUILDS.inc(index="merkle")
+            self._save_indexes()
+        return self._merkle
+
+    def sync_state(self, task_id: str) -> Optional[Tuple[str, Optional[Dict[str, Any]], str]]:
+        """
+        任务在本存储中的同步状态
+
+        Returns:
+            ("live", 任务字典, 更新时间)、("deleted", None, 删除时间)，或者从未有过该任务时返回None；
+            已归档的任务按归档中的记录视为存在
+        """
+        task = self._find_task(task_id)
+        if task is not None:
+            return self._live_state(task)
+        deleted_at = self._read_tombstones().get(task_id)
+        if deleted_at is not None:
+            return (STATE_DELETED, None, deleted_at)
+        record = self.archive.find(task_id)
+        return self._live_state(Task.from_dict(record)) if record else None
+
+    @_exclusive
+    def apply_sync_state(self, task_id: str, state: Tuple[str, Optional[Dict[str, Any]], str]) -> None:
+        """
+        把另一个存储中的状态写入本存储（保留对方的ID和时间戳），同样记入变更日志
+
+        Args:
+            task_id: 任务ID
+            state: sync_state 返回的状态
+        """
+        kind, record, stamp = state
+        # 本地已归档的任务先取回，再按对方的状态修改或删除，不会在活跃存储中再添加一份
+        existing = self._find_or_unarchive(task_id)
+        if kind == STATE_DELETED:
+            if existing is not None:
+                self._unindex_task(existing)
+                self._stats.remove(existing)
+                self.tasks.remove(existing)
+                self._record_change("delete", existing)
+            self._add_tombstone(task_id, stamp)
+        else:
+            incoming = Task.from_dict(record)
+            if existing is not None:
+                self._unindex_task(existing)
+                self._stats.remove(existing)
+                self._dirty_partitions.add(self.storage.partition_of(existing.created_at))
+                for field in TASK_FIELDS:
+                    setattr(existing, field, getattr(incoming, field))
+                task, op = existing, "update"
+            else:
+                self._ensure_partitions([self.storage.partition_of(incoming.created_at)])
+                self.tasks.append(incoming)
+                task, op = incoming, "add"
+            self._index_task(task)
+            self._stats.add(task)
+            self._record_change(op, task)
+        self._commit()
+
+    def _load_open_partitions(self) -> None:
+        """加载含有未完成任务的分区；未加载的分区中只有已完成的任务，作为前置任务总是已满足"""
+        self._ensure_partitions(set(self.storage.prune(status="pending")) | set(self.storage.prune(status="in_progress")))
+
+    def _is_open(self, task_id: str) -> bool:
+        """任务存在且未完成；已删除、已归档的前置任务视为已满足"""
+        task = self._tasks_by_id.get(task_id)
+        return task is not None and task.status != "completed"
+
+    @timed("get_next_tasks")
+    def get_next_tasks(self, limit: Optional[int] = None, today: Optional[str] = None) -> List[Task]:
+        """
+        获取最紧迫的、可以开始的任务：未完成，且依赖的任务都已完成
+
+        紧迫程度见 urgency_key（优先级和截止日期的综合得分、创建时间）。结果取自增量维护的优先队列，
+        只弹出需要的前 limit 个，不对全部未完成任务排序。
+
+        Args:
+            limit: 最多返回的任务数，默认全部
+            today: 今天的日期 (YYYY-MM-DD)，用于展开重复任务的当前实例，默认为今天
+
+        Returns:
+            按紧迫程度排序的任务列表
+        """
+        self._load_open_partitions()
+        if self._urgency is None:
+            self._urgency = UrgencyQueue.from_tasks(self.tasks)
+            INDEX_REBUILDS.inc(index="urgency")
+        task_ids = self._urgency.top(limit, lambda task_id: not any(
+            self._is_open(prerequisite) for prerequisite in self._graph.prerequisites(task_id)))
+        tasks = [self._tasks_by_id[task_id] for task_id in task_ids]
+        # 重复任务每个系列只有一个当前实例，数量很少，直接并入
+        occurrences = self._current_occurrences(today or get_today_date())
+        if occurrences:
+            tasks = sorted(tasks + occurrences, key=urgency_key)[:limit]
+        return tasks
+
+    @timed("critical_path")
+    def critical_path(self, task_id: str) -> Optional[List[Task]]:
+        """
+        获取任务的关键路径：沿未完成的依赖能走出的最长链
+
+        只展开未完成的前置任务，按依赖图的拓扑序做一次动态规划。链长相同时选择链上
+        最早截止日期更早的一条（更紧迫），没有截止日期视为最晚。
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            从最先要做的任务到该任务本身的任务列表，任务不存在时返回None
+        """
+        self._load_open_partitions()
+        if self._find_task(task_id) is None:
+            return None
+        # 节点 -> (链长, 链上最早的截止日期, 链上的前一个任务)
+        best: Dict[str, Tuple[int, str, Optional[str]]] = {}
+        for node in self._graph.ancestors(task_id, self._is_open):
+            previous = min((p for p in self._graph.prerequisites(node) if p in best),
+                           key=lambda p: (-best[p][0], best[p][1]), default=None)
+            length, deadline = best[previous][:2] if previous else (0, "9999-12-31")
+            best[node] = (length + 1, min(deadline, self._tasks_by_id[node].due_date or "9999-12-31"), previous)
+
+        path = []
+        node = task_id
+        while node is not None:
+            path.append(self._tasks_by_id[node])
+            node = best[node][2]
+        return path[::-1]
+
+    def _active_series(self) -> List[Task]:
+        """未结束的重复任务定义（分区存储中先加载含有重复任务的分区）"""
+        self._ensure_partitions(self.storage.recurring_partitions())
+        return [series for series in self._series.values() if series.status != "completed"]
+
+    def _occurrence(self, series: Task, day: str) -> Task:
+        """
+        重复任务在某一天的实例
+
+        实例沿用系列的创建时间，因此物化后和系列保存在同一个分区。
+        """
+        return Task(series.title, series.description, day, "pending", occurrence_id(series.id, day),
+                    series.created_at, series.updated_at, series_id=series.id, priority=series.priority)
+
+    def _virtual_occurrence(self, task_id: str) -> Optional[Task]:
+        """按实例ID生成尚未物化的实例，ID不对应系列的某次发生时返回None"""
+        series_id, separator, day = task_id.rpartition(OCCURRENCE_SEPARATOR)
+        if not separator or not is_valid_date(day):
+            return None
+        series = self._find_task(series_id)
+        if series is None or not series.recurrence or day in self._occurrence_days.get(series_id, ()):
+            return None
+        if next(Recurrence.parse(series.recurrence).occurrences(day, day), None) != day:
+            return None
+        return self._occurrence(series, day)
+
+    def _materialize(self, task: Task) -> None:
+        """把尚未物化的实例（_virtual_occurrence 的结果）保存为普通任务（修改实例时调用，调用方已完成全部检查）"""
+        self.tasks.append(task)
+        self._index_task(task)
+        self._stats.add(task)
+        self._record_change("add", task)
+
+    def _occurrences_between(self, start: str, end: str) -> List[Task]:
+        """所有重复任务在 [start, end] 内尚未物化的实例，只展开该窗口"""
+        occurrences = []
+        for series in self._active_series():
+            done = self._occurrence_days.get(series.id, ())
+            for day in Recurrence.parse(series.recurrence).occurrences(start, end):
+                if day not in done:
+                    occurrences.append(self._occurrence(series, day))
+        return occurrences
+
+    def _missed_occurrences(self, today: str) -> List[Task]:
+        """
+        每个重复任务最近一次错过的实例：晚于最后一个已物化的实例、早于今天的最后一次发生
+
+        只展开最后一个已物化实例之后的窗口，同一系列错过多次时只报告最近的一次。
+        """
+        yesterday = (date.fromisoformat(today) - timedelta(days=1)).isoformat()
+        occurrences = []
+        for series in self._active_series():
+            done = self._occurrence_days.get(series.id)
+            start = (date.fromisoformat(max(done)) + timedelta(days=1)).isoformat() if done else None
+            last = None
+            for last in Recurrence.parse(series.recurrence).occurrences(start, yesterday):
+                pass
+            if last is not None:
+                occurrences.append(self._occurrence(series, last))
+        return occurrences
+
+    def _current_occurrences(self, today: str) -> List[Task]:
+        """每个重复任务当前的实例：有错过的实例时为最近错过的一次，否则为今天及以后的下一次"""
+        missed = {task.series_id: task for task in self._missed_occurrences(today)}
+        occurrences = []
+        for series in self._active_series():
+            task = missed.get(series.id)
+            if task is None:
+                done = self._occurrence_days.get(series.id, ())
+                day = next((day for day in Recurrence.parse(series.recurrence).occurrences(today)
+                            if day not in done), None)
+                task = self._occurrence(series, day) if day else None
+            if task is not None:
+                occurrences.append(task)
+        return occurrences
+
+    @staticmethod
+    def _merge_occurrences(tasks: List[Task], occurrences: List[Task]) -> List[Task]:
+        """把虚拟实例并入按截止日期、创建时间排序的任务列表"""
+        if not occurrences:
+            return tasks
+        return sorted(tasks + occurrences, key=lambda task: (task.due_date, task.created_at))
+
+    def _agenda_tasks(self, view: str, today: Optional[str]) -> List[Task]:
+        """
+        加载可能有未完成任务落在视图日期区间内的分区，把议程视图中的任务ID映射为任务，
+        并并入重复任务在该区间内的虚拟实例
+        """
+        today = today or get_today_date()
+        if view == VIEW_OVERDUE:
+            span = (None, (date.fromisoformat(today) - timedelta(days=1)).isoformat())
+            occurrences = self._missed_occurrences(today)
+        elif view == VIEW_TODAY:
+            span = (today, today)
+            occurrences = self._occurrences_between(today, today)
+        else:
+            span = (today, week_end(today))
+            occurrences = self._occurrences_between(*span)
+        self._ensure_partitions(self.storage.prune(ranges={"open_due": span}))
+        tasks = [self._tasks_by_id[task_id] for task_id in self._agenda.get(view, today)]
+        return self._merge_occurrences(tasks, occurrences)
+
+    @timed("get_overdue_tasks")
+    def get_overdue_tasks(self, today: Optional[str] = None) -> List[Task]:
+        """
+        获取已过期且未完成的任务（来自增量维护的物化视图），包括每个重复任务最近一次错过的实例
+
+        Args:
+            today: 当天日期 (YYYY-MM-DD)，默认为今天
+
+        Returns:
+            按截止日期排序的任务列表
+        """
+        return self._agenda_tasks(VIEW_OVERDUE, today)
+
+    @timed("get_tasks_due_today")
+    def get_tasks_due_today(self, today: Optional[str] = None) -> List[Task]:
+        """
+        获取今天截止且未完成的任务（来自增量维护的物化视图），包括重复任务今天的实例
+
+        Args:
+            today: 当天日期 (YYYY-MM-DD)，默认为今天
+
+        Returns:
+            任务列表
+        """
+        return self._agenda_tasks(VIEW_TODAY, today)
+
+    @timed("get_tasks_due_this_week")
+    def get_tasks_due_this_week(self, today: Optional[str] = None) -> List[Task]:
+        """
+        获取从今天到本周日截止且未完成的任务（来自增量维护的物化视图），包括重复任务在此期间的实例
+
+        Args:
+            today: 当天日期 (YYYY-MM-DD)，默认为今天
+
+        Returns:
+            按截止日期排序的任务列表
+        """
+        return self._agenda_tasks(VIEW_WEEK, today)
+
+    @timed("export_delta")
+    def export_delta(self, since: Optional[str] = None,
+                     since_seq: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        导出水位之后新增、修改和删除的任务（供下游增量加载）
+
+        按时间戳导出时从 updated_at 有序索引中取出更新时间晚于水位的任务（分区存储只加载更新时间
+        范围与之相交的分区），删除和水位之后修改过、现已归档的任务取自变更日志中按时间二分定位的
+        水位之后的部分，开销与新增变更的数量成正比；变更日志不覆盖水位时（早期的变更已被清理）删除改取自墓碑。
+        按序号导出时从变更日志中二分定位后只读取新增的变更。两种方式中同一任务都只保留最后的状态，
+        已归档的任务按归档前最后的状态导出（归档本身不是变更）。
+
+        Args:
+            since: 时间水位 (YYYY-MM-DD 或ISO时间)，导出更新/删除时间晚于它的变更；只给日期时包含当天
+            since_seq: 序号水位，导出序号大于它的变更；给出时忽略 since。两者都不给时导出全部任务
+
+        Returns:
+            (变更列表, 新的水位)；变更按时间排序，每条为 {"op": "upsert", "id", "task"} 或
+            {"op": "delete", "id", "deleted_at"}；新的水位为 {"seq": 序号, "updated_at": 最后导出的时间}
+
+        Raises:
+            ValueError: 序号水位早于变更日志中保留的最早变更
+        """
+        if since_seq is not None:
+            first_seq = self.changes.first_seq()
+            if first_seq and since_seq < first_seq - 1:
+                raise ValueError(f"变更日志从序号 {first_seq} 开始，无法从序号 {since_seq} 之后导出，请改用时间水位")
+            latest: Dict[str, Dict[str, Any]] = {}
+            for record in self.changes.read_since(since_seq)[0]:
+                latest.pop(record["id"], None)
+                latest[record["id"]] = record
+            entries = []
+            for record in latest.values():
+                if record["op"] == "delete":
+                    entries.append((record["at"], {"op": "delete", "id": record["id"], "deleted_at": record["at"]}))
+                else:
+                    task = record["task"]
+                    entries.append((task["updated_at"], {"op": "upsert", "id": record["id"], "task": task}))
+        else:
+            self._ensure_partitions(self.storage.prune(ranges={"updated_at": (since, None)}) if since
+                                    else self.storage.partitions())
+            index = self._sorted_indexes["updated_at"]
+            updated = index.after(since) if since else index.to_list()
+            entries = [(stamp, {"op": "upsert", "id": task_id, "task": self._tasks_by_id[task_id].to_dict()})
+                       for stamp, task_id in updated]
+            first = self.changes.first_record()
+            if since and first is not None and (first["seq"] == 1 or first.get("at", "") <= since):
+                entries.extend(self._changes_after(since))
+            else:
+                # 全量导出，或变更日志为空、不覆盖水位：删除取自墓碑
+                for task_id, deleted_at in self._read_tombstones().items():
+                    if (not since or deleted_at > since) and task_id not in self._tasks_by_id:
+                        entries.append((deleted_at, {"op": "delete", "id": task_id, "deleted_at": deleted_at}))
+        entries.sort(key=lambda entry: entry[0])
+        watermark = {"seq": self.seq, "updated_at": entries[-1][0] if entries else since}
+        return [change for _, change in entries], watermark
+
+    def _changes_after(self, since: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        变更日志中时间晚于 since、不在活跃任务中的任务的最后状态：已删除的导出删除，已归档的导出归档前的快照
+
+        活跃任务由调用方从 updated_at 索引中导出，这里跳过。
+        """
+        latest: Dict[str, Dict[str, Any]] = {}
+        for record in self.changes.read_after(since):
+            latest[record["id"]] = record
+        entries = []
+        for task_id, record in latest.items():
+            if task_id in self._tasks_by_id:
+                continue
+            if record["op"] == "delete":
+                entries.append((record["at"], {"op": "delete", "id": task_id, "deleted_at": record["at"]}))
+            elif task_id in self.archive:
+                task = record["task"]
+                entries.append((task["updated_at"], {"op": "upsert", "id": task_id, "task": task}))
+        return entries
+
+    @timed("changes_since")
+    def changes_since(self, seq: int = 0) -> List[Dict[str, Any]]:
+        """
+        获取序号大于 seq 的变更（增量，不需要比对整个数据文件）
+
+        Args:
+            seq: 上次处理到的序号，0表示从头开始
+
+        Returns:
+            变更记录列表，每条包含 seq、op (add/update/delete)、id、at 和 task
+        """
+        records, _ = self.changes.read_since(seq)
+        return records
+
+    @timed("get_stats")
+    def get_stats(self, today: Optional[str] = None, days: int = 7, weeks: int = 4) -> Dict[str, Any]:
+        """
+        获取任务统计（由增量维护的计数器直接得出，不扫描任务）
+
+        Args:
+            today: 当天日期 (YYYY-MM-DD)，默认为今天
+            days: 按天统计完成数的天数
+            weeks: 按周统计完成数的周数
+
+        Returns:
+            统计摘要，包含 total、by_status、overdue、completed_per_day、
+            completed_per_week 和 average_completion_seconds
+        """
+        return self._stats.summary(today, days, weeks)
+
+    @timed("memory_report")
+    def memory_report(self, decoded: bool = True) -> Dict[str, Any]:
+        """
+        估算已加载的任务和索引占用的内存
+
+        按 Task对象（对象、属性字典和依赖列表）、字符串、各项索引的顺序计算，共享的对象只计入
+        第一项（例如索引的键与任务字段是同一个字符串时计入字符串）。尚未构建的索引为0。
+
+        Args:
+            decoded: 为True时重新读取已加载的分区，估算解码后的JSON记录的大小
+                （加载时的临时内存，加载完成后释放）
+
+        Returns:
+            {"tasks": 已加载的任务数, "bytes": {"task_objects", "strings", "indexes": {索引: 字节}},
+             "decoded_json": 字节或None, "total": 常驻部分合计, "per_task": 每个任务平均字节}
+        """
+        seen: Set[int] = {id(self.tasks)}
+        task_objects = sys.getsizeof(self.tasks)
+        strings = 0
+        for task in self.tasks:
+            attributes = task.__dict__
+            seen.update((id(task), id(attributes)))
+            # 属性名是所有任务共享的常量，不计入
+            seen.update(id(name) for name in attributes)
+            task_objects += sys.getsizeof(task) + sys.getsizeof(attributes)
+            for value in attributes.values():
+                if isinstance(value, list) and id(value) not in seen:
+                    seen.add(id(value))
+                    task_objects += sys.getsizeof(value)
+                    values = value
+                else:
+                    values = (value,)
+                for item in values:
+                    if isinstance(item, str) and id(item) not in seen:
+                        seen.add(id(item))
+                        strings += sys.getsizeof(item)
+        indexes = {name: sum(deep_sizeof(getattr(self, attribute), seen) for attribute in attributes)
+                   for name, attributes in MEMORY_INDEXES}
+        decoded_bytes = None
+        if decoded:
+            decoded_bytes = sum(deep_sizeof(self.storage.read_partition(key))
+                                for key in sorted(self._loaded_partitions))
+
+        total = task_objects + strings + sum(indexes.values())
+        count = len(self.tasks)
+
+        def per_task(size: Optional[int]) -> Optional[float]:
+            return None if size is None or not count else round(size / count, 1)
+
+        return {
+            "tasks": count,
+            "bytes": {"task_objects": task_objects, "strings": strings, "indexes": indexes},
+            "decoded_json": decoded_bytes,
+            "total": total,
+            "per_task": {
+                "task_objects": per_task(task_objects),
+                "strings": per_task(strings),
+                "indexes": per_task(sum(indexes.values())),
+                "decoded_json": per_task(decoded_bytes),
+                "total": per_task(total)
+            }
+        }
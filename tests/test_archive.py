@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 归档层测试
+daily_task_tracker - tests/test_archive.py
+功能：测试归档分段的写入、读取和取回，以及TaskManager的归档与透明取回
+"""
+
+import os
+import sys
+import json
+import tempfile
+from unittest import TestCase, mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.archive import ArchiveStore
+from daily_task_tracker.task_manage import TaskManager
+
+
+def make_record(task_id, status="completed", completed_at="2025-01-05T10:00:00"):
+    """生成测试用的任务记录"""
+    record = {"id": task_id, "title": f"任务{task_id}", "description": "", "status": status,
+              "due_date": None, "created_at": "2025-01-01T09:00:00", "updated_at": completed_at}
+    if status == "completed":
+        record["completed_at"] = completed_at
+    return record
+
+
+class TestArchiveStore(TestCase):
+    """测试ArchiveStore类"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.archive = ArchiveStore(os.path.join(self.temp_dir.name, "tasks.archive"))
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_append_and_read(self):
+        """测试每次追加写出一个新的压缩分段"""
+        self.assertTrue(self.archive.append([make_record("a"), make_record("b")]))
+        self.assertTrue(self.archive.append([make_record("c")]))
+        self.assertEqual(sorted(os.listdir(self.archive.directory)),
+                         ["manifest.json", "segment-000001.jsonl.gz", "segment-000002.jsonl.gz"])
+
+        archive = ArchiveStore(self.archive.directory)
+        self.assertEqual(archive.count, 3)
+        self.assertEqual([r["id"] for r in archive.read()], ["a", "b", "c"])
+        self.assertEqual(archive.find("b")["title"], "任务b")
+        self.assertIsNone(archive.find("missing"))
+
+    def test_restore_and_archive_again(self):
+        """测试取回的任务不再出现，再次归档后重新出现"""
+        self.archive.append([make_record("a"), make_record("b")])
+        self.assertEqual(self.archive.restore("a")["id"], "a")
+        self.assertIsNone(self.archive.restore("a"))
+        self.assertEqual([r["id"] for r in self.archive.read()], ["b"])
+        self.assertEqual(self.archive.count, 1)
+
+        self.archive.append([make_record("a")])
+        self.assertEqual([r["id"] for r in ArchiveStore(self.archive.directory).read()], ["b", "a"])
+
+    def test_restore_saved_explicitly(self):
+        """测试取回在 save() 之前不写入清单，未在清单中的ID不读取分段"""
+        self.archive.append([make_record("a"), make_record("b")])
+        self.archive.restore("a")
+        self.assertTrue(self.archive.dirty)
+        self.assertIn("a", ArchiveStore(self.archive.directory))
+        self.assertTrue(self.archive.save())
+        self.assertNotIn("a", ArchiveStore(self.archive.directory))
+
+        with mock.patch.object(ArchiveStore, "_read_segment") as read_segment:
+            self.assertIsNone(self.archive.find("missing"))
+            self.assertIsNone(self.archive.find("a"))
+        read_segment.assert_not_called()
+
+    def test_upgrade_version_1_manifest(self):
+        """测试第1版清单（只记录已取回的ID）在打开时转换"""
+        self.archive.append([make_record("a"), make_record("b")])
+        self.archive.append([make_record("a")])
+        with open(self.archive.manifest_file, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "segments": self.archive.manifest["segments"],
+                       "restored": {"b": 1}, "count": 1}, f)
+        archive = ArchiveStore(self.archive.directory)
+        self.assertEqual(archive.manifest["ids"], {"a": 2})
+        self.assertEqual([r["id"] for r in archive.read()], ["a"])
+
+
+class TestTaskManagerArchive(TestCase):
+    """测试TaskManager的归档功能"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        self.temp_data_file = os.path.join(self.temp_dir.name, "tasks.json")
+        with open(self.temp_data_file, "w", encoding="utf-8") as f:
+            json.dump([make_record("old"), make_record("recent", completed_at="2025-03-01T10:00:00"),
+                       make_record("open", status="pending")], f)
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": self.temp_data_file}, f)
+        self.manager = TaskManager(self.temp_config_file)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_archive_completed(self):
+        """测试归档早先完成的任务，默认查询只看活跃任务"""
+        self.assertEqual(self.manager.archive_completed("2025-02-01"), 1)
+        self.assertEqual(self.manager.archive_completed("2025-02-01"), 0)
+
+        with open(self.temp_data_file, "r", encoding="utf-8") as f:
+            self.assertEqual([r["id"] for r in json.load(f)], ["recent", "open"])
+        self.assertEqual([t.id for t in self.manager.get_all_tasks()], ["recent", "open"])
+        self.assertEqual([t.id for t in self.manager.get_all_tasks(include_archived=True)],
+                         ["recent", "open", "old"])
+        self.assertEqual(len(self.manager.search_tasks("任务old", include_archived=True)), 1)
+        self.assertIsNone(self.manager.get_task("old"))
+        self.assertEqual(self.manager.get_task("old", include_archived=True).id, "old")
+        tasks = self.manager.query(status="completed", sort="updated_at", include_archived=True)
+        self.assertEqual([t.id for t in tasks], ["old", "recent"])
+
+        # 统计仍然包含归档任务
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual(manager.get_stats()["by_status"], {"completed": 2, "pending": 1})
+
+    def test_update_archived_task_unarchives_it(self):
+        """测试修改归档任务时透明地取回"""
+        self.manager.archive_completed("2025-02-01")
+        task = self.manager.update_task("old", status="pending")
+        self.assertEqual(task.status, "pending")
+        self.assertEqual(self.manager.archive.count, 0)
+
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual(manager.get_task("old").status, "pending")
+        self.assertEqual(manager.get_all_tasks(include_archived=True)[-1].id, "old")
+        self.assertEqual(manager.get_stats()["by_status"], {"completed": 1, "pending": 2})
+
+    def test_invalid_update_keeps_archived_task(self):
+        """测试对归档任务的无效修改不会把它移出归档"""
+        self.manager.archive_completed("2025-02-01")
+        with self.assertRaises(ValueError):
+            self.manager.update_task("old", due_date="2020-13-45")
+        with self.assertRaises(ValueError):
+            self.manager.update_task("old", depends_on=["missing"])
+        self.assertEqual(self.manager.archive.count, 1)
+        self.assertIsNone(self.manager.get_task("old"))
+
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual(manager.get_task("old", include_archived=True).status, "completed")
+        self.assertEqual(manager.archive.count, 1)
+
+    def test_restore_written_after_data_file(self):
+        """测试取回在活跃存储写出之后才写入归档清单，写出失败时任务仍在归档中"""
+        self.manager.archive_completed("2025-02-01")
+        with mock.patch.object(self.manager.storage, "write_partition", return_value=False):
+            self.manager.update_task("old", status="pending")
+        self.assertIn("old", ArchiveStore(self.manager.archive.directory))
+        self.assertTrue(self.manager.save())
+        self.assertNotIn("old", ArchiveStore(self.manager.archive.directory))
+        self.assertEqual(TaskManager(self.temp_config_file).get_task("old").status, "pending")
+
+    def test_delete_archived_task(self):
+        """测试删除归档任务"""
+        self.manager.archive_completed("2025-02-01")
+        self.assertTrue(self.manager.delete_task("old"))
+        self.assertEqual(self.manager.get_all_tasks(include_archived=True)[-1].id, "open")
+        self.assertEqual(self.manager.get_stats()["total"], 2)
+
+    def test_invalid_date(self):
+        """测试无效的归档日期"""
+        with self.assertRaises(ValueError):
+            self.manager.archive_completed("2025/02/01")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 变更日志测试
+daily_task_tracker - tests/test_changes.py
+功能：测试变更日志的追加、按序号定位和轮询跟踪，以及按水位增量导出
+"""
+
+import os
+import sys
+import json
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase, mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.changes import ChangeFeed
+from daily_task_tracker.sync import TombstoneLog
+from daily_task_tracker.task_manage import TaskManager
+
+
+def make_records(start, stop):
+    """生成测试用的变更记录"""
+    return [{"seq": seq, "op": "update", "id": f"id-{seq}", "at": "2025-12-01T00:00:00",
+             "task": {"title": "任务" * (seq % 7)}} for seq in range(start, stop)]
+
+
+class TestChangeFeed(TestCase):
+    """测试ChangeFeed类"""
+    
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.feed = ChangeFeed(os.path.join(self.temp_dir.name, "tasks.changes.jsonl"))
+    
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+    
+    def test_empty_feed(self):
+        """测试空日志"""
+        self.assertEqual(self.feed.last_seq(), 0)
+        self.assertEqual(self.feed.first_seq(), 0)
+        self.assertEqual(self.feed.read_since(0), ([], 0))
+    
+    def test_read_since_uses_binary_search(self):
+        """测试在较大的日志上按序号定位"""
+        self.assertTrue(self.feed.append(make_records(1, 2001)))
+        
+        self.assertEqual(self.feed.first_seq(), 1)
+        self.assertEqual(self.feed.last_seq(), 2000)
+        for seq in (0, 1, 999, 1500, 1999, 2000):
+            records, offset = self.feed.read_since(seq)
+            self.assertEqual([r["seq"] for r in records], list(range(seq + 1, 2001)))
+            self.assertEqual(offset, os.path.getsize(self.feed.file_path))
+    
+    def test_read_after_time(self):
+        """测试按记录时间定位，只返回时间晚于给定时间的记录"""
+        records = make_records(1, 2001)
+        for record in records:
+            record["at"] = (datetime(2025, 12, 1) + timedelta(seconds=record["seq"])).isoformat()
+        self.feed.append(records)
+        self.assertEqual(self.feed.read_after("2025-11-30"), records)
+        self.assertEqual([r["seq"] for r in self.feed.read_after(records[1499]["at"])], list(range(1501, 2001)))
+        self.assertEqual(self.feed.read_after(records[-1]["at"]), [])
+        self.assertEqual(self.feed.first_record(), records[0])
+
+    def test_partial_line_is_not_consumed(self):
+        """测试写到一半的行留到下次读取"""
+        self.feed.append(make_records(1, 3))
+        with open(self.feed.file_path, "ab") as f:
+            f.write(b'{"seq": 3, "op"')
+        
+        records, offset = self.feed.read_since(0)
+        self.assertEqual([r["seq"] for r in records], [1, 2])
+        self.assertEqual(self.feed.last_seq(), 2)
+        
+        with open(self.feed.file_path, "ab") as f:
+            f.write(b': "add", "id": "x", "at": "", "task": null}\n')
+        records, _ = self.feed.read_since(2, offset)
+        self.assertEqual([r["seq"] for r in records], [3])
+    
+    def test_follow(self):
+        """测试轮询跟踪新的变更"""
+        self.feed.append(make_records(1, 3))
+        polls = []
+        
+        def fake_sleep(interval):
+            polls.append(interval)
+            if len(polls) == 2:
+                self.feed.append(make_records(3, 5))
+        
+        follower = self.feed.follow(1, interval=0.5, sleep=fake_sleep)
+        seqs = [next(follower)["seq"] for _ in range(3)]
+        
+        self.assertEqual(seqs, [2, 3, 4])
+        self.assertEqual(polls, [0.5, 0.5])
+
+
+
+class TestExportDelta(TestCase):
+    """测试TaskManager的增量导出"""
+    
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+        self.manager = TaskManager(self.temp_config_file)
+        self.kept = self.manager.add_task("保持不变")
+        self.changed = self.manager.add_task("将被修改")
+        self.removed = self.manager.add_task("将被删除")
+        _, self.watermark = self.manager.export_delta()
+    
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+    
+    def summarize(self, changes):
+        return [(change["op"], change["id"]) for change in changes]
+    
+    def test_full_export(self):
+        """测试没有水位时导出全部任务"""
+        changes, _ = TaskManager(self.temp_config_file).export_delta()
+        self.assertEqual(self.summarize(changes),
+                         [("upsert", self.kept.id), ("upsert", self.changed.id), ("upsert", self.removed.id)])
+    
+    def test_delta_by_timestamp_and_seq(self):
+        """测试按时间和按序号导出的结果相同：只有水位之后的修改、新增和删除（墓碑）"""
+        self.manager.update_task(self.changed.id, title="已修改")
+        self.manager.delete_task(self.removed.id)
+        added = self.manager.add_task("新增")
+        expected = [("upsert", self.changed.id), ("delete", self.removed.id), ("upsert", added.id)]
+        
+        manager = TaskManager(self.temp_config_file)
+        changes, watermark = manager.export_delta(since=self.watermark["updated_at"])
+        self.assertEqual(self.summarize(changes), expected)
+        self.assertEqual(changes[0]["task"]["title"], "已修改")
+        self.assertEqual(watermark["seq"], 6)
+        
+        changes, _ = manager.export_delta(since_seq=self.watermark["seq"])
+        self.assertEqual(self.summarize(changes), expected)
+        # 从新的水位再导出时没有变更
+        self.assertEqual(manager.export_delta(since=watermark["updated_at"])[0], [])
+        self.assertEqual(manager.export_delta(since_seq=watermark["seq"])[0], [])
+
+    def test_delta_by_timestamp_reads_deletions_from_change_feed(self):
+        """测试按时间导出时删除取自变更日志中水位之后的部分，不读取全部墓碑；水位之后完成并归档的任务按最后的状态导出"""
+        self.manager.delete_task(self.removed.id)
+        self.manager.mark_as_completed(self.changed.id)
+        self.assertEqual(self.manager.archive_completed("2999-01-01"), 1)
+
+        manager = TaskManager(self.temp_config_file)
+        with mock.patch.object(TombstoneLog, "read", side_effect=AssertionError("读取了全部墓碑")):
+            changes, _ = manager.export_delta(since=self.watermark["updated_at"])
+        self.assertEqual(self.summarize(changes), [("delete", self.removed.id), ("upsert", self.changed.id)])
+        self.assertEqual(changes[1]["task"]["status"], "completed")
+
+        changes, _ = manager.export_delta(since_seq=self.watermark["seq"])
+        self.assertEqual(self.summarize(changes), [("delete", self.removed.id), ("upsert", self.changed.id)])
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()
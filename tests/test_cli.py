@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 命令行测试
+daily_task_tracker - tests/test_cli.py
+功能：在临时目录中运行 task-cli，测试批量执行的成功/失败统计、只有全局选项时的处理和退出码
+"""
+
+import os
+import sys
+import json
+import subprocess
+import tempfile
+from unittest import TestCase
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestCli(TestCase):
+    """测试命令行入口"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.temp_dir.name, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *arguments, stdin=""):
+        return subprocess.run([sys.executable, os.path.join(PROJECT_ROOT, "cli.py")] + list(arguments),
+                              cwd=self.temp_dir.name, input=stdin, capture_output=True, text=True, timeout=60)
+
+    def test_batch_counts_failed_commands(self):
+        """测试批量执行时失败的命令、只有全局选项的行和单行中的全局选项都计入失败，不中断后续命令"""
+        commands = "\n".join([
+            "add 第一个任务",
+            "show missing-id",
+            "--memprofile",
+            "--metrics-file metrics.prom list",
+            "update missing-id -t 新标题",
+            "delete missing-id",
+            "list --sort title --cursor abc",
+            "add 第二个任务",
+        ])
+        result = self.run_cli("batch", "-", stdin=commands)
+        self.assertNotIn("Traceback", result.stderr)
+        self.assertIn("2 条成功, 6 条失败", result.stdout)
+        self.assertEqual(result.returncode, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "metrics.prom")))
+
+        result = self.run_cli("batch", "-", stdin="add 第三个任务\nlist\n")
+        self.assertIn("2 条成功, 0 条失败", result.stdout)
+        self.assertEqual(result.returncode, 0)
+
+    def test_failed_command_exit_code(self):
+        """测试命令失败时退出码为1"""
+        self.assertEqual(self.run_cli("show", "missing-id").returncode, 1)
+        self.assertEqual(self.run_cli("add", "任务").returncode, 0)
+
+    def test_search_limit_and_offset(self):
+        """测试排序检索的 -n 0 不返回结果，负数的 -n 和正则搜索的负数 --offset 被拒绝"""
+        for title in ("周报", "写周报", "改周报"):
+            self.run_cli("add", title)
+        result = self.run_cli("search", "周报", "--ranked", "-n", "0", "--format", "json")
+        self.assertEqual((result.returncode, json.loads(result.stdout)), (0, []))
+        self.assertEqual(self.run_cli("search", "周报", "--ranked", "-n", "-1").returncode, 1)
+
+        result = self.run_cli("search", "周报", "-E", "--offset", "-1", "--format", "json")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("不能为负数", result.stdout)
+        result = self.run_cli("search", "周报", "-E", "--offset", "1", "--format", "json")
+        self.assertEqual(len(json.loads(result.stdout)), 2)
+
+    def test_global_flags_without_command(self):
+        """测试只给全局选项没有子命令时显示帮助并以用法错误退出"""
+        result = self.run_cli("--metrics-file", "metrics.prom")
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("usage: task-cli", result.stderr)
+        self.assertNotIn("Traceback", result.stderr)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "metrics.prom")))
+
+    def test_memprofile(self):
+        """测试 --memprofile 只给全局选项时显示帮助，带子命令时在标准错误输出内存报告，标准输出不受影响"""
+        result = self.run_cli("--memprofile")
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("usage: task-cli", result.stderr)
+        self.assertNotIn("Traceback", result.stderr)
+
+        self.run_cli("add", "任务")
+        result = self.run_cli("--memprofile", "list", "--format", "ndjson")
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(json.loads(result.stdout)["title"], "任务")
+        self.assertIn("峰值内存", result.stderr)
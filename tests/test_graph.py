@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 依赖图测试
+daily_task_tracker - tests/test_graph.py
+功能：测试依赖图的增量环检测和拓扑序维护，以及TaskManager的依赖、可开始任务和关键路径
+"""
+
+import os
+import sys
+import json
+import random
+import tempfile
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.graph import DependencyGraph
+from daily_task_tracker.task_manage import TaskManager, Task
+
+
+class TestDependencyGraph(TestCase):
+    """测试DependencyGraph类"""
+
+    def assertTopological(self, graph):
+        for task_id, prerequisites in graph._prerequisites.items():
+            for prerequisite in prerequisites:
+                self.assertLess(graph._order[prerequisite], graph._order[task_id])
+
+    def test_cycle_detection(self):
+        """测试自依赖、直接和间接的循环依赖被拒绝"""
+        graph = DependencyGraph()
+        graph.add_edge("b", "a")
+        graph.add_edge("c", "b")
+        with self.assertRaises(ValueError):
+            graph.add_edge("a", "a")
+        with self.assertRaises(ValueError):
+            graph.add_edge("a", "b")
+        with self.assertRaises(ValueError):
+            graph.add_edge("a", "c")
+        self.assertEqual(graph.prerequisites("a"), set())
+        self.assertTopological(graph)
+
+    def test_reorder_keeps_topological_order(self):
+        """测试与当前顺序相反的边插入后拓扑序仍然有效"""
+        graph = DependencyGraph()
+        # 先按 a..e 分配序号，再插入方向相反的边
+        for node in "abcde":
+            graph._assign(node)
+        graph.add_edge("a", "b")
+        graph.add_edge("b", "e")
+        graph.add_edge("c", "e")
+        graph.add_edge("e", "d")
+        self.assertTopological(graph)
+        self.assertEqual(graph.ancestors("a", lambda node: True), ["d", "e", "b", "a"])
+
+    def test_random_insertions_match_full_check(self):
+        """测试随机插入时增量检测与"插入后是否能从前置任务回到自身"的结论一致"""
+        rng = random.Random(7)
+        graph = DependencyGraph()
+        for _ in range(600):
+            task_id, prerequisite = (str(rng.randrange(40)) for _ in range(2))
+            if task_id == prerequisite:
+                continue
+            creates_cycle = task_id in graph.ancestors(prerequisite, lambda node: True)
+            try:
+                graph.add_edge(task_id, prerequisite)
+            except ValueError:
+                self.assertTrue(creates_cycle)
+            else:
+                self.assertFalse(creates_cycle)
+        self.assertTopological(graph)
+
+    def test_set_prerequisites_rolls_back(self):
+        """测试替换依赖形成环时保留原来的依赖"""
+        graph = DependencyGraph.from_edges([("b", ["a"]), ("c", ["b"])])
+        self.assertTopological(graph)
+        graph.set_prerequisites("b", ["x"])
+        self.assertEqual(graph.prerequisites("b"), {"x"})
+        with self.assertRaises(ValueError):
+            graph.set_prerequisites("b", ["a", "c"])
+        self.assertEqual(graph.prerequisites("b"), {"x"})
+        self.assertEqual(graph.dependents("a"), set())
+
+
+class TestTaskManagerDependencies(TestCase):
+    """测试TaskManager的任务依赖"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+        self.manager = TaskManager(self.temp_config_file)
+        self.design = self.manager.add_task("设计", due_date="2025-01-10")
+        self.build = self.manager.add_task("实现", due_date="2025-01-20", depends_on=[self.design.id])
+        self.docs = self.manager.add_task("写文档", due_date="2025-01-15")
+        self.release = self.manager.add_task("发布", due_date="2025-01-31",
+                                             depends_on=[self.build.id, self.docs.id])
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def titles(self, tasks):
+        return [task.title for task in tasks]
+
+    def test_task_serialization(self):
+        """测试依赖只在有值时写入记录，并能从字典和元组还原"""
+        self.assertNotIn("depends_on", self.design.to_dict())
+        self.assertEqual(Task.from_dict(self.release.to_dict()).depends_on, [self.build.id, self.docs.id])
+        self.assertEqual(Task.from_row(self.release.to_row()).depends_on, [self.build.id, self.docs.id])
+
+    def test_invalid_dependencies(self):
+        """测试依赖不存在的任务、依赖自身和循环依赖被拒绝，任务保持不变"""
+        with self.assertRaises(ValueError):
+            self.manager.add_task("孤立", depends_on=["missing"])
+        with self.assertRaises(ValueError):
+            self.manager.update_task(self.design.id, depends_on=[self.design.id])
+        with self.assertRaises(ValueError):
+            self.manager.update_task(self.design.id, depends_on=[self.release.id])
+        self.assertEqual(self.manager.get_task(self.design.id).depends_on, [])
+
+    def test_next_tasks(self):
+        """测试只列出依赖都已完成的未完成任务，已删除的依赖视为已满足"""
+        self.assertEqual(self.titles(self.manager.get_next_tasks()), ["设计", "写文档"])
+        self.manager.mark_as_completed(self.design.id)
+        self.assertEqual(self.titles(self.manager.get_next_tasks()), ["写文档", "实现"])
+        self.manager.mark_as_completed(self.docs.id)
+        self.manager.delete_task(self.build.id)
+        self.assertEqual(self.titles(self.manager.get_next_tasks()), ["发布"])
+
+    def test_critical_path(self):
+        """测试关键路径沿最长的未完成依赖链，完成的任务不再出现"""
+        self.assertEqual(self.titles(self.manager.critical_path(self.release.id)), ["设计", "实现", "发布"])
+        self.manager.mark_as_completed(self.design.id)
+        # 链长相同时选择截止日期更早的一条
+        self.assertEqual(self.titles(self.manager.critical_path(self.release.id)), ["写文档", "发布"])
+        self.assertIsNone(self.manager.critical_path("missing"))
+
+    def test_dependencies_persist(self):
+        """测试依赖随任务保存，重新加载后依赖图一致"""
+        self.manager.update_task(self.release.id, depends_on=[self.docs.id])
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual(manager.get_task(self.release.id).depends_on, [self.docs.id])
+        self.assertEqual(self.titles(manager.critical_path(self.release.id)), ["写文档", "发布"])
+        with self.assertRaises(ValueError):
+            manager.update_task(self.docs.id, depends_on=[self.release.id])
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 内存分析测试
+daily_task_tracker - tests/test_memory.py
+功能：测试对象图大小估算、tracemalloc分析上下文和TaskManager的内存报告
+"""
+
+import os
+import sys
+import json
+import tempfile
+import tracemalloc
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.utils.memory import MemoryProfiler, deep_sizeof, format_bytes
+from daily_task_tracker.task_manage import TaskManager
+
+
+class TestMemoryUtils(TestCase):
+    """测试内存分析工具函数"""
+
+    def test_deep_sizeof_counts_shared_objects_once(self):
+        """测试递归估算时共享的对象只计算一次"""
+        text = "x" * 1000
+        self.assertGreater(deep_sizeof({"a": [text]}), sys.getsizeof(text))
+        self.assertLess(deep_sizeof([text, text, text]), 2 * sys.getsizeof(text))
+        seen = set()
+        deep_sizeof(text, seen)
+        self.assertLess(deep_sizeof([text], seen), sys.getsizeof(text))
+
+    def test_profiler_reports_peak_and_sites(self):
+        """测试分析上下文记录峰值和仍占用内存的分配位置，结束后停止自己开始的跟踪"""
+        with MemoryProfiler() as profiler:
+            kept = [bytearray(1024) for _ in range(100)]
+            transient = bytearray(1024 * 1024)
+            del transient
+        self.assertGreaterEqual(profiler.peak, 1024 * 1024)
+        self.assertLess(profiler.current, profiler.peak)
+        top = profiler.top_sites(1)[0]
+        self.assertIn("test_memory.py:", top.location)
+        self.assertGreaterEqual(top.size, 100 * 1024)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertIn("峰值内存", profiler.format())
+        self.assertEqual(len(kept), 100)
+
+    def test_format_bytes(self):
+        """测试字节数格式化"""
+        self.assertEqual(format_bytes(512), "512 B")
+        self.assertEqual(format_bytes(1536), "1.5 KB")
+        self.assertEqual(format_bytes(3 * 1024 ** 3), "3.0 GB")
+
+
+class TestTaskManagerMemoryReport(TestCase):
+    """测试TaskManager.memory_report"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+        self.manager = TaskManager(self.temp_config_file)
+        with self.manager.deferred_save():
+            for i in range(50):
+                self.manager.add_task(f"任务 {i}", description="描述" * 20, due_date="2025-03-01")
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_breakdown(self):
+        """测试按Task对象、字符串、索引和解码的JSON分项，延迟构建的索引在构建后才计入"""
+        report = self.manager.memory_report()
+        self.assertEqual(report["tasks"], 50)
+        sizes = report["bytes"]
+        self.assertGreater(sizes["task_objects"], 50 * sys.getsizeof(self.manager.tasks[0]))
+        self.assertGreater(sizes["strings"], 50 * sys.getsizeof("描述" * 20))
+        self.assertEqual(sizes["indexes"]["search"], 0)
+        self.assertGreater(report["decoded_json"], 0)
+        self.assertEqual(report["total"], sizes["task_objects"] + sizes["strings"] + sum(sizes["indexes"].values()))
+        self.assertAlmostEqual(report["per_task"]["total"], report["total"] / 50, places=0)
+
+        self.manager.search_ranked("任务")
+        report = self.manager.memory_report(decoded=False)
+        self.assertGreater(report["bytes"]["indexes"]["search"], 0)
+        self.assertIsNone(report["decoded_json"])
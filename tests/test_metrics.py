@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 指标测试
+daily_task_tracker - tests/test_metrics.py
+功能：测试指标收集、Prometheus文本导出以及TaskManager/IO工具的指标埋点
+"""
+
+import os
+import sys
+import json
+import tempfile
+import urllib.request
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.task_manage import TaskManager
+from daily_task_tracker.utils import metrics
+from daily_task_tracker.utils.io_utils import read_json_file, write_json_file
+from daily_task_tracker.utils.metrics import (
+    MetricsRegistry,
+    record_cache_access,
+    start_metrics_server,
+    write_metrics_file
+)
+
+
+class TestMetricsRegistry(TestCase):
+    """测试指标注册表和Prometheus文本格式"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.registry = MetricsRegistry()
+
+    def test_counter_render(self):
+        """测试计数器渲染"""
+        counter = self.registry.counter("demo_total", "演示计数器", ["kind"])
+        counter.inc(kind="a")
+        counter.inc(2, kind='b"x')
+
+        text = self.registry.render()
+        self.assertIn("# TYPE demo_total counter", text)
+        self.assertIn('demo_total{kind="a"} 1', text)
+        self.assertIn('demo_total{kind="b\\"x"} 2', text)
+
+        with self.assertRaises(ValueError):
+            counter.inc(-1, kind="a")
+        with self.assertRaises(ValueError):
+            counter.inc(other="a")
+
+    def test_histogram_render(self):
+        """测试直方图桶累计、总和与计数"""
+        histogram = self.registry.histogram("latency_seconds", "延迟", ["operation"], buckets=(0.1, 1.0))
+        histogram.observe(0.05, operation="add")
+        histogram.observe(0.5, operation="add")
+        histogram.observe(5, operation="add")
+
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{operation="add",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{operation="add",le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{operation="add",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_sum{operation="add"} 5.55', text)
+        self.assertIn('latency_seconds_count{operation="add"} 3', text)
+
+    def test_register_same_name(self):
+        """测试重复注册返回同一个指标，冲突注册报错"""
+        first = self.registry.gauge("size", "大小")
+        self.assertIs(self.registry.gauge("size", "大小"), first)
+        with self.assertRaises(ValueError):
+            self.registry.counter("size", "大小")
+
+    def test_metric_subclass_must_implement_samples(self):
+        """测试没有实现抽象方法的指标子类在实例化时就报错"""
+        class Incomplete(metrics._Metric):
+            def reset(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            Incomplete("incomplete", "缺少 samples")
+
+
+class TestMetricsHooks(TestCase):
+    """测试TaskManager和IO工具的指标埋点"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        metrics.REGISTRY.reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        self.temp_data_file = os.path.join(self.temp_dir.name, "tasks.json")
+
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": self.temp_data_file}, f)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+        metrics.REGISTRY.reset()
+
+    def test_storage_io_bytes(self):
+        """测试IO工具记录读写字节数"""
+        write_json_file(self.temp_data_file, [{"key": "value"}])
+        size = os.path.getsize(self.temp_data_file)
+        read_json_file(self.temp_data_file)
+
+        self.assertEqual(metrics.STORAGE_IO_BYTES.get(direction="write"), size)
+        self.assertEqual(metrics.STORAGE_IO_BYTES.get(direction="read"), size)
+        self.assertEqual(metrics.STORAGE_IO_OPERATIONS.get(direction="read"), 1)
+
+    def test_task_manager_metrics(self):
+        """测试TaskManager记录操作延迟、存储规模和索引重建"""
+        manager = TaskManager(self.temp_config_file)
+        manager.add_task("任务1")
+        manager.add_task("任务2")
+        manager.search_tasks("任务")
+
+        self.assertEqual(metrics.OPERATION_LATENCY.get_count(operation="add_task"), 2)
+        self.assertEqual(metrics.OPERATION_LATENCY.get_count(operation="search_tasks"), 1)
+        self.assertEqual(metrics.STORE_TASKS.get(), 2)
+        self.assertEqual(metrics.STORE_BYTES.get(), os.path.getsize(self.temp_data_file))
+        self.assertEqual(metrics.INDEX_REBUILDS.get(index="id"), 1)
+
+        with self.assertRaises(ValueError):
+            manager.add_task("")
+        self.assertEqual(metrics.OPERATION_ERRORS.get(operation="add_task"), 1)
+
+    def test_cache_hit_ratio(self):
+        """测试缓存命中率"""
+        record_cache_access("demo", True)
+        record_cache_access("demo", True)
+        record_cache_access("demo", False)
+        record_cache_access("demo", True)
+
+        self.assertEqual(metrics.CACHE_HIT_RATIO.get(cache="demo"), 0.75)
+
+    def test_write_metrics_file(self):
+        """测试写入指标文件"""
+        metrics_file = os.path.join(self.temp_dir.name, "out", "tracker.prom")
+        metrics.STORE_TASKS.set(3)
+
+        self.assertTrue(write_metrics_file(metrics_file))
+        with open(metrics_file, "r", encoding="utf-8") as f:
+            self.assertIn("task_tracker_store_tasks 3", f.read())
+
+    def test_metrics_server(self):
+        """测试本地HTTP指标端点"""
+        metrics.STORE_TASKS.set(7)
+        server = start_metrics_server(0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                body = response.read().decode("utf-8")
+            self.assertIn("task_tracker_store_tasks 7", body)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()
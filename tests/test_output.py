@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 输出格式测试
+daily_task_tracker - tests/test_output.py
+功能：测试TaskStreamWriter的json、ndjson、csv、tsv输出，以及命令行输出被 | head 提前关闭时不打印异常
+"""
+
+import os
+import io
+import sys
+import csv
+import json
+import subprocess
+import tempfile
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.output import TaskStreamWriter, CSV_FIELDS
+from daily_task_tracker.task_manage import Task, TaskManager
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestTaskStreamWriter(TestCase):
+    """测试TaskStreamWriter类"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.tasks = [
+            Task("普通任务", task_id="1", created_at="2026-01-01T08:00:00"),
+            Task("含,逗号\t制表符", "第一行\n第二行 \"引号\"", task_id="2", due_date="2026-02-01",
+                 depends_on=["1"], priority="high", created_at="2026-01-02T08:00:00"),
+            Task("已完成", task_id="3", status="completed", created_at="2026-01-03T08:00:00"),
+        ]
+
+    def write(self, output_format, tasks, single=False, batch_rows=2):
+        stream = io.BytesIO()
+        count = TaskStreamWriter(output_format, stream, batch_rows=batch_rows).write(tasks, single=single)
+        return count, stream.getvalue().decode("utf-8")
+
+    def test_json_and_ndjson(self):
+        """测试json输出一个数组、ndjson每行一个对象，跨批次时分隔符正确"""
+        count, text = self.write("json", iter(self.tasks))
+        self.assertEqual(count, 3)
+        self.assertEqual(json.loads(text), [task.to_dict() for task in self.tasks])
+
+        _, text = self.write("ndjson", self.tasks)
+        self.assertEqual([json.loads(line) for line in text.splitlines()], [task.to_dict() for task in self.tasks])
+        self.assertTrue(text.endswith("}\n"))
+
+        _, text = self.write("json", self.tasks, single=True)
+        self.assertEqual(json.loads(text), self.tasks[0].to_dict())
+
+    def test_csv_and_tsv_round_trip(self):
+        """测试csv和tsv输出表头和每个任务一行，含分隔符、换行和引号的字段可以原样读回"""
+        for output_format, dialect in (("csv", csv.excel), ("tsv", csv.excel_tab)):
+            _, text = self.write(output_format, self.tasks)
+            rows = list(csv.reader(io.StringIO(text, newline=""), dialect))
+            self.assertEqual(rows[0], list(CSV_FIELDS))
+            self.assertEqual(len(rows), 4)
+            record = dict(zip(CSV_FIELDS, rows[2]))
+            self.assertEqual(record["title"], "含,逗号\t制表符")
+            self.assertEqual(record["description"], "第一行\n第二行 \"引号\"")
+            self.assertEqual(record["depends_on"], "1")
+            self.assertEqual(record["created_at"], "2026-01-02T08:00:00")
+            self.assertEqual(record["completed_at"], "")
+
+    def test_empty_output(self):
+        """测试没有任务时json输出空数组，csv只输出表头，ndjson不输出"""
+        self.assertEqual(self.write("json", []), (0, "[]\n"))
+        self.assertEqual(self.write("ndjson", []), (0, ""))
+        self.assertEqual(self.write("csv", [])[1], ",".join(CSV_FIELDS) + "\n")
+        with self.assertRaises(ValueError):
+            TaskStreamWriter("table")
+
+    def test_cli_closed_pipe(self):
+        """测试输出被下游提前关闭时命令行安静退出，不打印异常，也不继续编码剩余的任务"""
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "config.json"), "w", encoding="utf-8") as f:
+                json.dump({"data_file": os.path.join(directory, "tasks.json")}, f)
+            manager = TaskManager(os.path.join(directory, "config.json"))
+            with manager.deferred_save():
+                for i in range(5000):
+                    manager.add_task(f"任务 {i}")
+
+            process = subprocess.Popen([sys.executable, os.path.join(PROJECT_ROOT, "cli.py"), "list",
+                                        "--format", "ndjson"], cwd=directory,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            first = process.stdout.readline()
+            process.stdout.close()
+            stderr = process.stderr.read().decode("utf-8")
+            process.wait(timeout=60)
+        self.assertEqual(json.loads(first)["title"], "任务 0")
+        self.assertNotIn("Traceback", stderr)
+        self.assertEqual(process.returncode, 1)
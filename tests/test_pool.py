@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 多租户池测试
+daily_task_tracker - tests/test_pool.py
+功能：测试TaskManagerPool的按需打开、LRU淘汰、按估算内存淘汰、淘汰时保存和命中指标
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+from unittest import TestCase, mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker import pool as pool_module
+from daily_task_tracker.pool import TaskManagerPool, MANAGER_BASE_BYTES, TASK_BYTES
+from daily_task_tracker.task_manage import TaskManager
+from daily_task_tracker.utils import metrics
+
+
+class TestTaskManagerPool(TestCase):
+    """测试TaskManagerPool类"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        metrics.REGISTRY.reset()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        self.tenant_directory = os.path.join(self.temp_dir.name, "tenants")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json"),
+                       "tenant_directory": self.tenant_directory}, f)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+        metrics.REGISTRY.reset()
+
+    def open_tenant(self, tenant_id):
+        return TaskManager(self.temp_config_file, data_file=os.path.join(self.tenant_directory, f"{tenant_id}.json"))
+
+    def test_tenants_are_isolated_and_cached(self):
+        """测试每个租户使用自己的数据文件，再次访问返回同一个实例"""
+        pool = TaskManagerPool(self.temp_config_file)
+        alice = pool.get("alice")
+        alice.add_task("alice 的任务")
+        self.assertIs(pool.get("alice"), alice)
+        self.assertEqual(pool.get("bob").get_all_tasks(), [])
+        self.assertEqual([t.title for t in self.open_tenant("alice").get_all_tasks()], ["alice 的任务"])
+
+        self.assertEqual((pool.hits, pool.misses), (1, 2))
+        self.assertEqual(metrics.CACHE_REQUESTS.get(cache="tenant_pool", result="hit"), 1)
+        self.assertEqual(metrics.TENANTS_OPEN.get(), 2)
+        for tenant_id in ("../escape", "", ".hidden", "a/b"):
+            with self.assertRaises(ValueError):
+                pool.get(tenant_id)
+
+    def test_lru_eviction_by_count(self):
+        """测试超过租户数上限时淘汰最久未使用的租户"""
+        pool = TaskManagerPool(self.temp_config_file, max_tenants=2)
+        pool.get("a")
+        pool.get("b")
+        pool.get("a")
+        pool.get("c")
+        self.assertEqual(list(pool), ["a", "c"])
+        self.assertEqual(pool.evictions, 1)
+        self.assertEqual(metrics.TENANT_EVICTIONS.get(), 1)
+
+    def test_eviction_by_estimated_memory(self):
+        """测试按估算内存淘汰，刚访问的租户即使单独超限也保留"""
+        pool = TaskManagerPool(self.temp_config_file, max_bytes=2 * MANAGER_BASE_BYTES + 2 * TASK_BYTES)
+        big = pool.get("big")
+        for i in range(3):
+            big.add_task(f"任务 {i}")
+        pool.get("small")
+        self.assertEqual(list(pool), ["big", "small"])
+        # 再次访问时按新增的任务重新估算，超出上限，淘汰最久未使用的 small
+        pool.get("big")
+        self.assertEqual(list(pool), ["big"])
+        self.assertEqual(pool.total_bytes, MANAGER_BASE_BYTES + 3 * TASK_BYTES)
+
+    def test_write_behind_flushes_on_eviction(self):
+        """测试延迟写入时修改在淘汰和关闭时保存"""
+        pool = TaskManagerPool(self.temp_config_file, max_tenants=1, write_behind=True)
+        pool.get("a").add_task("延迟写入")
+        self.assertEqual(self.open_tenant("a").get_all_tasks(), [])
+        pool.get("b").add_task("关闭时写入")
+        self.assertEqual(len(self.open_tenant("a").get_all_tasks()), 1)
+
+        self.assertEqual(pool.close(), [])
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(len(self.open_tenant("b").get_all_tasks()), 1)
+        self.assertEqual(pool.stats()["evictions"], 1)
+
+    def test_checked_out_tenant_is_not_evicted(self):
+        """测试 checkout 中的租户不被淘汰，块结束后再淘汰并保存期间的修改"""
+        pool = TaskManagerPool(self.temp_config_file, max_tenants=1, write_behind=True)
+        with pool.checkout("a") as a:
+            pool.get("b")
+            self.assertEqual(list(pool), ["a", "b"])
+            self.assertFalse(pool.evict("a"))
+            a.add_task("使用中的修改")
+            self.assertIs(pool.get("a"), a)
+        self.assertEqual(list(pool), ["a"])
+        self.assertEqual(pool.close(), [])
+        self.assertEqual([t.title for t in self.open_tenant("a").get_all_tasks()], ["使用中的修改"])
+
+    def test_evicted_handle_writes_through(self):
+        """测试租户被淘汰后，调用方仍持有的实例的修改直接写入数据文件"""
+        pool = TaskManagerPool(self.temp_config_file, max_tenants=1, write_behind=True)
+        a = pool.get("a")
+        a.add_task("淘汰前")
+        pool.get("b")
+        self.assertNotIn("a", pool)
+        a.add_task("淘汰后")
+        self.assertEqual([t.title for t in self.open_tenant("a").get_all_tasks()], ["淘汰前", "淘汰后"])
+
+    def test_open_does_not_block_other_tenants(self):
+        """测试打开租户时不持有池锁：已打开租户的命中不等待，同时打开同一租户得到同一个实例"""
+        pool = TaskManagerPool(self.temp_config_file)
+        ready = pool.get("ready")
+        opening, release = threading.Event(), threading.Event()
+
+        def slow_open(*args, **kwargs):
+            opening.set()
+            release.wait(10)
+            return TaskManager(*args, **kwargs)
+
+        results = []
+        with mock.patch.object(pool_module, "TaskManager", slow_open):
+            threads = [threading.Thread(target=lambda: results.append(pool.get("slow"))) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            self.assertTrue(opening.wait(10))
+            hits = []
+            hit = threading.Thread(target=lambda: hits.append(pool.get("ready")))
+            hit.start()
+            hit.join(5)
+            released_early = not hit.is_alive()
+            release.set()
+            hit.join()
+            self.assertTrue(released_early)
+            self.assertIs(hits[0], ready)
+            for thread in threads:
+                thread.join()
+        self.assertIs(results[0], results[1])
+        self.assertIs(pool.get("slow"), results[0])
+        self.assertEqual(len(pool), 2)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 查询引擎测试
+daily_task_tracker - tests/test_query.py
+功能：测试有序索引、查询条件和查询计划
+"""
+
+import os
+import sys
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.query import Query, SortedIndex, execute_plan, plan_query
+from daily_task_tracker.task_manage import Task
+
+
+class TestSortedIndex(TestCase):
+    """测试有序索引"""
+    
+    def test_add_remove_range(self):
+        """测试增量维护和范围查询"""
+        index = SortedIndex([("2025-12-03", "c"), ("2025-12-01", "a")])
+        index.add("2025-12-02", "b")
+        index.add(None, "x")
+        
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.range("2025-12-02"), ["b", "c"])
+        self.assertEqual(index.range(None, "2025-12-02"), ["a", "b"])
+        self.assertEqual(index.count_range("2025-12-01", "2025-12-03"), 3)
+        
+        index.remove("2025-12-02", "b")
+        index.remove("2025-12-09", "missing")
+        self.assertEqual(index.range(), ["a", "c"])
+    
+    def test_after(self):
+        """测试取出键严格大于下界的索引项"""
+        index = SortedIndex([("2025-12-01T08:00:00", "a"), ("2025-12-01T09:00:00", "b"), ("2025-12-02T00:00:00", "c")])
+        self.assertEqual(index.after("2025-12-01T08:00:00"), [("2025-12-01T09:00:00", "b"), ("2025-12-02T00:00:00", "c")])
+        # 只给日期时包含当天
+        self.assertEqual([task_id for _, task_id in index.after("2025-12-01")], ["a", "b", "c"])
+        self.assertEqual(index.after("2025-12-02T00:00:00"), [])
+    
+    def test_date_upper_bound_includes_whole_day(self):
+        """测试日期形式的上界包含当天的所有时间"""
+        index = SortedIndex([("2025-12-01T23:59:59", "a"), ("2025-12-02T00:00:00", "b")])
+        query = Query(created_before="2025-12-01")
+        low, high = query.ranges["created_at"]
+        
+        self.assertEqual(index.range(low, high), ["a"])
+
+
+class TestQuery(TestCase):
+    """测试查询条件和查询计划"""
+    
+    def setUp(self):
+        """测试前的准备工作"""
+        self.tasks = [
+            Task("写报告", "项目报告", "2025-12-10", "pending", "1", "2025-12-01T09:00:00"),
+            Task("开会", "团队会议", "2025-12-05", "completed", "2", "2025-12-02T09:00:00"),
+            Task("买纸", "办公用品", None, "pending", "3", "2025-12-03T09:00:00"),
+        ]
+        self.status_index = {}
+        for task in self.tasks:
+            self.status_index.setdefault(task.status, set()).add(task.id)
+        self.sorted_indexes = {
+            field: SortedIndex((getattr(t, field), t.id) for t in self.tasks if getattr(t, field))
+            for field in ("due_date", "created_at", "updated_at")
+        }
+    
+    def test_invalid_sort(self):
+        """测试无效的排序字段"""
+        with self.assertRaises(ValueError):
+            Query(sort="priority")
+        self.assertTrue(Query(sort="due_date:desc").descending)
+        self.assertTrue(Query(sort="-due_date").descending)
+    
+    def test_matches(self):
+        """测试组合条件匹配"""
+        query = Query(status="pending", keyword="报告", due_before="2025-12-31")
+        self.assertEqual([t.id for t in self.tasks if query.matches(t)], ["1"])
+    
+    def test_plan_picks_most_selective_index(self):
+        """测试选择最有选择性的索引作为驱动"""
+        query = Query(status="pending", due_after="2025-12-08")
+        plan = plan_query(query, len(self.tasks), self.status_index, self.sorted_indexes)
+        
+        self.assertTrue(plan.driver.startswith("due_date"))
+        self.assertEqual(plan.driver_rows, 1)
+        self.assertEqual(plan.candidate_ids, {"1"})
+    
+    def test_plan_full_scan(self):
+        """测试没有可用索引时全表扫描"""
+        plan = plan_query(Query(keyword="会议"), len(self.tasks), self.status_index, self.sorted_indexes)
+        
+        self.assertIsNone(plan.driver)
+        self.assertIsNone(plan.candidate_ids)
+        self.assertIn("全表扫描", plan.describe()[0])
+
+    def test_paging_with_tied_values(self):
+        """测试排序值相同时按创建时间和ID排序，逐页读取不跳过也不重复"""
+        tasks = [Task(f"任务{i}", due_date="2025-12-10", task_id=f"t{i:02d}",
+                      created_at=f"2025-12-01T09:00:{i % 7:02d}") for i in range(20)]
+        tasks_by_id = {task.id: task for task in tasks}
+        status_index = {"pending": set(tasks_by_id)}
+        sorted_indexes = {field: SortedIndex((getattr(t, field), t.id) for t in tasks if getattr(t, field))
+                          for field in ("due_date", "created_at", "updated_at")}
+        expected = [task.id for task in sorted(tasks, key=lambda task: (task.created_at, task.id))]
+
+        for sort, order in (("due_date", expected), ("-due_date", expected[::-1])):
+            pages = []
+            for offset in range(0, 20, 3):
+                query = Query(status="pending", sort=sort, limit=3, offset=offset)
+                plan = plan_query(query, len(tasks), status_index, sorted_indexes)
+                pages.extend(task.id for task in execute_plan(plan, tasks_by_id, tasks))
+            self.assertEqual(pages, order)
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 重复任务测试
+daily_task_tracker - tests/test_recurrence.py
+功能：测试重复规则的解析和窗口展开，以及TaskManager中重复任务实例的按需展开和物化
+"""
+
+import os
+import sys
+import json
+import tempfile
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.recurrence import Recurrence
+from daily_task_tracker.task_manage import TaskManager
+
+
+class TestRecurrence(TestCase):
+    """测试Recurrence类"""
+
+    def test_parse_and_format(self):
+        """测试解析规则并输出规范形式"""
+        rule = Recurrence.parse("rrule:freq=weekly;byday=fr,mo", "2025-01-06")
+        self.assertEqual(str(rule), "FREQ=WEEKLY;BYDAY=MO,FR;DTSTART=2025-01-06")
+        self.assertEqual(str(Recurrence.parse(str(rule))), str(rule))
+        for invalid in ("FREQ=YEARLY", "INTERVAL=2", "FREQ=DAILY;INTERVAL=0",
+                        "FREQ=DAILY;BYDAY=MO", "FREQ=WEEKLY;BYDAY=XX", "FREQ=DAILY;COUNT=3"):
+            with self.assertRaises(ValueError):
+                Recurrence.parse(invalid, "2025-01-06")
+
+    def test_daily_window(self):
+        """测试每隔几天的规则直接从窗口所在的周期开始"""
+        rule = Recurrence.parse("FREQ=DAILY;INTERVAL=3;DTSTART=2025-01-01")
+        self.assertEqual(list(rule.occurrences("2025-03-01", "2025-03-07")),
+                         ["2025-03-02", "2025-03-05"])
+        self.assertEqual(list(rule.occurrences(None, "2024-12-31")), [])
+
+    def test_weekly_by_day(self):
+        """测试每周指定星期，开始日期之前的同周日期不算"""
+        rule = Recurrence.parse("FREQ=WEEKLY;BYDAY=MO,WE,FR;DTSTART=2025-01-08")
+        self.assertEqual(list(rule.occurrences("2025-01-01", "2025-01-14")),
+                         ["2025-01-08", "2025-01-10", "2025-01-13"])
+        biweekly = Recurrence.parse("FREQ=WEEKLY;INTERVAL=2;DTSTART=2025-01-06")
+        self.assertEqual(list(biweekly.occurrences("2025-01-07", "2025-02-05")),
+                         ["2025-01-20", "2025-02-03"])
+
+    def test_monthly_skips_short_months_and_until(self):
+        """测试没有该日期的月份被跳过，并在结束日期停止"""
+        rule = Recurrence.parse("FREQ=MONTHLY;BYMONTHDAY=31;DTSTART=2025-01-31;UNTIL=2025-08-30")
+        self.assertEqual(list(rule.occurrences()),
+                         ["2025-01-31", "2025-03-31", "2025-05-31", "2025-07-31"])
+
+
+class TestTaskManagerRecurrence(TestCase):
+    """测试TaskManager中的重复任务"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+        self.manager = TaskManager(self.temp_config_file)
+        # 2025-01-06 是周一
+        self.series = self.manager.add_task("倒垃圾", due_date="2025-01-06",
+                                            recurrence="FREQ=WEEKLY;BYDAY=MO,TH")
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_definition_is_stored_once(self):
+        """测试只保存定义，定义本身没有截止日期"""
+        self.assertEqual(len(self.manager.get_all_tasks()), 1)
+        self.assertIsNone(self.series.due_date)
+        self.assertEqual(self.series.recurrence, "FREQ=WEEKLY;BYDAY=MO,TH;DTSTART=2025-01-06")
+        with self.assertRaises(ValueError):
+            self.manager.add_task("无效", recurrence="FREQ=HOURLY")
+
+    def test_agenda_includes_virtual_occurrences(self):
+        """测试议程中包含按需展开的实例"""
+        self.manager.add_task("写周报", due_date="2025-01-09")
+        today = [t.id for t in self.manager.get_tasks_due_today(today="2025-01-13")]
+        self.assertEqual(today, [f"{self.series.id}@2025-01-13"])
+        week = self.manager.get_tasks_due_this_week(today="2025-01-07")
+        self.assertEqual([(t.title, t.due_date) for t in week],
+                         [("倒垃圾", "2025-01-09"), ("写周报", "2025-01-09")])
+        # 错过多次只报告最近的一次
+        overdue = self.manager.get_overdue_tasks(today="2025-01-14")
+        self.assertEqual([(t.title, t.due_date) for t in overdue],
+                         [("写周报", "2025-01-09"), ("倒垃圾", "2025-01-13")])
+
+    def test_finishing_occurrence_materializes_it(self):
+        """测试完成实例时才把它保存下来"""
+        occurrence_id = f"{self.series.id}@2025-01-09"
+        self.assertEqual(self.manager.get_task(occurrence_id).due_date, "2025-01-09")
+        self.assertIsNone(self.manager.get_task(f"{self.series.id}@2025-01-10"))
+
+        task = self.manager.mark_as_completed(occurrence_id)
+        self.assertEqual((task.status, task.series_id), ("completed", self.series.id))
+
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual(len(manager.get_all_tasks()), 2)
+        self.assertEqual(manager.get_tasks_due_this_week(today="2025-01-07"), [])
+        overdue = manager.get_overdue_tasks(today="2025-01-14")
+        self.assertEqual([t.due_date for t in overdue], ["2025-01-13"])
+        self.assertEqual(manager.get_overdue_tasks(today="2025-01-13"), [])
+
+    def test_invalid_update_does_not_materialize(self):
+        """测试对实例的无效修改不会把它保存下来"""
+        occurrence_id = f"{self.series.id}@2025-01-09"
+        with self.assertRaises(ValueError):
+            self.manager.update_task(occurrence_id, status="unknown")
+        with self.assertRaises(ValueError):
+            self.manager.update_task(occurrence_id, depends_on=["missing"])
+        self.assertEqual(len(self.manager.get_all_tasks()), 1)
+        self.assertEqual(len(TaskManager(self.temp_config_file).get_all_tasks()), 1)
+        self.assertEqual(self.manager.get_task(occurrence_id).status, "pending")
+
+    def test_list_and_query_include_occurrences(self):
+        """测试列表包含当前实例，按截止日期范围查询时展开窗口内的全部实例"""
+        page = self.manager.get_tasks_page()
+        self.assertEqual(len(page.tasks), 2)
+        self.assertEqual(page.tasks[1].series_id, self.series.id)
+
+        tasks = self.manager.query(due_after="2025-02-01", due_before="2025-02-10", sort="due_date")
+        self.assertEqual([t.due_date for t in tasks], ["2025-02-03", "2025-02-06", "2025-02-10"])
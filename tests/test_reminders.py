@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 提醒测试
+daily_task_tracker - tests/test_reminders.py
+功能：用注入的时钟测试提醒调度器的触发、重新安排和惰性删除，以及提醒服务对其他进程修改的响应
+"""
+
+import os
+import sys
+import json
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.reminders import ReminderScheduler, ReminderService, LogHook
+from daily_task_tracker.task_manage import TaskManager, Task
+
+
+class FakeClock:
+    """可以手动拨动的时钟"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += timedelta(**kwargs)
+
+
+class TestReminderScheduler(TestCase):
+    """测试ReminderScheduler类"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.clock = FakeClock(datetime(2025, 1, 10, 8, 0))
+        self.scheduler = ReminderScheduler(clock=self.clock)
+
+    def fired(self):
+        return [(r.kind, r.task_id) for r in self.scheduler.pop_due()]
+
+    def test_due_and_overdue(self):
+        """测试截止当天提醒到期，次日零点提醒过期；启动时已过去的提醒不补发"""
+        self.scheduler.load([Task("a", due_date="2025-01-10", task_id="a"),
+                             Task("old", due_date="2025-01-01", task_id="old"),
+                             Task("done", due_date="2025-01-10", status="completed", task_id="done")])
+        self.assertEqual(len(self.scheduler), 2)
+        self.assertEqual(self.scheduler.next_fire_time(), datetime(2025, 1, 10, 9, 0))
+        self.assertEqual(self.fired(), [])
+
+        self.clock.advance(hours=1)
+        self.assertEqual(self.fired(), [("due", "a")])
+        self.clock.advance(hours=15)
+        self.assertEqual(self.fired(), [("overdue", "a")])
+        self.assertIsNone(self.scheduler.next_fire_time())
+
+    def test_changes_replace_pending_reminders(self):
+        """测试修改截止日期、完成和删除任务后旧的提醒失效"""
+        self.scheduler.schedule("a", "a", "2025-01-10", "pending")
+        self.scheduler.schedule("b", "b", "2025-01-10", "pending")
+        self.scheduler.schedule("a", "a", "2025-01-11", "pending")
+        self.scheduler.on_change("update", Task("b", due_date="2025-01-10", status="completed", task_id="b"))
+
+        self.clock.advance(days=1, hours=1)
+        self.assertEqual(self.fired(), [("due", "a")])
+
+        self.scheduler.on_change("delete", Task("a", task_id="a"))
+        self.clock.advance(days=1)
+        self.assertEqual(self.fired(), [])
+
+    def test_catch_up_fires_latest_past_reminder(self):
+        """测试截止日期被改到过去时立即发出最近的一个提醒"""
+        self.scheduler.schedule("a", "a", "2025-01-05", "pending")
+        self.assertEqual(self.fired(), [("overdue", "a")])
+        # 状态没有变化的重复通知不会再次提醒
+        self.scheduler.schedule("a", "a", "2025-01-05", "pending")
+        self.assertEqual(self.fired(), [])
+
+    def test_stale_entries_are_compacted(self):
+        """测试反复修改同一任务时堆不会无限增长"""
+        for i in range(500):
+            self.scheduler.schedule("a", f"a{i}", "2025-02-01", "pending")
+        self.assertLess(len(self.scheduler._heap), 100)
+        self.clock.advance(days=30)
+        self.assertEqual([r.title for r in self.scheduler.pop_due()], ["a499", "a499"])
+
+
+class TestReminderService(TestCase):
+    """测试ReminderService类"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+        self.log_file = os.path.join(self.temp_dir.name, "reminders.log")
+        self.clock = FakeClock(datetime(2025, 1, 10, 8, 0))
+        self.manager = TaskManager(self.temp_config_file)
+        self.manager.add_task("写周报", due_date="2025-01-10")
+        self.service = ReminderService(self.manager, [LogHook(self.log_file)], ReminderScheduler(clock=self.clock))
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_in_process_and_external_changes(self):
+        """测试本进程的修改通过订阅送达，其他进程的修改通过变更日志送达"""
+        self.manager.add_task("交房租", due_date="2025-01-11")
+        other = TaskManager(self.temp_config_file)
+        task = other.search_tasks("写周报")[0]
+        other.update_task(task.id, due_date="2025-01-12")
+
+        self.assertEqual(self.service.tick(), [])
+        self.assertEqual(self.service.seconds_until_next(3600), 3600)
+        self.clock.advance(days=1, hours=1)
+        self.assertEqual([r.title for r in self.service.tick()], ["交房租"])
+
+        with open(self.log_file, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([(r["kind"], r["title"], r["due_date"]) for r in records],
+                         [("due", "交房租", "2025-01-11")])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 并行扫描测试
+daily_task_tracker - tests/test_scan.py
+功能：测试扫描谓词、并行扫描的结果顺序，以及TaskManager按阈值启用并行扫描
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.scan import KeywordPredicate, RegexPredicate, scan, scan_parallel, scan_serial
+from daily_task_tracker.task_manage import Task, TaskManager
+
+
+def is_even_numbered(task):
+    """模块级谓词，可以被序列化到工作进程"""
+    return int(task.title.split()[-1]) % 2 == 0
+
+
+class TestScan(TestCase):
+    """测试扫描函数"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.tasks = [Task(f"任务 {i}", "周报" if i % 3 == 0 else "") for i in range(50)]
+
+    def test_predicates(self):
+        """测试关键词和正则谓词"""
+        self.assertTrue(KeywordPredicate("周报")(self.tasks[0]))
+        self.assertFalse(KeywordPredicate("周报")(self.tasks[1]))
+        self.assertTrue(RegexPredicate(r"任务 4\d$")(self.tasks[42]))
+        self.assertFalse(RegexPredicate(r"任务 4\d$")(self.tasks[4]))
+        with self.assertRaises(ValueError):
+            RegexPredicate("([")
+
+    def test_parallel_matches_serial_order(self):
+        """测试并行扫描与顺序扫描结果一致且保持原顺序"""
+        for predicate in (KeywordPredicate("周报"), RegexPredicate(r"[13]$"), is_even_numbered):
+            expected = scan_serial(self.tasks, predicate)
+            self.assertEqual(scan_parallel(self.tasks, predicate, workers=2), expected)
+
+    def test_concurrent_scans_from_threads(self):
+        """测试多个线程同时并行扫描不同的任务列表时各自得到自己的结果"""
+        other = [Task(f"其他 {i}") for i in range(40)]
+        results = {}
+
+        def run(name, tasks):
+            results[name] = scan_parallel(tasks, is_even_numbered, workers=2)
+
+        threads = [threading.Thread(target=run, args=(name, tasks))
+                   for name, tasks in (("tasks", self.tasks), ("other", other))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results["tasks"], scan_serial(self.tasks, is_even_numbered))
+        self.assertEqual(results["other"], scan_serial(other, is_even_numbered))
+
+    def test_threshold(self):
+        """测试未达到阈值时顺序扫描（lambda谓词也可以使用）"""
+        self.assertEqual(len(scan(self.tasks, lambda task: True, threshold=100)), 50)
+        self.assertEqual(len(scan(self.tasks, lambda task: True, threshold=None)), 50)
+
+
+class TestTaskManagerScan(TestCase):
+    """测试TaskManager的正则搜索和谓词过滤"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json"),
+                       "parallel_scan_threshold": 4, "parallel_scan_workers": 2}, f)
+        self.manager = TaskManager(self.temp_config_file)
+        for i in range(8):
+            self.manager.add_task(f"任务 {i}", "编写周报" if i % 2 else "")
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_search_regex(self):
+        """测试正则搜索（超过阈值时并行扫描）"""
+        tasks = self.manager.search_tasks(r"任务 [2-5]$", regex=True)
+        self.assertEqual([t.title for t in tasks], ["任务 2", "任务 3", "任务 4", "任务 5"])
+        self.assertEqual(len(self.manager.search_tasks("周报")), 4)
+        with self.assertRaises(ValueError):
+            self.manager.search_tasks("([", regex=True)
+
+    def test_filter_tasks(self):
+        """测试任意谓词过滤"""
+        tasks = self.manager.filter_tasks(is_even_numbered)
+        self.assertEqual([t.title for t in tasks], ["任务 0", "任务 2", "任务 4", "任务 6"])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 全文检索测试
+daily_task_tracker - tests/test_search_index.py
+功能：测试分词、BM25排序、模糊匹配、增量维护以及TaskManager的排序检索
+"""
+
+import os
+import sys
+import json
+import tempfile
+from unittest import TestCase, mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.search_index import SearchIndex, tokenize
+from daily_task_tracker.task_manage import Task, TaskManager
+
+
+class TestSearchIndex(TestCase):
+    """测试SearchIndex类"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.tasks = [
+            Task("Weekly report", "send the report to the team", task_id="title"),
+            Task("Team sync", "discuss the weekly report", task_id="description"),
+            Task("Buy groceries", "milk and eggs", task_id="other"),
+            Task("编写项目报告", "季度总结", task_id="cjk"),
+        ]
+        self.index = SearchIndex.from_tasks(self.tasks)
+
+    def test_tokenize(self):
+        """测试ASCII单词和汉字二元组分词"""
+        self.assertEqual(tokenize("Fix bug-42 在项目里"), ["fix", "bug", "42", "在项", "项目", "目里"])
+        self.assertEqual(tokenize("学"), ["学"])
+
+    def test_title_hits_rank_higher(self):
+        """测试标题命中的得分高于描述命中"""
+        results = self.index.search("weekly report")
+        self.assertEqual([task_id for task_id, _ in results], ["title", "description"])
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_fuzzy(self):
+        """测试拼写错误（替换、删除、换位）也能命中"""
+        for query in ("reprot", "repor", "weekl", "grocerie"):
+            self.assertTrue(self.index.search(query), query)
+        self.assertEqual(self.index.search("reprot", fuzzy=False), [])
+        self.assertEqual([task_id for task_id, _ in self.index.search("项目报告")], ["cjk"])
+
+    def test_limit(self):
+        """测试只返回前K个结果"""
+        self.assertEqual(len(self.index.search("the", limit=1)), 1)
+        self.assertEqual(self.index.search("the", limit=0), [])
+
+    def test_incremental_update(self):
+        """测试增删改后的结果与全量构建一致"""
+        self.index.remove(self.tasks[0])
+        self.tasks[2].title = "Weekly groceries"
+        self.index.add(self.tasks[2])
+        self.assertEqual([task_id for task_id, _ in self.index.search("weekly")], ["other", "description"])
+        self.assertEqual(self.index.search("weekly"),
+                         SearchIndex.from_tasks(self.tasks[1:]).search("weekly"))
+        self.assertEqual(self.index.search("milk"), SearchIndex.from_tasks(self.tasks[1:]).search("milk"))
+        self.assertEqual(len(self.index), 3)
+
+
+class TestTaskManagerRankedSearch(TestCase):
+    """测试TaskManager的排序检索"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+        self.manager = TaskManager(self.temp_config_file)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_search_ranked_tracks_changes(self):
+        """测试索引建立后随任务增删改增量维护"""
+        first = self.manager.add_task("Quarterly planning", "budget review")
+        self.manager.add_task("Budget", "")
+        self.assertEqual([t.title for t, _ in self.manager.search_ranked("budget")],
+                         ["Budget", "Quarterly planning"])
+
+        self.manager.update_task(first.id, title="Budget budget planning")
+        self.assertEqual(self.manager.search_ranked("budget")[0][0].id, first.id)
+        self.manager.delete_task(first.id)
+        self.assertEqual([t.title for t, _ in self.manager.search_ranked("budgte")], ["Budget"])
+        self.assertEqual(self.manager.search_ranked("budget", limit=0), [])
+        with self.assertRaises(ValueError):
+            self.manager.search_ranked("budget", limit=-1)
+
+    def test_partitioned_store_persists_search_index(self):
+        """测试分区存储把全文索引写到派生文件，之后的实例直接加载，存储变化后重建"""
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json"),
+                       "storage": "partitioned", "sidecar_min_tasks": 0}, f)
+        manager = TaskManager(self.temp_config_file)
+        manager.add_task("Budget review")
+        manager.search_ranked("budget")
+        manager.add_task("Budget planning")
+        self.assertTrue(os.path.exists(manager.search_file))
+
+        with mock.patch.object(SearchIndex, "from_tasks", side_effect=AssertionError("rebuilt")):
+            results = TaskManager(self.temp_config_file).search_ranked("budget")
+        self.assertEqual(sorted(t.title for t, _ in results), ["Budget planning", "Budget review"])
+
+        # 其他写入方保存后清单变化，旧的派生文件不再使用
+        TaskManager(self.temp_config_file).add_task("Budget audit")
+        with open(self.temp_config_file, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        config["sidecar_min_tasks"] = 100
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        self.assertEqual(len(TaskManager(self.temp_config_file).search_ranked("budget")), 3)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 派生文件测试
+daily_task_tracker - tests/test_sidecar.py
+功能：测试派生文件的过期判断，以及TaskManager持久化索引和任务快照的加载和失效
+"""
+
+import os
+import sys
+import json
+import tempfile
+from unittest import TestCase, mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.sidecar import read_sidecar, write_sidecar
+from daily_task_tracker.storage import JsonFileStorage
+from daily_task_tracker.task_manage import TaskManager
+from daily_task_tracker.utils.io_utils import file_fingerprint
+
+
+class TestSidecar(TestCase):
+    """测试派生文件的读写和校验"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, "tasks.json")
+        self.sidecar = os.path.join(self.temp_dir.name, "tasks.index")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("[1, 2, 3]")
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """测试写入后按类型读回"""
+        payload = {"ids": ["a", "b"], "sorted": [("2025-01-01", "a")]}
+        self.assertTrue(write_sidecar(self.sidecar, "index", self.source, payload))
+        self.assertEqual(read_sidecar(self.sidecar, "index", self.source), payload)
+        self.assertIsNone(read_sidecar(self.sidecar, "cache", self.source))
+
+    def test_touch_keeps_sidecar_valid(self):
+        """测试只有修改时间变化、内容不变时仍然有效"""
+        write_sidecar(self.sidecar, "index", self.source, [1])
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(read_sidecar(self.sidecar, "index", self.source), [1])
+
+    def test_changed_source_invalidates_sidecar(self):
+        """测试数据文件内容变化后派生文件失效"""
+        write_sidecar(self.sidecar, "index", self.source, [1])
+        stat = os.stat(self.source)
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("[1, 2, 4]")
+        # 大小和修改时间都相同时按约定认为有效，这里改变修改时间以触发内容哈希比较
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(read_sidecar(self.sidecar, "index", self.source))
+
+        with open(self.sidecar, "wb") as f:
+            f.write(b"garbage")
+        self.assertIsNone(read_sidecar(self.sidecar, "index", self.source))
+
+    def test_same_size_rewrite_within_mtime_granularity(self):
+        """测试以读取前的指纹写出时也记录内容哈希，大小和修改时间都不变的改写同样使派生文件失效"""
+        fingerprint = file_fingerprint(self.source)
+        self.assertTrue(write_sidecar(self.sidecar, "index", self.source, [1], source=fingerprint))
+        self.assertEqual(read_sidecar(self.sidecar, "index", self.source), [1])
+
+        stat = os.stat(self.source)
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("[1, 2, 4]")
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(file_fingerprint(self.source), fingerprint)
+        self.assertIsNone(read_sidecar(self.sidecar, "index", self.source))
+
+
+class TestTaskManagerIndexSidecar(TestCase):
+    """测试TaskManager的持久化索引"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        self.temp_data_file = os.path.join(self.temp_dir.name, "tasks.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": self.temp_data_file, "sidecar_min_tasks": 0}, f)
+        manager = TaskManager(self.temp_config_file)
+        manager.add_task("写周报", due_date="2025-01-10")
+        task = manager.add_task("修复登录问题")
+        manager.mark_as_completed(task.id)
+        manager.search_ranked("周报")
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_indexes_restored_from_sidecar(self):
+        """测试有效的索引文件直接恢复索引（包括全文索引）"""
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "tasks.index")))
+        manager = TaskManager(self.temp_config_file)
+        self.assertIsNotNone(manager._search_index)
+        self.assertEqual([t.title for t in manager.get_tasks_by_status("completed")], ["修复登录问题"])
+        self.assertEqual([t.title for t in manager.query(due_before="2025-01-31")], ["写周报"])
+        self.assertEqual(manager.search_ranked("周报")[0][0].title, "写周报")
+
+    def test_stale_sidecar_is_rebuilt(self):
+        """测试数据文件被外部修改后忽略旧的索引文件"""
+        with open(self.temp_data_file, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        records[0]["status"] = "in_progress"
+        with open(self.temp_data_file, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+
+        manager = TaskManager(self.temp_config_file)
+        self.assertIsNone(manager._search_index)
+        self.assertEqual([t.title for t in manager.get_tasks_by_status("in_progress")], ["写周报"])
+        self.assertEqual(manager.get_tasks_by_status("pending"), [])
+
+    def test_index_not_stamped_after_concurrent_save(self):
+        """测试加载之后其他写入方保存了修改时，本实例按旧数据建立的索引不会以有效的标记写出"""
+        os.remove(os.path.join(self.temp_dir.name, "tasks.index"))
+        stale = TaskManager(self.temp_config_file)
+        writer = TaskManager(self.temp_config_file)
+        writer.update_task(writer.get_all_tasks()[0].id, status="in_progress")
+        # 按加载时的数据建立全文索引并尝试持久化
+        stale.search_ranked("周报")
+
+        manager = TaskManager(self.temp_config_file)
+        task_id = manager.get_all_tasks()[0].id
+        self.assertEqual(manager._status_index.get("in_progress"), {task_id})
+        self.assertFalse(manager._status_index.get("pending"))
+
+    def test_snapshot_matches_data_file(self):
+        """测试任务快照与数据文件内容一致，删除快照后仍从数据文件加载"""
+        snapshot_file = os.path.join(self.temp_dir.name, "tasks.cache")
+        self.assertTrue(os.path.exists(snapshot_file))
+        with open(self.temp_data_file, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual([t.to_dict() for t in manager.get_all_tasks()], records)
+
+        os.remove(snapshot_file)
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual([t.to_dict() for t in manager.get_all_tasks()], records)
+        self.assertTrue(os.path.exists(snapshot_file))
+
+    def test_stale_snapshot_is_ignored(self):
+        """测试数据文件被外部修改后以数据文件为准"""
+        with open(self.temp_data_file, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        records[1]["title"] = "外部修改"
+        with open(self.temp_data_file, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual(manager.get_all_tasks()[1].title, "外部修改")
+
+    def test_snapshot_checked_against_content_hash(self):
+        """测试数据文件被改写为同样大小并保留修改时间时，快照和索引按内容哈希判为过期"""
+        stat = os.stat(self.temp_data_file)
+        with open(self.temp_data_file, "r", encoding="utf-8") as f:
+            text = f.read()
+        with open(self.temp_data_file, "w", encoding="utf-8") as f:
+            f.write(text.replace("写周报", "写月报"))
+        os.utime(self.temp_data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual(manager.get_all_tasks()[0].title, "写月报")
+        self.assertEqual(manager.search_ranked("月报")[0][0].title, "写月报")
+
+    def test_snapshot_not_stamped_after_concurrent_save(self):
+        """测试解析数据文件之后其他写入方保存了修改时，旧任务列表不会写成有效的快照，也不会覆盖对方的修改"""
+        os.remove(os.path.join(self.temp_dir.name, "tasks.cache"))
+        read_partition = JsonFileStorage.read_partition
+
+        def read_then_concurrent_save(storage, key):
+            records = read_partition(storage, key)
+            with mock.patch.object(JsonFileStorage, "read_partition", read_partition):
+                writer = TaskManager(self.temp_config_file)
+                writer.update_task(writer.get_all_tasks()[0].id, title="CHANGED-BY-WRITER")
+            return records
+
+        with mock.patch.object(JsonFileStorage, "read_partition", read_then_concurrent_save):
+            stale = TaskManager(self.temp_config_file)
+        self.assertEqual(stale.get_all_tasks()[0].title, "写周报")
+
+        self.assertEqual(TaskManager(self.temp_config_file).get_all_tasks()[0].title, "CHANGED-BY-WRITER")
+        # 修改前在锁内发现数据已变化并重新加载，不会把对方的修改改回去
+        stale.add_task("新任务")
+        titles = [t.title for t in TaskManager(self.temp_config_file).get_all_tasks()]
+        self.assertEqual(titles[0], "CHANGED-BY-WRITER")
+        self.assertIn("新任务", titles)
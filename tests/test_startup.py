@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 启动开销测试
+daily_task_tracker - tests/test_startup.py
+功能：用 python -X importtime 检查导入包和 task-cli --help 不加载存储代码、没有磁盘I/O，且导入耗时在预算之内
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import daily_task_tracker
+from daily_task_tracker import utils
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 导入耗时预算（微秒）：本机约为预算的四分之一，留出较慢机器的余量
+PACKAGE_IMPORT_BUDGET_US = 50_000
+CLI_HELP_IMPORT_BUDGET_US = 100_000
+
+# 这些模块只应在执行子命令时才导入
+STORAGE_MODULES = ("task_manage", "storage", "archive", "changes", "reminders", "sync", "scan", "config")
+
+
+def import_times(argv, cwd):
+    """
+    用 -X importtime 运行Python
+
+    Returns:
+        {模块名: 累计导入耗时（微秒）}，只包含运行 python -c pass 时不会导入的模块
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    def run(arguments):
+        result = subprocess.run([sys.executable, "-X", "importtime"] + arguments, cwd=cwd, env=env,
+                                capture_output=True, text=True, timeout=60)
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative)
+        return result.returncode, times
+
+    code, times = run(argv)
+    assert code == 0, f"运行失败: {argv}"
+    _, baseline = run(["-c", "pass"])
+    return {name: value for name, value in times.items() if name not in baseline}
+
+
+class TestStartup(TestCase):
+    """测试导入包和 task-cli --help 的启动开销"""
+
+    def test_package_import_is_lazy(self):
+        """测试导入包不加载 task_manage 和 config，且没有磁盘I/O（不创建 config.json）"""
+        with tempfile.TemporaryDirectory() as directory:
+            times = import_times(["-c", "import daily_task_tracker, daily_task_tracker.utils"], directory)
+            self.assertEqual(os.listdir(directory), [])
+        loaded = [name for name in times if name.startswith("daily_task_tracker.")]
+        self.assertEqual(loaded, ["daily_task_tracker.utils"])
+        self.assertLess(times["daily_task_tracker"], PACKAGE_IMPORT_BUDGET_US)
+
+    def test_cli_help_does_not_import_storage(self):
+        """测试 task-cli --help 只解析参数，不导入存储、同步和提醒模块"""
+        times = import_times(["cli.py", "--help"], PROJECT_ROOT)
+        for module in STORAGE_MODULES:
+            self.assertNotIn(module, times)
+        # 只统计顶层导入（嵌套导入已包含在累计耗时中）
+        total = sum(value for name, value in times.items() if "." not in name)
+        self.assertLess(total, CLI_HELP_IMPORT_BUDGET_US)
+
+    def test_lazy_attributes(self):
+        """测试包和工具模块的名称在第一次访问时导入，未知名称抛出AttributeError"""
+        self.assertIs(daily_task_tracker.TaskManager, sys.modules["daily_task_tracker.task_manage"].TaskManager)
+        self.assertTrue(utils.validate_task_title("标题")[0])
+        self.assertIn("backup_file", dir(utils))
+        with self.assertRaises(AttributeError):
+            daily_task_tracker.missing
+        with self.assertRaises(AttributeError):
+            utils.missing
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 统计测试
+daily_task_tracker - tests/test_stats.py
+功能：测试增量维护的任务统计
+"""
+
+import os
+import sys
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.stats import TaskStats
+from daily_task_tracker.task_manage import Task
+
+
+class TestTaskStats(TestCase):
+    """测试TaskStats类"""
+    
+    def setUp(self):
+        """测试前的准备工作"""
+        self.tasks = [
+            Task("过期任务", "", "2025-12-01", "pending", "1", "2025-11-20T09:00:00"),
+            Task("今天截止", "", "2025-12-10", "in_progress", "2", "2025-11-25T09:00:00"),
+            Task("已完成", "", "2025-12-01", "completed", "3", "2025-12-08T09:00:00",
+                 completed_at="2025-12-09T09:00:00"),
+            Task("旧数据已完成", "", None, "completed", "4", "2025-12-02T09:00:00",
+                 updated_at="2025-12-04T09:00:00"),
+        ]
+        self.stats = TaskStats.from_tasks(self.tasks)
+    
+    def test_summary(self):
+        """测试统计摘要"""
+        summary = self.stats.summary(today="2025-12-10", days=3, weeks=2)
+        
+        self.assertEqual(summary["total"], 4)
+        self.assertEqual(summary["by_status"], {"pending": 1, "in_progress": 1, "completed": 2})
+        self.assertEqual(summary["overdue"], 1)
+        self.assertEqual(summary["completed_per_day"],
+                         [("2025-12-08", 0), ("2025-12-09", 1), ("2025-12-10", 0)])
+        self.assertEqual(summary["completed_per_week"], [("2025-W49", 1), ("2025-W50", 1)])
+        # 平均耗时: (1天 + 2天) / 2
+        self.assertEqual(summary["average_completion_seconds"], 1.5 * 86400)
+    
+    def test_incremental_update_matches_rebuild(self):
+        """测试增量更新与全量重建结果一致"""
+        self.assertEqual(self.stats.overdue_count("2025-12-10"), 1)
+        
+        task = self.tasks[1]
+        self.stats.remove(task)
+        task.update(status="completed")
+        self.stats.add(task)
+        
+        self.stats.remove(self.tasks[0])
+        
+        rebuilt = TaskStats.from_tasks([self.tasks[1], self.tasks[2], self.tasks[3]])
+        self.assertEqual(self.stats.to_dict(), rebuilt.to_dict())
+        self.assertEqual(self.stats.overdue_count("2025-12-10"), 0)
+        # 日期变化后重新汇总
+        self.assertEqual(self.stats.overdue_count("2026-01-01"), 0)
+    
+    def test_to_dict_roundtrip(self):
+        """测试持久化往返"""
+        restored = TaskStats.from_dict(self.stats.to_dict())
+        
+        self.assertEqual(restored.summary("2025-12-10"), self.stats.summary("2025-12-10"))
+        self.assertIsNone(TaskStats.from_dict({"version": -1}))
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 存储后端测试
+daily_task_tracker - tests/test_storage.py
+功能：测试分区摘要、分区裁剪、单文件数据迁移、紧凑行格式，以及TaskManager在分区存储上的按需加载和局部写入
+"""
+
+import os
+import sys
+import json
+import tempfile
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.storage import (PartitionedStorage, summarize_partition, open_storage,
+                                       STORAGE_JSON, STORAGE_PARTITIONED, FORMAT_ROWS)
+from daily_task_tracker.task_manage import TaskManager
+
+
+def make_record(task_id, created_at, status="pending", due_date=None):
+    """生成测试用的任务记录"""
+    return {"id": task_id, "title": f"任务{task_id}", "description": "", "status": status,
+            "due_date": due_date, "created_at": created_at, "updated_at": created_at}
+
+
+HISTORY = [
+    make_record("a", "2024-01-05T09:00:00", "completed", "2024-01-10"),
+    make_record("b", "2024-01-20T09:00:00", "pending", "2024-02-01"),
+    make_record("c", "2024-06-01T09:00:00", "completed"),
+    make_record("d", "2025-12-01T09:00:00", "in_progress", "2025-12-20"),
+]
+
+
+class TestPartitionedStorage(TestCase):
+    """测试PartitionedStorage类"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.temp_dir.name, "tasks.json")
+        with open(self.data_file, "w", encoding="utf-8") as f:
+            json.dump(HISTORY, f)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_summarize_partition(self):
+        """测试分区摘要"""
+        summary = summarize_partition(HISTORY[:2])
+        self.assertEqual(summary["count"], 2)
+        self.assertEqual(summary["status_counts"], {"completed": 1, "pending": 1})
+        self.assertEqual(summary["spans"]["due_date"], ["2024-01-10", "2024-02-01"])
+        self.assertEqual(summary["spans"]["open_due"], ["2024-02-01", "2024-02-01"])
+
+    def test_migrate_from_json_file(self):
+        """测试首次打开时把单文件数据按月拆分"""
+        storage = PartitionedStorage(self.data_file)
+        self.assertEqual(storage.partitions(), ["2024-01", "2024-06", "2025-12"])
+        self.assertEqual(storage.task_count(), 4)
+        self.assertEqual([r["id"] for r in storage.read_partition("2024-01")], ["a", "b"])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "tasks.manifest.json")))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "tasks-2025-12.json")))
+
+    def test_prune(self):
+        """测试按状态和取值范围裁剪分区"""
+        storage = PartitionedStorage(self.data_file)
+        self.assertEqual(storage.prune(status="in_progress"), ["2025-12"])
+        self.assertEqual(storage.prune(ranges={"created_at": ("2024-05-01", None)}), ["2024-06", "2025-12"])
+        self.assertEqual(storage.prune(ranges={"open_due": (None, "2025-01-01")}), ["2024-01"])
+        self.assertEqual(storage.prune(ranges={"due_date": ("2026-01-01", None)}), [])
+
+    def test_write_empty_partition_removes_it(self):
+        """测试分区变空时删除分区文件和清单条目"""
+        storage = PartitionedStorage(self.data_file)
+        storage.write_partition("2024-06", [])
+        storage.commit()
+        self.assertEqual(PartitionedStorage(self.data_file).partitions(), ["2024-01", "2025-12"])
+        self.assertFalse(os.path.exists(storage.path_of("2024-06")))
+
+    def test_invalid_storage_kind(self):
+        """测试无效的存储类型"""
+        with self.assertRaises(ValueError):
+            open_storage(self.data_file, "sqlite")
+        with self.assertRaises(ValueError):
+            open_storage(self.data_file, STORAGE_JSON, "yaml")
+
+
+class TestRowsFormat(TestCase):
+    """测试紧凑行格式的任务文件"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        self.temp_data_file = os.path.join(self.temp_dir.name, "tasks.json")
+        with open(self.temp_data_file, "w", encoding="utf-8") as f:
+            json.dump(HISTORY, f, indent=2)
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": self.temp_data_file, "data_format": FORMAT_ROWS}, f)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_existing_file_converted_on_save(self):
+        """测试旧格式的文件照常加载，保存后改为行格式且内容不变"""
+        size = os.path.getsize(self.temp_data_file)
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual([t.to_dict() for t in manager.get_all_tasks()], HISTORY)
+        manager.update_task("a", title="任务a")
+
+        with open(self.temp_data_file, "r", encoding="utf-8") as f:
+            header = f.readline()
+        self.assertTrue(header.startswith('{"format":"rows","version":1,"fields":["id","title",'))
+        self.assertLess(os.path.getsize(self.temp_data_file), size)
+        records = [t.to_dict() for t in TaskManager(self.temp_config_file).get_all_tasks()]
+        self.assertEqual([r["id"] for r in records], ["a", "b", "c", "d"])
+        self.assertEqual(records[1:], HISTORY[1:])
+
+    def test_partitioned_storage_writes_rows(self):
+        """测试分区文件同样使用行格式"""
+        storage = open_storage(self.temp_data_file, STORAGE_PARTITIONED, FORMAT_ROWS)
+        with open(storage.path_of("2024-01"), "r", encoding="utf-8") as f:
+            self.assertTrue(f.read().startswith('{"format":"rows"'))
+        self.assertEqual(storage.read_partition("2024-01"), HISTORY[:2])
+
+
+class TestPartitionedTaskManager(TestCase):
+    """测试TaskManager在分区存储上的行为"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        self.temp_data_file = os.path.join(self.temp_dir.name, "tasks.json")
+        with open(self.temp_data_file, "w", encoding="utf-8") as f:
+            json.dump(HISTORY, f)
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": self.temp_data_file, "storage": "partitioned"}, f)
+        # 第一次打开时迁移并持久化统计，之后的打开只读取清单
+        TaskManager(self.temp_config_file)
+        self.manager = TaskManager(self.temp_config_file)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_open_reads_no_partitions(self):
+        """测试打开存储时不加载任何分区，统计仍然完整"""
+        self.assertEqual(self.manager.tasks, [])
+        self.assertEqual(self.manager.get_stats(today="2025-12-10")["total"], 4)
+        self.assertEqual(self.manager.get_stats(today="2025-12-10")["overdue"], 1)
+
+    def test_queries_load_only_needed_partitions(self):
+        """测试范围查询和过期扫描跳过不相关的分区"""
+        tasks = self.manager.query(created_after="2025-01-01")
+        self.assertEqual([t.id for t in tasks], ["d"])
+        self.assertEqual(self.manager._loaded_partitions, {"2025-12"})
+
+        overdue = self.manager.get_overdue_tasks(today="2025-12-10")
+        self.assertEqual([t.id for t in overdue], ["b"])
+        self.assertEqual(self.manager._loaded_partitions, {"2024-01", "2025-12"})
+
+        self.assertEqual([t.id for t in self.manager.get_all_tasks()], ["a", "b", "c", "d"])
+
+    def test_get_task_loads_partitions_newest_first(self):
+        """测试按ID查找时从最新的分区开始加载"""
+        self.assertEqual(self.manager.get_task("d").id, "d")
+        self.assertEqual(self.manager._loaded_partitions, {"2025-12"})
+        self.assertIsNone(self.manager.get_task("missing"))
+
+    def test_update_writes_only_touched_partition(self):
+        """测试修改任务时只重写它所在的分区"""
+        cold_files = [self.manager.storage.path_of(key) for key in ("2024-01", "2024-06")]
+        cold_mtimes = [os.stat(path).st_mtime_ns for path in cold_files]
+
+        self.manager.mark_as_completed("d")
+        self.manager.add_task("新任务")
+        self.assertEqual([os.stat(path).st_mtime_ns for path in cold_files], cold_mtimes)
+        self.assertFalse({"2024-01", "2024-06"} & self.manager._loaded_partitions)
+
+        manager = TaskManager(self.temp_config_file)
+        self.assertEqual(manager.get_task("d").status, "completed")
+        self.assertEqual(manager.get_stats(today="2025-12-10")["by_status"],
+                         {"completed": 3, "pending": 2})
+        self.assertEqual(len(manager.get_all_tasks()), 5)
+
+    def test_delete_last_task_in_partition(self):
+        """测试删除分区中的最后一个任务"""
+        self.assertTrue(self.manager.delete_task("c"))
+        manager = TaskManager(self.temp_config_file)
+        self.assertNotIn("2024-06", manager.storage.partitions())
+        self.assertEqual([t.id for t in manager.get_all_tasks()], ["a", "b", "d"])
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 并发写入测试
+daily_task_tracker - tests/test_stress.py
+功能：测试多个写入方共用一个存储时的事务（加锁、发现外部修改后重新加载），以及多进程多线程压力测试的核对
+"""
+
+import os
+import sys
+import json
+import tempfile
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.stress import run_stress, seed_store, verify_store, percentile
+from daily_task_tracker.task_manage import TaskManager
+
+
+class TestConcurrentWriters(TestCase):
+    """测试两个TaskManager写同一个存储"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_stale_writer_reloads_before_mutating(self):
+        """测试先打开的实例修改前发现另一个实例的保存，不覆盖它的修改，序号不重复"""
+        first = TaskManager(self.temp_config_file)
+        second = TaskManager(self.temp_config_file)
+        kept = second.add_task("第二个实例添加")
+        task = first.add_task("第一个实例添加")
+        second.update_task(kept.id, title="第二个实例修改")
+        first.update_task(task.id, status="completed")
+
+        titles = sorted(t.title for t in TaskManager(self.temp_config_file).get_all_tasks())
+        self.assertEqual(titles, ["第一个实例添加", "第二个实例修改"])
+        self.assertEqual([c["seq"] for c in first.changes_since(0)], [1, 2, 3, 4])
+
+    def test_deferred_save_is_one_transaction(self):
+        """测试延迟保存块在写锁内执行，块内的修改基于最新数据"""
+        first = TaskManager(self.temp_config_file)
+        TaskManager(self.temp_config_file).add_task("外部添加")
+        with first.deferred_save():
+            self.assertEqual([t.title for t in first.get_all_tasks()], ["外部添加"])
+            first.add_task("块内添加")
+        self.assertEqual(len(TaskManager(self.temp_config_file).get_all_tasks()), 2)
+        self.assertFalse([name for name in os.listdir(self.temp_dir.name) if name.endswith(".tmp")])
+
+
+class TestStressHarness(TestCase):
+    """测试压力测试工具"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def test_processes_and_threads(self):
+        """测试多进程多线程混合操作后存储与各写入方的账本一致"""
+        report = run_stress(self.temp_config_file, processes=2, threads=2, operations=25, seed=3)
+        self.assertEqual(report.errors, [])
+        self.assertEqual(report.operations, 100)
+        self.assertGreater(report.throughput, 0)
+        self.assertEqual(set(report.to_dict()["latency_ms"]), {"add", "update", "delete", "read"})
+
+    def test_with_sidecars(self):
+        """测试任务数达到 sidecar_min_tasks 时（读取走快照和索引文件）并发写入后仍与账本一致"""
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json"), "sidecar_min_tasks": 20}, f)
+        seed_store(self.temp_config_file, 20)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "tasks.cache")))
+        report = run_stress(self.temp_config_file, processes=2, threads=2, operations=25, seed=5)
+        self.assertEqual(report.errors, [])
+
+    def test_verify_store_detects_problems(self):
+        """测试核对能发现丢失的任务、丢失的更新、复活的删除和序号缺口"""
+        manager = TaskManager(self.temp_config_file)
+        kept = manager.add_task("保留")
+        revived = manager.add_task("应已删除")
+        ledger = {kept.id: "改过的标题", revived.id: None, "missing": "从未保存"}
+        errors = verify_store(self.temp_config_file, [ledger], set(), 0, 3)
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(verify_store(self.temp_config_file, [{kept.id: "保留", revived.id: "应已删除"}],
+                                      set(), 0, 2), [])
+
+    def test_percentile(self):
+        """测试最近秩百分位数"""
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([], 95), 0.0)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 同步测试
+daily_task_tracker - tests/test_sync.py
+功能：测试Merkle树的增量维护和差异查找、冲突决策，以及两个任务存储之间的双向同步
+"""
+
+import os
+import sys
+import json
+import tempfile
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.sync import MerkleTree, diff_trees, resolve, sync_managers, STATE_LIVE, STATE_DELETED
+from daily_task_tracker.task_manage import TaskManager
+
+
+class TestMerkleTree(TestCase):
+    """测试MerkleTree类"""
+
+    def build(self, count):
+        tree = MerkleTree()
+        for i in range(count):
+            tree.set(f"task-{i}", i)
+        return tree
+
+    def test_incremental_matches_rebuild(self):
+        """测试增量修改后的树与重新构建的树相同"""
+        tree = self.build(300)
+        tree.set("task-5", 999)
+        tree.discard("task-7")
+        tree.set("task-7", 7)
+        tree.set("task-5", 5)
+        self.assertEqual(tree._nodes, self.build(300)._nodes)
+        self.assertEqual(MerkleTree.from_dict(tree.to_dict())._nodes, tree._nodes)
+
+    def test_diff_only_expands_changed_subtrees(self):
+        """测试只展开不同的子树，比较的节点数与差异成正比而不是与任务数成正比"""
+        local, remote = self.build(5000), self.build(5000)
+        self.assertEqual(diff_trees(local, remote), ([], 1))
+
+        remote.set("task-42", -1)
+        remote.discard("task-43")
+        local.set("only-local", 1)
+        differing, compared = diff_trees(local, remote)
+        self.assertEqual(differing, ["only-local", "task-42", "task-43"])
+        self.assertLess(compared, 3 * 16 * 3 + 1)
+
+    def test_resolve(self):
+        """测试冲突策略"""
+        old = (STATE_LIVE, {"title": "旧"}, "2025-01-01T00:00:00")
+        new = (STATE_LIVE, {"title": "新"}, "2025-01-02T00:00:00")
+        deleted = (STATE_DELETED, None, "2025-01-01T12:00:00")
+        self.assertIsNone(resolve(old, old, "newest"))
+        self.assertEqual(resolve(None, old, "local"), "remote")
+        self.assertEqual(resolve(old, new, "newest"), "remote")
+        self.assertEqual(resolve(old, new, "local"), "local")
+        self.assertEqual(resolve(deleted, old, "newest"), "local")
+        self.assertEqual(resolve(deleted, new, "newest"), "remote")
+
+
+class TestSyncManagers(TestCase):
+    """测试两个任务存储之间的同步"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        self.local_file = os.path.join(self.temp_dir.name, "a", "tasks.json")
+        self.remote_file = os.path.join(self.temp_dir.name, "b", "tasks.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": self.local_file, "sidecar_min_tasks": 0}, f)
+        self.local = TaskManager(self.temp_config_file)
+        self.shared = self.local.add_task("共享任务")
+        self.doomed = self.local.add_task("将被删除")
+        self.remote = TaskManager(self.temp_config_file, data_file=self.remote_file)
+        sync_managers(self.local, self.remote)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+
+    def open(self, data_file):
+        return TaskManager(self.temp_config_file, data_file=data_file)
+
+    def snapshot(self, manager):
+        return sorted((t.id, t.title, t.status, t.updated_at) for t in manager.get_all_tasks())
+
+    def test_initial_sync_copies_tasks(self):
+        """测试第一次同步把任务原样（ID和时间戳）复制到空的存储"""
+        self.assertEqual(self.snapshot(self.open(self.remote_file)), self.snapshot(self.local))
+
+    def test_two_way_changes_and_deletes(self):
+        """测试两边的新增、修改和删除双向合并，再次同步没有差异"""
+        remote = self.open(self.remote_file)
+        remote.add_task("对方新增")
+        remote.delete_task(self.doomed.id)
+        self.local.add_task("本地新增")
+        self.local.update_task(self.shared.id, title="本地改名")
+
+        result = sync_managers(self.local, remote)
+        # 两边都有、内容不同的任务（改名和删除）按冲突策略决定
+        self.assertEqual((result.pulled, result.pushed, result.conflicts), (2, 2, 2))
+
+        local, remote = self.open(self.local_file), self.open(self.remote_file)
+        self.assertEqual(self.snapshot(local), self.snapshot(remote))
+        self.assertEqual(sorted(t.title for t in local.get_all_tasks()), ["对方新增", "本地改名", "本地新增"])
+        # 删除通过墓碑传播，不会被对方的副本恢复
+        self.assertEqual(sync_managers(local, remote), (0, 0, 0, 1))
+
+    def test_conflict_policy_and_dry_run(self):
+        """测试冲突策略和预演"""
+        remote = self.open(self.remote_file)
+        remote.update_task(self.shared.id, title="对方改名")
+        self.local.update_task(self.shared.id, title="本地改名")
+
+        result = sync_managers(self.local, remote, dry_run=True)
+        self.assertEqual((result.pulled, result.pushed, result.conflicts), (0, 1, 1))
+        self.assertEqual(self.open(self.remote_file).get_task(self.shared.id).title, "对方改名")
+
+        sync_managers(self.local, remote, policy="remote")
+        self.assertEqual(self.open(self.local_file).get_task(self.shared.id).title, "对方改名")
+        with self.assertRaises(ValueError):
+            sync_managers(self.local, remote, policy="random")
+
+    def test_archived_task_syncs_once(self):
+        """测试归档任务参与同步：对方的修改取回归档任务而不是再添加一份，两边的树一致"""
+        self.local.mark_as_completed(self.shared.id)
+        sync_managers(self.local, self.remote)
+        self.assertEqual(self.local.archive_completed("2999-01-01"), 1)
+        self.assertEqual(sync_managers(self.local, self.remote).compared_nodes, 1)
+
+        remote = self.open(self.remote_file)
+        remote.update_task(self.shared.id, title="对方修改")
+        self.assertEqual(sync_managers(self.local, remote).pulled, 1)
+
+        local = self.open(self.local_file)
+        tasks = local.get_all_tasks(include_archived=True)
+        self.assertEqual(sorted(t.id for t in tasks), sorted({t.id for t in tasks}))
+        self.assertEqual(local.get_task(self.shared.id).title, "对方修改")
+        self.assertEqual(local.get_stats()["total"], 2)
+        self.assertEqual(sync_managers(local, self.open(self.remote_file)).compared_nodes, 1)
+
+    def test_archived_task_reaches_new_store(self):
+        """测试只存在于归档中的任务同步到新的存储"""
+        self.local.mark_as_completed(self.doomed.id)
+        self.local.archive_completed("2999-01-01")
+        other = self.open(os.path.join(self.temp_dir.name, "c", "tasks.json"))
+        self.assertEqual(sync_managers(self.local, other).pushed, 2)
+        self.assertEqual(self.open(other.data_file).get_task(self.doomed.id).status, "completed")
@@ -290,6 +290,185 @@ class TestTaskManager(TestCase):
         self.assertEqual(len(today_tasks), 1)
         self.assertEqual(today_tasks[0].title, "今天的任务")
 
+    
+    def test_get_tasks_page(self):
+        """测试分页获取任务"""
+        for i in range(5):
+            self.manager.add_task(f"任务{i}", "描述", status="completed" if i % 2 else "pending")
+        
+        # limit 和 offset
+        page = self.manager.get_tasks_page(limit=2, offset=1)
+        self.assertEqual([task.title for task in page.tasks], ["任务1", "任务2"])
+        self.assertIsNotNone(page.next_cursor)
+        
+        # 使用游标继续
+        page = self.manager.get_tasks_page(limit=2, cursor=page.next_cursor)
+        self.assertEqual([task.title for task in page.tasks], ["任务3", "任务4"])
+        
+        # 最后一页不足limit时没有游标
+        page = self.manager.get_tasks_page(limit=10, cursor=page.next_cursor)
+        self.assertEqual(page.tasks, [])
+        self.assertIsNone(page.next_cursor)
+        
+        # 过滤条件与分页组合
+        page = self.manager.get_tasks_page(limit=1, status="pending")
+        self.assertEqual([task.title for task in page.tasks], ["任务0"])
+        page = self.manager.get_tasks_page(limit=5, status="pending", cursor=page.next_cursor)
+        self.assertEqual([task.title for task in page.tasks], ["任务2", "任务4"])
+    
+    def test_iter_tasks(self):
+        """测试惰性迭代与分页的顺序和过滤一致，参数在调用时校验"""
+        for i in range(5):
+            self.manager.add_task(f"任务{i}", "描述", status="completed" if i % 2 else "pending")
+        page = self.manager.get_tasks_page(limit=1)
+        
+        tasks = self.manager.iter_tasks(status="pending")
+        self.assertEqual(next(tasks).title, "任务0")
+        self.assertEqual([task.title for task in tasks], ["任务2", "任务4"])
+        self.assertEqual([task.title for task in self.manager.iter_tasks(offset=1, cursor=page.next_cursor)],
+                         ["任务2", "任务3", "任务4"])
+        with self.assertRaises(ValueError):
+            self.manager.iter_tasks(cursor="invalid")
+        with self.assertRaises(ValueError):
+            self.manager.iter_tasks(offset=-1)
+    
+    def test_get_tasks_page_cursor_after_delete(self):
+        """测试游标在前面的任务被删除后仍然有效"""
+        tasks = [self.manager.add_task(f"任务{i}") for i in range(4)]
+        page = self.manager.get_tasks_page(limit=2)
+        
+        self.manager.delete_task(tasks[0].id)
+        page = self.manager.get_tasks_page(limit=2, cursor=page.next_cursor)
+        self.assertEqual([task.title for task in page.tasks], ["任务2", "任务3"])
+        
+        with self.assertRaises(ValueError):
+            self.manager.get_tasks_page(cursor="invalid")
+
+    
+    def test_query(self):
+        """测试组合查询、排序和Top-K"""
+        self.manager.add_task("编写报告", "项目报告", "2025-12-20")
+        self.manager.add_task("学习Python", "学习报告写作", "2025-12-10")
+        self.manager.add_task("参加会议", "团队会议", "2025-12-15", status="completed")
+        self.manager.add_task("整理报告", "无截止日期")
+        
+        # 状态和关键词组合
+        tasks = self.manager.query(status="pending", keyword="报告", sort="due_date")
+        self.assertEqual([task.title for task in tasks], ["学习Python", "编写报告", "整理报告"])
+        
+        # 截止日期范围 + 降序 + Top-K
+        tasks = self.manager.query(due_after="2025-12-11", sort="-due_date", limit=1)
+        self.assertEqual([task.title for task in tasks], ["编写报告"])
+        
+        # offset 与 limit
+        tasks = self.manager.query(sort="due_date", limit=2, offset=1)
+        self.assertEqual([task.title for task in tasks], ["参加会议", "编写报告"])
+        
+        # explain 返回执行后的计划
+        tasks, plan = self.manager.query(explain=True, status="completed", due_before="2025-12-31")
+        self.assertEqual([task.title for task in tasks], ["参加会议"])
+        self.assertEqual(plan.driver, "status=completed")
+        self.assertEqual(plan.result_rows, 1)
+    
+    def test_query_indexes_follow_updates(self):
+        """测试索引随更新和删除增量维护"""
+        task = self.manager.add_task("任务", "描述", "2025-12-01")
+        self.manager.update_task(task.id, due_date="2025-12-25", status="in_progress")
+        
+        self.assertEqual(self.manager.query(due_before="2025-12-02"), [])
+        self.assertEqual(self.manager.query(status="pending"), [])
+        self.assertEqual(self.manager.query(status="in_progress", due_after="2025-12-20"), [task])
+        
+        self.manager.delete_task(task.id)
+        self.assertEqual(self.manager.query(status="in_progress"), [])
+
+    
+    def test_get_stats(self):
+        """测试统计随增删改维护并随存储持久化"""
+        task = self.manager.add_task("过期任务", "描述", "2025-01-01")
+        self.manager.add_task("已完成任务", "描述", status="completed")
+        self.assertEqual(self.manager.get_stats()["overdue"], 1)
+        
+        self.manager.mark_as_completed(task.id)
+        stats = self.manager.get_stats()
+        self.assertEqual(stats["by_status"], {"completed": 2})
+        self.assertEqual(stats["overdue"], 0)
+        self.assertEqual(stats["completed_per_day"][-1][1], 2)
+        self.assertIsNotNone(stats["average_completion_seconds"])
+        self.assertTrue(os.path.exists(self.manager.stats_file))
+        
+        # 重新加载时直接使用持久化的统计
+        self.manager = TaskManager(self.temp_config_file)
+        self.assertEqual(self.manager.get_stats()["by_status"], {"completed": 2})
+        
+        # 数据文件被外部修改后统计失效并重建
+        with open(self.temp_data_file, "w", encoding="utf-8") as f:
+            json.dump([], f)
+        self.manager = TaskManager(self.temp_config_file)
+        self.assertEqual(self.manager.get_stats()["total"], 0)
+
+    
+    def test_get_tasks_due_this_week(self):
+        """测试获取本周截止的任务"""
+        self.manager.add_task("周三", "描述", "2025-12-10")
+        task = self.manager.add_task("周日", "描述", "2025-12-14")
+        self.manager.add_task("下周一", "描述", "2025-12-15")
+        
+        tasks = self.manager.get_tasks_due_this_week(today="2025-12-10")
+        self.assertEqual([t.title for t in tasks], ["周三", "周日"])
+        
+        self.manager.mark_as_completed(task.id)
+        tasks = self.manager.get_tasks_due_this_week(today="2025-12-10")
+        self.assertEqual([t.title for t in tasks], ["周三"])
+        self.assertEqual([t.title for t in self.manager.get_overdue_tasks(today="2025-12-16")],
+                         ["周三", "下周一"])
+
+    
+    def test_changes_since(self):
+        """测试每次变更获得递增的序号并可以增量读取"""
+        task = self.manager.add_task("任务1")
+        self.manager.update_task(task.id, status="in_progress")
+        other = self.manager.add_task("任务2")
+        self.manager.delete_task(other.id)
+        
+        self.assertEqual(self.manager.seq, 4)
+        changes = self.manager.changes_since(0)
+        self.assertEqual([(c["seq"], c["op"], c["id"]) for c in changes],
+                         [(1, "add", task.id), (2, "update", task.id),
+                          (3, "add", other.id), (4, "delete", other.id)])
+        self.assertEqual(changes[1]["task"]["status"], "in_progress")
+        self.assertEqual([c["seq"] for c in self.manager.changes_since(3)], [4])
+        
+        # 序号在重新加载后继续递增
+        self.manager = TaskManager(self.temp_config_file)
+        self.assertEqual(self.manager.seq, 4)
+        self.manager.add_task("任务3")
+        self.assertEqual([c["seq"] for c in self.manager.changes_since(4)], [5])
+
+
+    
+    def test_deferred_save(self):
+        """测试关闭自动保存时修改只在 save() 时写入一次"""
+        with self.manager.deferred_save():
+            task = self.manager.add_task("任务1")
+            self.manager.mark_as_completed(task.id)
+            self.assertTrue(self.manager.dirty)
+            self.assertFalse(os.path.exists(self.temp_data_file))
+            self.assertEqual(self.manager.changes_since(0), [])
+        
+        self.assertFalse(self.manager.dirty)
+        self.assertTrue(self.manager.autosave)
+        with open(self.temp_data_file, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)[0]["status"], "completed")
+        self.assertEqual([c["seq"] for c in self.manager.changes_since(0)], [1, 2])
+        
+        # 块内可以提前提交
+        with self.manager.deferred_save():
+            self.manager.add_task("任务2")
+            self.assertTrue(self.manager.save())
+            self.assertEqual(len(TaskManager(self.temp_config_file).tasks), 2)
+            self.manager.add_task("任务3")
+        self.assertEqual(len(TaskManager(self.temp_config_file).tasks), 3)
 
 if __name__ == "__main__":
     import unittest
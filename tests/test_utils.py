@@ -28,17 +28,20 @@ from daily_task_tracker.utils.io_utils import (
     ensure_directory,
     read_json_file,
     write_json_file,
-    backup_file
+    write_rows_file,
+    backup_file,
+    file_lock
 )
 
 from daily_task_tracker.utils.validation_utils import (
     validate_task_title,
     validate_task_status,
+    validate_task_priority,
     validate_due_date,
     validate_task_id,
     validate_task_data
 )
-from daily_task_tracker.utils.validation_utils import VALID_TASK_STATUSES
+from daily_task_tracker.utils.validation_utils import VALID_TASK_STATUSES, VALID_TASK_PRIORITIES
 
 
 class TestDateUtils(TestCase):
@@ -169,7 +172,54 @@ class TestIOUtils(TestCase):
         
         self.assertTrue(result)
         self.assertTrue(os.path.exists(new_dir_file))
+        # 先写临时文件再替换，不留下临时文件
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ["new_dir", "test.json"])
     
+    def test_file_lock(self):
+        """测试文件锁在线程之间互斥"""
+        import threading
+        lock_path = os.path.join(self.temp_dir.name, "locks", "store.lock")
+        inside = []
+        overlaps = []
+
+        def hold():
+            for _ in range(50):
+                with file_lock(lock_path):
+                    inside.append(1)
+                    overlaps.append(len(inside))
+                    inside.pop()
+
+        threads = [threading.Thread(target=hold) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(overlaps), 200)
+        self.assertEqual(max(overlaps), 1)
+    
+    def test_write_rows_file(self):
+        """测试紧凑行格式的写入和自动识别"""
+        records = [
+            {"id": "a", "title": "任务a", "due_date": None},
+            {"id": "b", "title": "任务b", "due_date": "2025-01-10", "completed_at": "2025-01-09T10:00:00"}
+        ]
+        test_file = os.path.join(self.temp_dir.name, "rows.json")
+
+        self.assertTrue(write_rows_file(test_file, records))
+        with open(test_file, "r", encoding="utf-8") as f:
+            content = f.read()
+        self.assertTrue(content.startswith('{"format":"rows","version":1,'
+                                           '"fields":["id","title","due_date","completed_at"],"rows":['))
+        self.assertIn('["a","任务a",null]', content)
+        self.assertEqual(read_json_file(test_file), records)
+
+        # 空列表和不支持的版本
+        self.assertTrue(write_rows_file(test_file, []))
+        self.assertEqual(read_json_file(test_file), [])
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write('{"format":"rows","version":99,"fields":[],"rows":[]}')
+        self.assertIsNone(read_json_file(test_file))
+
     def test_backup_file(self):
         """测试文件备份"""
         # 创建测试文件
@@ -242,6 +292,17 @@ class TestValidationUtils(TestCase):
         self.assertFalse(is_valid)
         self.assertIsNotNone(error)
     
+    def test_validate_task_priority(self):
+        """测试任务优先级验证"""
+        for priority in VALID_TASK_PRIORITIES:
+            is_valid, error = validate_task_priority(priority)
+            self.assertTrue(is_valid)
+            self.assertIsNone(error)
+        
+        is_valid, error = validate_task_priority("urgent")
+        self.assertFalse(is_valid)
+        self.assertIsNotNone(error)
+    
     def test_validate_due_date(self):
         """测试截止日期验证"""
         # None值
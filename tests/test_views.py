@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 议程视图测试
+daily_task_tracker - tests/test_views.py
+功能：测试物化议程视图的增量维护和跨天重新分桶，以及"下一步"优先队列
+"""
+
+import os
+import sys
+import json
+import tempfile
+from unittest import TestCase
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daily_task_tracker.task_manage import Task, TaskManager
+from daily_task_tracker.views import AgendaViews, UrgencyQueue, urgency_key, week_end
+
+
+class TestAgendaViews(TestCase):
+    """测试AgendaViews类"""
+    
+    def setUp(self):
+        """测试前的准备工作"""
+        # 2025-12-10 是周三
+        self.tasks = [
+            Task("上周", "", "2025-12-03", "pending", "a", "2025-12-01T00:00:00"),
+            Task("今天", "", "2025-12-10", "pending", "b", "2025-12-01T00:00:00"),
+            Task("周五", "", "2025-12-12", "in_progress", "c", "2025-12-01T00:00:00"),
+            Task("下周", "", "2025-12-16", "pending", "d", "2025-12-01T00:00:00"),
+            Task("已完成", "", "2025-12-01", "completed", "e", "2025-12-01T00:00:00"),
+            Task("无截止", "", None, "pending", "f", "2025-12-01T00:00:00"),
+        ]
+        self.views = AgendaViews.from_tasks(self.tasks)
+    
+    def test_week_end(self):
+        """测试本周日计算"""
+        self.assertEqual(week_end("2025-12-10"), "2025-12-14")
+        self.assertEqual(week_end("2025-12-14"), "2025-12-14")
+    
+    def test_views(self):
+        """测试三个视图的内容"""
+        self.assertEqual(self.views.get("overdue", "2025-12-10"), ["a"])
+        self.assertEqual(self.views.get("today", "2025-12-10"), ["b"])
+        self.assertEqual(self.views.get("week", "2025-12-10"), ["b", "c"])
+    
+    def test_incremental_invalidation(self):
+        """测试任务变化只影响对应视图"""
+        self.assertEqual(self.views.get("overdue", "2025-12-10"), ["a"])
+        self.assertEqual(self.views.get("week", "2025-12-10"), ["b", "c"])
+        
+        # 完成过期任务
+        task = self.tasks[0]
+        self.views.remove(task)
+        task.update(status="completed")
+        self.views.add(task)
+        self.assertEqual(self.views.get("overdue", "2025-12-10"), [])
+        
+        # 把下周的任务提前到今天
+        task = self.tasks[3]
+        self.views.remove(task)
+        task.update(due_date="2025-12-10")
+        self.views.add(task)
+        self.assertEqual(self.views.get("today", "2025-12-10"), ["b", "d"])
+        self.assertEqual(self.views.get("week", "2025-12-10"), ["b", "d", "c"])
+    
+    def test_day_rollover(self):
+        """测试跨天时重新分桶"""
+        self.assertEqual(self.views.get("overdue", "2025-12-10"), ["a"])
+        
+        self.assertEqual(self.views.get("overdue", "2025-12-13"), ["a", "b", "c"])
+        self.assertEqual(self.views.get("today", "2025-12-13"), [])
+        self.assertEqual(self.views.get("week", "2025-12-15"), ["d"])
+        # 日期回退时完整重建
+        self.assertEqual(self.views.get("overdue", "2025-12-10"), ["a"])
+
+
+if __name__ == "__main__":
+    import unittest
+    unittest.main()
+
+
+class TestUrgencyQueue(TestCase):
+    """测试UrgencyQueue类"""
+    
+    def setUp(self):
+        """测试前的准备工作"""
+        self.tasks = {task.id: task for task in [
+            Task("低优先级", "", "2025-12-01", "pending", "a", "2025-11-01T00:00:00", priority="low"),
+            Task("未设置", "", "2025-12-05", "pending", "b", "2025-11-01T00:00:00"),
+            Task("高优先级", "", "2025-12-20", "in_progress", "c", "2025-11-01T00:00:00", priority="high"),
+            Task("无截止", "", None, "pending", "d", "2025-10-01T00:00:00", priority="medium"),
+            Task("较早创建", "", "2025-12-05", "pending", "e", "2025-10-01T00:00:00"),
+            Task("已完成", "", "2025-11-01", "completed", "f", "2025-10-01T00:00:00", priority="high"),
+        ]}
+        self.queue = UrgencyQueue.from_tasks(self.tasks.values())
+    
+    def test_order(self):
+        """测试按优先级和截止日期的综合得分、创建时间排序，没有截止日期的排在最后，已完成的任务不在队列中"""
+        self.assertEqual(self.queue.top(), ["c", "e", "b", "a", "d"])
+        self.assertEqual(self.queue.top(2), ["c", "e"])
+        self.assertEqual(self.queue.top(2, accept=lambda task_id: task_id != "e"), ["c", "b"])
+        # 取前k个不会改变队列
+        self.assertEqual(len(self.queue), 5)
+        self.assertEqual(self.queue.top(), ["c", "e", "b", "a", "d"])
+
+    def test_overdue_low_priority_before_distant_high_priority(self):
+        """测试已过期的低优先级任务排在很久以后才截止的高优先级任务之前"""
+        overdue = Task("过期的低优先级", "", "2025-01-01", "pending", "x", "2025-01-01T00:00:00", priority="low")
+        distant = Task("明年的高优先级", "", "2026-01-15", "pending", "y", "2025-01-01T00:00:00", priority="high")
+        self.assertLess(urgency_key(overdue), urgency_key(distant))
+        soon = Task("下周的高优先级", "", "2025-01-08", "pending", "z", "2025-01-01T00:00:00", priority="high")
+        self.assertLess(urgency_key(soon), urgency_key(overdue))
+    
+    def test_incremental_updates(self):
+        """测试修改任务后旧条目被惰性丢弃"""
+        task = self.tasks["a"]
+        self.queue.remove(task)
+        task.priority = "high"
+        self.queue.add(task)
+        self.assertEqual(self.queue.top(2), ["a", "c"])
+        
+        self.queue.remove(self.tasks["c"])
+        self.assertEqual(self.queue.top(), ["a", "e", "b", "d"])
+        for _ in range(200):
+            self.queue.remove(task)
+            self.queue.add(task)
+        self.assertLess(len(self.queue._heap), 50)
+        self.assertEqual(self.queue.top(1), ["a"])
+
+
+class TestTaskManagerNextTasks(TestCase):
+    """测试TaskManager的"下一步"查询"""
+    
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_config_file = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.temp_config_file, "w", encoding="utf-8") as f:
+            json.dump({"data_file": os.path.join(self.temp_dir.name, "tasks.json")}, f)
+        self.manager = TaskManager(self.temp_config_file)
+    
+    def tearDown(self):
+        """测试后的清理工作"""
+        self.temp_dir.cleanup()
+    
+    def test_next_tasks_follow_changes(self):
+        """测试优先级、状态和依赖的变化反映在结果中"""
+        report = self.manager.add_task("写周报", due_date="2025-01-10")
+        bug = self.manager.add_task("修复线上问题", due_date="2025-01-20", priority="high")
+        deploy = self.manager.add_task("部署", due_date="2025-01-05", depends_on=[bug.id])
+        self.assertEqual([t.title for t in self.manager.get_next_tasks(limit=2)], ["修复线上问题", "写周报"])
+        
+        self.manager.update_task(report.id, priority="high")
+        self.manager.mark_as_completed(bug.id)
+        self.assertEqual([t.title for t in self.manager.get_next_tasks()], ["写周报", "部署"])
+        self.assertEqual(TaskManager(self.temp_config_file).get_task(report.id).priority, "high")
+        
+        with self.assertRaises(ValueError):
+            self.manager.update_task(deploy.id, priority="urgent")
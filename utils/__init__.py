@@ -3,50 +3,49 @@
 """
 日常任务追踪器 - 工具函数模块
 daily_task_tracker - utils/__init__.py
-功能：提供各种工具函数的统一入口
+功能：提供各种工具函数的统一入口（第一次访问时才导入对应的子模块）
 """
 
-# 导入工具函数模块
-from .date_utils import (
-    format_date,
-    parse_date,
-    is_valid_date,
-    get_today_date,
-    get_tomorrow_date,
-    get_date_difference
-)
+import importlib
 
-from .io_utils import (
-    ensure_directory,
-    read_json_file,
-    write_json_file,
-    backup_file
-)
-
-from .validation_utils import (
-    validate_task_title,
-    validate_task_status,
-    validate_due_date,
-    validate_task_id
-)
-
-# 导出所有工具函数
-__all__ = [
+# 工具函数 -> 所在的子模块；子模块在第一次访问其中的函数时才导入，
+# 只用到其中一个模块时不必加载其余模块的依赖（如 uuid、shutil）
+_EXPORTS = {
     # date_utils
-    'format_date',
-    'parse_date',
-    'is_valid_date',
-    'get_today_date',
-    'get_tomorrow_date',
-    'get_date_difference',
+    'format_date': 'date_utils',
+    'parse_date': 'date_utils',
+    'is_valid_date': 'date_utils',
+    'get_today_date': 'date_utils',
+    'get_tomorrow_date': 'date_utils',
+    'get_date_difference': 'date_utils',
     # io_utils
-    'ensure_directory',
-    'read_json_file',
-    'write_json_file',
-    'backup_file',
+    'ensure_directory': 'io_utils',
+    'read_json_file': 'io_utils',
+    'write_json_file': 'io_utils',
+    'write_rows_file': 'io_utils',
+    'file_fingerprint': 'io_utils',
+    'backup_file': 'io_utils',
     # validation_utils
-    'validate_task_title',
-    'validate_task_status',
-    'validate_due_date',
-    'validate_task_id'
-]
+    'validate_task_title': 'validation_utils',
+    'validate_task_status': 'validation_utils',
+    'validate_task_priority': 'validation_utils',
+    'validate_due_date': 'validation_utils',
+    'validate_task_id': 'validation_utils'
+}
+
+# 导出所有工具函数
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # 缓存到模块字典，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
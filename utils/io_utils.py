@@ -9,8 +9,22 @@ daily_task_tracker - utils/io_utils.py
 import json
 import os
 import shutil
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
+
+from .metrics import record_storage_io
+
+try:
+    import fcntl
+except ImportError:  # Windows 上没有 fcntl，文件锁退化为只在本进程内互斥
+    fcntl = None
+
+
+# 紧凑行格式的头部标记和版本
+ROWS_FORMAT = "rows"
+ROWS_VERSION = 1
 
 
 def ensure_directory(directory_path: str) -> None:
@@ -20,13 +34,65 @@ def ensure_directory(directory_path: str) -> None:
     Args:
         directory_path: 目录路径
     """
-    if not os.path.exists(directory_path):
+    if directory_path and not os.path.exists(directory_path):
         try:
             os.makedirs(directory_path)
         except OSError as e:
             print(f"创建目录失败 {directory_path}: {e}")
 
 
+def temp_path_for(file_path: str) -> str:
+    """
+    原子写入用的临时文件路径（包含进程和线程标识，多个写入方互不覆盖）
+
+    Args:
+        file_path: 目标文件路径
+
+    Returns:
+        与目标文件同目录的临时文件路径，写完后用 os.replace 替换目标文件
+    """
+    return f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _discard(path: str) -> None:
+    """删除写入失败留下的临时文件"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# 没有 fcntl 时按路径在进程内互斥
+_LOCAL_LOCKS: Dict[str, threading.Lock] = {}
+_LOCAL_LOCKS_GUARD = threading.Lock()
+
+
+@contextmanager
+def file_lock(lock_path: str) -> Iterator[None]:
+    """
+    独占文件锁（flock）：同一时刻只有一个进程或线程持有同一路径的锁
+
+    每次加锁都重新打开锁文件，因此同一进程中的不同线程之间同样互斥。锁随文件描述符关闭释放，
+    持有锁的进程崩溃时由系统自动释放。
+
+    Args:
+        lock_path: 锁文件路径（不存在时创建，内容为空）
+    """
+    if fcntl is None:
+        with _LOCAL_LOCKS_GUARD:
+            lock = _LOCAL_LOCKS.setdefault(os.path.abspath(lock_path), threading.Lock())
+        with lock:
+            yield
+        return
+    ensure_directory(os.path.dirname(lock_path))
+    with open(lock_path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
 def read_json_file(file_path: str) -> Optional[Any]:
     """
     读取JSON文件
@@ -40,15 +106,33 @@ def read_json_file(file_path: str) -> Optional[Any]:
     if os.path.exists(file_path):
         try:
             with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+                data = json.load(f)
+                record_storage_io("read", os.fstat(f.fileno()).st_size)
         except (json.JSONDecodeError, IOError) as e:
             print(f"读取JSON文件失败 {file_path}: {e}")
+            return None
+        if isinstance(data, dict) and data.get("format") == ROWS_FORMAT:
+            return _decode_rows(file_path, data)
+        return data
     return None
 
 
+def _decode_rows(file_path: str, data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """把紧凑行格式还原为记录列表，版本不支持或结构无效时返回None"""
+    if data.get("version") != ROWS_VERSION:
+        print(f"读取JSON文件失败 {file_path}: 不支持的行格式版本 {data.get('version')}")
+        return None
+    try:
+        fields = data["fields"]
+        return [dict(zip(fields, row)) for row in data["rows"]]
+    except (KeyError, TypeError) as e:
+        print(f"读取JSON文件失败 {file_path}: 无效的行格式 {e}")
+        return None
+
+
 def write_json_file(file_path: str, data: Any, indent: int = 2) -> bool:
     """
-    写入JSON文件
+    写入JSON文件（先写临时文件再替换，读取方不会看到写了一半的文件）
     
     Args:
         file_path: JSON文件路径
@@ -58,18 +142,81 @@ def write_json_file(file_path: str, data: Any, indent: int = 2) -> bool:
     Returns:
         如果写入成功返回True，否则返回False
     """
+    temp_path = temp_path_for(file_path)
     try:
         # 确保目录存在
         ensure_directory(os.path.dirname(file_path))
         
-        with open(file_path, "w", encoding="utf-8") as f:
+        with open(temp_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(temp_path, file_path)
+        record_storage_io("write", os.path.getsize(file_path))
+        return True
+    except IOError as e:
+        print(f"写入JSON文件失败 {file_path}: {e}")
+        _discard(temp_path)
+        return False
+
+
+def write_rows_file(file_path: str, records: List[Dict[str, Any]],
+                    fields: Optional[List[str]] = None) -> bool:
+    """
+    以紧凑行格式写入记录列表：头部列出字段名，每条记录写成一个按字段顺序排列的数组（每行一条）
+
+    逐行编码写出，不在内存中拼接整个文件。记录中缺少的末尾字段不写出，读取时也不会出现；
+    缺少的中间字段写为null。read_json_file 会按头部识别该格式并还原为记录列表。
+    与 write_json_file 一样先写临时文件再替换。
+
+    Args:
+        file_path: 文件路径
+        records: 记录列表
+        fields: 字段顺序，默认按记录中第一次出现的顺序
+
+    Returns:
+        如果写入成功返回True，否则返回False
+    """
+    if fields is None:
+        fields = list(dict.fromkeys(key for record in records for key in record))
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    header = {"format": ROWS_FORMAT, "version": ROWS_VERSION, "fields": fields}
+    temp_path = temp_path_for(file_path)
+    try:
+        ensure_directory(os.path.dirname(file_path))
+
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(encode(header)[:-1] + ',"rows":[')
+            for i, record in enumerate(records):
+                row = [record.get(field) for field in fields]
+                while row and fields[len(row) - 1] not in record:
+                    row.pop()
+                f.write(("\n" if i == 0 else ",\n") + encode(row))
+            f.write("\n]}\n")
+        os.replace(temp_path, file_path)
+        record_storage_io("write", os.path.getsize(file_path))
         return True
     except IOError as e:
         print(f"写入JSON文件失败 {file_path}: {e}")
+        _discard(temp_path)
         return False
 
 
+def file_fingerprint(file_path: str) -> Optional[Dict[str, int]]:
+    """
+    获取文件指纹（大小和纳秒级修改时间），用于判断派生文件是否过期
+    
+    Args:
+        file_path: 文件路径
+        
+    Returns:
+        指纹字典，如果文件不存在则返回None
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
 def backup_file(file_path: str, backup_dir: str = "backups") -> Optional[str]:
     """
     备份文件
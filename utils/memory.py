@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 内存分析工具函数
+daily_task_tracker - utils/memory.py
+功能：基于tracemalloc记录峰值内存和主要分配位置，递归估算对象图的大小
+"""
+
+import sys
+import tracemalloc
+from typing import Any, List, NamedTuple, Optional, Set
+
+try:
+    import resource
+except ImportError:  # Windows 上没有 resource，不报告峰值RSS
+    resource = None
+
+
+# 统计分配位置时忽略的文件（分析工具自身和导入机制）
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                  "<unknown>")
+
+
+def format_bytes(size: float) -> str:
+    """把字节数格式化为 B/KB/MB/GB"""
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """进程的峰值常驻内存（字节），平台不支持时返回None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以KB为单位，macOS 以字节为单位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    递归估算对象及其引用的所有对象的大小（字节）
+
+    沿字典、列表、元组、集合和对象属性展开，每个对象只计算一次。
+
+    Args:
+        obj: 要估算的对象
+        seen: 已经计算过（或不应计入）的对象的 id()，会被更新；多次调用共用同一个集合时
+            共享的对象只计入第一次
+
+    Returns:
+        字节数
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, (str, bytes, int, float, bool, type(None))):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            attributes = getattr(current, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for name in getattr(type(current), "__slots__", ()):
+                if hasattr(current, name):
+                    stack.append(getattr(current, name))
+    return total
+
+
+class AllocationSite(NamedTuple):
+    """一个分配位置及其仍占用的内存"""
+    location: str
+    size: int
+    count: int
+
+
+class MemoryProfiler:
+    """
+    tracemalloc 分析上下文：进入时开始跟踪（已经在跟踪时沿用），退出时记录峰值并保存快照
+
+    用法：
+        with MemoryProfiler() as profiler:
+            ...
+        print(profiler.format())
+    """
+
+    def __init__(self, frames: int = 1):
+        """
+        Args:
+            frames: 每个分配记录的调用栈深度（越深开销越大）
+        """
+        self.frames = frames
+        self.peak = 0
+        self.current = 0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started = False
+
+    def __enter__(self) -> "MemoryProfiler":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.current, self.peak = tracemalloc.get_traced_memory()
+        self.snapshot = tracemalloc.take_snapshot()
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def top_sites(self, limit: int = 10) -> List[AllocationSite]:
+        """
+        结束时仍占用内存最多的分配位置
+
+        Args:
+            limit: 最多返回的位置数
+
+        Returns:
+            按占用从大到小排列的分配位置
+        """
+        if self.snapshot is None:
+            return []
+        snapshot = self.snapshot.filter_traces([tracemalloc.Filter(False, name) for name in _IGNORED_FILES])
+        sites = []
+        for stat in snapshot.statistics("lineno")[:limit]:
+            frame = stat.traceback[0]
+            sites.append(AllocationSite(f"{frame.filename}:{frame.lineno}", stat.size, stat.count))
+        return sites
+
+    def format(self, limit: int = 10) -> str:
+        """人类可读的峰值和分配位置报告"""
+        lines = [f"峰值内存 (tracemalloc): {format_bytes(self.peak)}，结束时占用 {format_bytes(self.current)}"]
+        rss = peak_rss_bytes()
+        if rss is not None:
+            lines.append(f"进程峰值RSS: {format_bytes(rss)}")
+        sites = self.top_sites(limit)
+        if sites:
+            lines.append(f"占用最多的 {len(sites)} 个分配位置:")
+            lines.extend(f"  {format_bytes(site.size):>10}  {site.count:>8} 个对象  {site.location}"
+                         for site in sites)
+        return "\n".join(lines)
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器 - 指标工具函数
+daily_task_tracker - utils/metrics.py
+功能：收集操作延迟、存储规模、索引重建、缓存命中和存储I/O等指标，并以Prometheus文本格式导出
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+import time
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label_value(value: str) -> str:
+    """转义Prometheus标签值中的特殊字符"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """把标签名和标签值格式化为 {a="1",b="2"} 形式"""
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """格式化样本值，整数不带小数点"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """指标基类，按标签值保存样本；子类必须实现 reset 和 samples，否则无法实例化"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def reset(self) -> None:
+        """清空所有样本"""
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """生成 (样本名, 标签字符串, 值) 三元组"""
+
+    def render(self) -> List[str]:
+        """渲染为Prometheus文本格式的行"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for sample_name, labels, value in self.samples():
+            lines.append(f"{sample_name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        增加计数
+
+        Args:
+            amount: 增加量，不能为负数
+            labels: 标签值
+        """
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        """获取当前计数"""
+        return self._values.get(self._key(labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """设置当前值"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """增加当前值"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        """获取当前值"""
+        return self._values.get(self._key(labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram(_Metric):
+    """按桶累计的直方图"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # 每组标签保存 [各桶计数..., 总和, 总数]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        记录一次观测值
+
+        Args:
+            value: 观测值（延迟以秒为单位）
+            labels: 标签值
+        """
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def get_count(self, **labels: str) -> float:
+        """获取观测次数"""
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0
+
+    def get_sum(self, **labels: str) -> float:
+        """获取观测值总和"""
+        state = self._values.get(self._key(labels))
+        return state[-2] if state else 0
+
+    def time(self, **labels: str) -> "_Timer":
+        """返回一个上下文管理器，退出时记录耗时"""
+        return _Timer(self, labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        bucket_labelnames = self.labelnames + ("le",)
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield (f"{self.name}_bucket",
+                       _format_labels(bucket_labelnames, key + (_format_value(bound),)),
+                       cumulative)
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum", labels, state[-2]
+            yield f"{self.name}_count", labels, state[-1]
+
+
+class _Timer:
+    """直方图计时上下文管理器"""
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class MetricsRegistry:
+    """指标注册表，负责统一渲染"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"指标 {metric.name} 已以不同的类型或标签注册")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册（或获取已注册的）计数器"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """注册（或获取已注册的）仪表"""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        """注册（或获取已注册的）直方图"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """按名称获取指标"""
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """清空所有指标的样本（主要用于测试）"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def render(self) -> str:
+        """渲染为Prometheus文本格式"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 全局注册表及所有后端共用的标准指标
+REGISTRY = MetricsRegistry()
+
+OPERATION_LATENCY = REGISTRY.histogram(
+    "task_tracker_operation_duration_seconds", "TaskManager操作耗时（秒）", ["operation"])
+OPERATION_ERRORS = REGISTRY.counter(
+    "task_tracker_operation_errors_total", "TaskManager操作抛出异常的次数", ["operation"])
+STORE_TASKS = REGISTRY.gauge(
+    "task_tracker_store_tasks", "存储中的任务数量")
+STORE_BYTES = REGISTRY.gauge(
+    "task_tracker_store_bytes", "数据文件的大小（字节）")
+JOURNAL_ENTRIES = REGISTRY.gauge(
+    "task_tracker_journal_entries", "变更日志中的条目数")
+JOURNAL_SEQ = REGISTRY.gauge(
+    "task_tracker_journal_last_seq", "最后一次变更的序号")
+INDEX_REBUILDS = REGISTRY.counter(
+    "task_tracker_index_rebuilds_total", "索引全量重建次数", ["index"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "task_tracker_cache_requests_total", "缓存查找次数", ["cache", "result"])
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "task_tracker_cache_hit_ratio", "缓存命中率", ["cache"])
+STORAGE_IO_BYTES = REGISTRY.counter(
+    "task_tracker_storage_io_bytes_total", "存储读写的字节数", ["direction"])
+STORAGE_IO_OPERATIONS = REGISTRY.counter(
+    "task_tracker_storage_io_operations_total", "存储读写的次数", ["direction"])
+PARTITION_LOADS = REGISTRY.counter(
+    "task_tracker_partition_loads_total", "加载的存储分区数")
+ARCHIVED_TASKS = REGISTRY.gauge(
+    "task_tracker_archived_tasks", "归档层中的任务数量")
+PARALLEL_SCANS = REGISTRY.counter(
+    "task_tracker_parallel_scans_total", "使用进程池完成的扫描次数")
+REMINDERS_FIRED = REGISTRY.counter(
+    "task_tracker_reminders_fired_total", "触发的提醒数", ["kind"])
+REMINDERS_PENDING = REGISTRY.gauge(
+    "task_tracker_reminders_pending_tasks", "等待提醒的任务数")
+TENANTS_OPEN = REGISTRY.gauge(
+    "task_tracker_tenants_open", "多租户池中打开的租户数")
+TENANT_POOL_BYTES = REGISTRY.gauge(
+    "task_tracker_tenant_pool_bytes", "多租户池中租户的估算内存（字节）")
+TENANT_EVICTIONS = REGISTRY.counter(
+    "task_tracker_tenant_evictions_total", "多租户池淘汰的租户数")
+
+
+def timed(operation: str) -> Callable:
+    """
+    装饰器：记录函数耗时到操作延迟直方图，异常计入错误计数
+
+    Args:
+        operation: 操作名称（作为operation标签）
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                OPERATION_ERRORS.inc(operation=operation)
+                raise
+            finally:
+                OPERATION_LATENCY.observe(time.perf_counter() - start, operation=operation)
+        return wrapper
+    return decorator
+
+
+def record_storage_io(direction: str, num_bytes: int) -> None:
+    """
+    记录一次存储读写
+
+    Args:
+        direction: "read" 或 "write"
+        num_bytes: 读写的字节数
+    """
+    STORAGE_IO_OPERATIONS.inc(direction=direction)
+    STORAGE_IO_BYTES.inc(num_bytes, direction=direction)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """
+    记录一次缓存查找并更新命中率
+
+    Args:
+        cache: 缓存名称
+        hit: 是否命中
+    """
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+    total = hits + CACHE_REQUESTS.get(cache=cache, result="miss")
+    CACHE_HIT_RATIO.set(hits / total, cache=cache)
+
+
+def render_metrics(registry: Optional[MetricsRegistry] = None) -> str:
+    """
+    以Prometheus文本格式渲染指标
+
+    Args:
+        registry: 指标注册表，默认为全局注册表
+
+    Returns:
+        Prometheus文本格式字符串
+    """
+    return (registry or REGISTRY).render()
+
+
+def write_metrics_file(file_path: str, registry: Optional[MetricsRegistry] = None) -> bool:
+    """
+    原子地把指标写入文件（适用于node_exporter的textfile收集器）
+
+    Args:
+        file_path: 目标文件路径
+        registry: 指标注册表，默认为全局注册表
+
+    Returns:
+        如果写入成功返回True，否则返回False
+    """
+    temp_path = f"{file_path}.tmp"
+    try:
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(render_metrics(registry))
+        os.replace(temp_path, file_path)
+        return True
+    except OSError as e:
+        print(f"写入指标文件失败 {file_path}: {e}")
+        return False
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1",
+                         registry: Optional[MetricsRegistry] = None) -> "ThreadingHTTPServer":
+    """
+    在后台线程中启动本地HTTP指标端点（GET /metrics）
+
+    Args:
+        port: 监听端口，0表示由系统分配
+        host: 监听地址，默认只监听本机
+        registry: 指标注册表，默认为全局注册表
+
+    Returns:
+        正在运行的服务器，调用 shutdown() 停止
+    """
+    # http.server 连带导入 email、ssl 等模块，只在启动端点时导入
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render_metrics(registry).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    return server
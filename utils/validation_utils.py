@@ -12,6 +12,7 @@ from .date_utils import is_valid_date
 
 
 VALID_TASK_STATUSES = ["pending", "in_progress", "completed"]
+VALID_TASK_PRIORITIES = ["high", "medium", "low"]
 MIN_TITLE_LENGTH = 1
 MAX_TITLE_LENGTH = 100
 MAX_DESCRIPTION_LENGTH = 1000
@@ -62,6 +63,25 @@ def validate_task_status(status: str) -> tuple[bool, Optional[str]]:
     return True, None
 
 
+def validate_task_priority(priority: str) -> tuple[bool, Optional[str]]:
+    """
+    验证任务优先级
+    
+    Args:
+        priority: 任务优先级
+        
+    Returns:
+        (是否有效, 错误信息)
+    """
+    if not isinstance(priority, str):
+        return False, "任务优先级必须是字符串"
+    
+    if priority not in VALID_TASK_PRIORITIES:
+        return False, f"无效的任务优先级，必须是 {', '.join(VALID_TASK_PRIORITIES)} 之一"
+    
+    return True, None
+
+
 def validate_due_date(due_date: Optional[str]) -> tuple[bool, Optional[str]]:
     """
     验证截止日期
@@ -105,7 +125,8 @@ def validate_task_id(task_id: str) -> tuple[bool, Optional[str]]:
 
 
 def validate_task_data(title: str, description: Optional[str] = None, 
-                      due_date: Optional[str] = None, status: Optional[str] = None) -> dict[str, list[str]]:
+                      due_date: Optional[str] = None, status: Optional[str] = None,
+                      priority: Optional[str] = None) -> dict[str, list[str]]:
     """
     验证完整的任务数据
     
@@ -114,6 +135,7 @@ def validate_task_data(title: str, description: Optional[str] = None,
         description: 任务描述
         due_date: 截止日期
         status: 任务状态
+        priority: 任务优先级
         
     Returns:
         验证结果字典，包含每个字段的错误信息
@@ -144,4 +166,10 @@ def validate_task_data(title: str, description: Optional[str] = None,
         if not is_valid and error:
             errors["status"] = [error]
     
+    # 验证优先级
+    if priority is not None:
+        is_valid, error = validate_task_priority(priority)
+        if not is_valid and error:
+            errors["priority"] = [error]
+    
     return errors
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日常任务追踪器议程视图
+daily_task_tracker - views.py
+功能：物化"已过期"、"今天截止"和"本周截止"三个议程视图，随任务变化增量失效，跨天时按日期区间重新分桶；
+      维护按紧迫程度排列的未完成任务优先队列，用于"下一步做什么"
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+VIEW_OVERDUE = "overdue"
+VIEW_TODAY = "today"
+VIEW_WEEK = "week"
+
+# 优先级的排序位置，未设置优先级视为 medium
+PRIORITY_RANKS = {"high": 0, "medium": 1, "low": 2}
+DEFAULT_PRIORITY_RANK = PRIORITY_RANKS["medium"]
+# 计算紧迫程度时优先级每相差一级，相当于截止日期相差的天数
+PRIORITY_DAYS = 30
+
+
+def urgency_key(task) -> Tuple[bool, int, str, str]:
+    """
+    任务的紧迫程度（越小越紧迫）：综合优先级和截止日期的得分，相同时创建越早越紧迫
+
+    得分是距截止日期的天数加上优先级的偏移（high 提前、low 推后 PRIORITY_DAYS 天），
+    因此已经过期的低优先级任务排在一年后才截止的高优先级任务之前。所有任务的"距今天数"
+    减去的是同一个今天，按截止日期的序数计算得到的顺序相同，键不随当前时间变化，
+    任务不变时它在队列中的位置也不变。没有截止日期的任务排在所有有截止日期的任务之后，其间按优先级排序。
+    """
+    rank = PRIORITY_RANKS.get(task.priority, DEFAULT_PRIORITY_RANK)
+    if not task.due_date:
+        return (True, rank, task.created_at, task.id)
+    score = date.fromisoformat(task.due_date[:10]).toordinal() + (rank - DEFAULT_PRIORITY_RANK) * PRIORITY_DAYS
+    return (False, score, task.created_at, task.id)
+
+
+def week_end(day: str) -> str:
+    """返回 day 所在ISO周的周日 (YYYY-MM-DD)"""
+    current = date.fromisoformat(day)
+    return (current + timedelta(days=6 - current.weekday())).isoformat()
+
+
+def _next_day(day: str) -> str:
+    """返回 day 的下一天 (YYYY-MM-DD)"""
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+class AgendaViews:
+    """
+    未完成且有截止日期的任务按截止日期分桶保存，三个视图是相对于当前日期的日期区间：
+
+    - overdue: 截止日期 < 今天
+    - today:   截止日期 == 今天
+    - week:    今天 <= 截止日期 <= 本周日
+
+    视图结果（任务ID列表，按截止日期、创建时间排序）被缓存；任务变化只使其所在区间的视图失效。
+    日期向后滚动时，过期视图只追加新过期的日期桶，其余视图按区间重新物化。
+    """
+
+    def __init__(self):
+        # 截止日期 -> {任务ID: 创建时间}
+        self._buckets: Dict[str, Dict[str, str]] = {}
+        # 有任务的截止日期，升序
+        self._dates: List[str] = []
+        self._day: Optional[str] = None
+        self._week_end: Optional[str] = None
+        self._views: Dict[str, Optional[List[str]]] = {VIEW_OVERDUE: None, VIEW_TODAY: None, VIEW_WEEK: None}
+
+    @staticmethod
+    def _tracked(task) -> bool:
+        return task.status != "completed" and bool(task.due_date)
+
+    @classmethod
+    def from_tasks(cls, tasks) -> "AgendaViews":
+        """从任务列表全量构建"""
+        views = cls()
+        for task in tasks:
+            if cls._tracked(task):
+                views._buckets.setdefault(task.due_date, {})[task.id] = task.created_at
+        views._dates = sorted(views._buckets)
+        return views
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        """导出日期桶，用于持久化（视图缓存不导出）"""
+        return self._buckets
+
+    @classmethod
+    def from_dict(cls, buckets: Dict[str, Dict[str, str]]) -> "AgendaViews":
+        """从持久化的日期桶恢复"""
+        views = cls()
+        views._buckets = {due_date: dict(bucket) for due_date, bucket in buckets.items()}
+        views._dates = sorted(views._buckets)
+        return views
+
+    def _invalidate(self, due_date: str) -> None:
+        """使包含该截止日期的视图失效"""
+        if self._day is None:
+            return
+        if due_date < self._day:
+            self._views[VIEW_OVERDUE] = None
+        elif due_date <= self._week_end:
+            self._views[VIEW_WEEK] = None
+            if due_date == self._day:
+                self._views[VIEW_TODAY] = None
+
+    def add(self, task) -> None:
+        """加入任务的当前状态"""
+        if not self._tracked(task):
+            return
+        bucket = self._buckets.get(task.due_date)
+        if bucket is None:
+            bucket = self._buckets[task.due_date] = {}
+            insort(self._dates, task.due_date)
+        bucket[task.id] = task.created_at
+        self._invalidate(task.due_date)
+
+    def remove(self, task) -> None:
+        """移除任务的当前状态（必须在修改任务字段之前调用）"""
+        if not self._tracked(task):
+            return
+        bucket = self._buckets.get(task.due_date)
+        if bucket is None or bucket.pop(task.id, None) is None:
+            return
+        if not bucket:
+            del self._buckets[task.due_date]
+            del self._dates[bisect_left(self._dates, task.due_date)]
+        self._invalidate(task.due_date)
+
+    def _materialize(self, start: Optional[str], stop: Optional[str]) -> List[str]:
+        """物化截止日期在 [start, stop) 区间内的任务ID"""
+        lo = bisect_left(self._dates, start) if start is not None else 0
+        hi = bisect_left(self._dates, stop) if stop is not None else len(self._dates)
+        ids: List[str] = []
+        for due_date in self._dates[lo:hi]:
+            bucket = self._buckets[due_date]
+            ids.extend(sorted(bucket, key=bucket.__getitem__))
+        return ids
+
+    def _roll(self, today: str) -> None:
+        """把视图对齐到 today；日期向后滚动时增量扩展过期视图"""
+        if today == self._day:
+            return
+        previous, overdue = self._day, self._views[VIEW_OVERDUE]
+        self._day = today
+        self._week_end = week_end(today)
+        self._views = {VIEW_OVERDUE: None, VIEW_TODAY: None, VIEW_WEEK: None}
+        if previous is not None and overdue is not None and previous < today:
+            self._views[VIEW_OVERDUE] = overdue + self._materialize(previous, today)
+
+    def get(self, view: str, today: Optional[str] = None) -> List[str]:
+        """
+        获取视图中的任务ID
+
+        Args:
+            view: 视图名称 (overdue, today, week)
+            today: 当天日期 (YYYY-MM-DD)，默认为今天
+
+        Returns:
+            按截止日期和创建时间排序的任务ID列表（返回副本）
+        """
+        self._roll(today or date.today().isoformat())
+        ids = self._views[view]
+        if ids is None:
+            day = self._day
+            if view == VIEW_OVERDUE:
+                ids = self._materialize(None, day)
+            elif view == VIEW_TODAY:
+                ids = self._materialize(day, _next_day(day))
+            else:
+                ids = self._materialize(day, _next_day(self._week_end))
+            self._views[view] = ids
+        return list(ids)
+
+
+class UrgencyQueue:
+    """
+    未完成任务按 urgency_key 排列的最小堆
+
+    任务变化时只压入新的条目（O(log n)），旧条目不从堆中删除，而是通过版本号在弹出时识别并丢弃
+    （惰性删除），失效条目过多时整体重建。取前k个时从堆顶弹出直到得到k个满足条件的任务，
+    再把弹出的有效条目放回，不需要对全部未完成任务排序。
+    """
+
+    def __init__(self):
+        # (urgency_key..., 版本)
+        self._heap: List[Tuple] = []
+        # 任务ID -> 当前版本，只包含在队列中的任务
+        self._versions: Dict[str, int] = {}
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    @staticmethod
+    def _tracked(task) -> bool:
+        # 重复任务的定义本身不可执行，由各次实例代替
+        return task.status != "completed" and not task.recurrence
+
+    @classmethod
+    def from_tasks(cls, tasks) -> "UrgencyQueue":
+        """从任务列表全量构建（O(n) 建堆）"""
+        queue = cls()
+        for task in tasks:
+            if cls._tracked(task):
+                queue._version += 1
+                queue._versions[task.id] = queue._version
+                queue._heap.append(urgency_key(task) + (queue._version,))
+        heapq.heapify(queue._heap)
+        return queue
+
+    def add(self, task) -> None:
+        """加入任务的当前状态"""
+        if not self._tracked(task):
+            return
+        self._version += 1
+        self._versions[task.id] = self._version
+        heapq.heappush(self._heap, urgency_key(task) + (self._version,))
+
+    def remove(self, task) -> None:
+        """移除任务（惰性删除，堆中的条目在弹出时丢弃）"""
+        if self._versions.pop(task.id, None) is not None and len(self._heap) > 2 * len(self._versions) + 16:
+            self._heap = [entry for entry in self._heap if self._versions.get(entry[-2]) == entry[-1]]
+            heapq.heapify(self._heap)
+
+    def top(self, limit: Optional[int] = None, accept: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """
+        最紧迫的任务
+
+        Args:
+            limit: 最多返回的任务数，None表示全部
+            accept: 过滤条件，参数为任务ID；不满足的任务跳过但留在队列中
+
+        Returns:
+            按紧迫程度排序的任务ID
+        """
+        popped = []
+        result: List[str] = []
+        while self._heap and (limit is None or len(result) < limit):
+            entry = heapq.heappop(self._heap)
+            task_id = entry[-2]
+            if self._versions.get(task_id) != entry[-1]:
+                continue
+            popped.append(entry)
+            if accept is None or accept(task_id):
+                result.append(task_id)
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return result